@@ -1,129 +1,685 @@
 from __future__ import annotations
 
-from typing import List, Optional
+import base64
+import json
+import logging
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException
+import anyio
+from fastapi import APIRouter, Depends, HTTPException, Query, status as http_status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, text, tuple_
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ...database import get_session
-from ...models import TestRun, TestCase, EvalResult
+from ...core.config import get_settings
+from ...database import get_async_session, new_async_session
+from ...models import CaseContent, EvalMatrix, TestRun, TestCase, EvalResult
 from ..schemas import (
+    EvalCaseSource,
+    EvalComparisonItem,
+    EvalComparisonStats,
+    EvalMatrixCell,
+    EvalMatrixRequest,
+    EvalMatrixResponse,
+    EvalRunComparisonResponse,
     EvalRunRequest,
     EvalRunResponse,
+    EvalRunResultItem,
+    EvalRunStreamSummary,
+    EvalRunSubmitResponse,
     EvalRunListResponse,
     EvalRunDetailResponse,
     EvalRunSummary,
     EvalResultItem,
+    JudgeCacheStats,
 )
+from ...services.blobs import get_text, get_texts
+from ...services.eval_matrix import execute_matrix, matrix_status
 from ...services.eval_runner import EvalRunner
-from ..core.security import get_project_id
+from ...services.job_queue import job_queue
+from ...services.run_comparison import (
+    ComparisonChange,
+    ComparisonOrder,
+    comparison_count_statement,
+    comparison_statement,
+    comparison_stats_statement,
+)
+from ...services.judge_cache import judge_cache
+from ...services.test_suites import load_suite_cases, resolve_suite
+from ...services.work_queue import enqueue_run
+from ...core.security import get_project_id
+from ..streaming import StreamFormat, stream_records
+
 
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
+def get_eval_runner() -> EvalRunner:
+    """Runner for the synchronous and streaming endpoints; swap it via ``app.dependency_overrides``.
+
+    Runners are cheap: the judge client comes from the process-wide ``judge_registry``.
+    """
+    return EvalRunner()
+
+
 @router.post("/run", response_model=EvalRunResponse)
-def run_eval(
+async def run_eval(
     payload: EvalRunRequest,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     project_id: str | None = Depends(get_project_id),
+    runner: EvalRunner = Depends(get_eval_runner),
 ) -> EvalRunResponse:
-    runner = EvalRunner()
-    result = runner.run_eval(
+    test_cases, suite_id = await session.run_sync(_case_source, payload)
+    result = await runner.arun_eval(
         session,
         prompt=payload.prompt,
         target_model=payload.target_model,
-        test_cases=[tc.model_dump() for tc in payload.test_cases],
+        test_cases=test_cases,
         pass_threshold=payload.pass_threshold,
+        suite_id=suite_id,
+        project_id=project_id,
+        **payload.execution_options(),
     )
     return EvalRunResponse(**result)
 
 
+@router.post(
+    "/run/async",
+    response_model=EvalRunSubmitResponse,
+    status_code=http_status.HTTP_202_ACCEPTED,
+)
+async def submit_eval(
+    payload: EvalRunRequest,
+    session: AsyncSession = Depends(get_async_session),
+    project_id: str | None = Depends(get_project_id),
+) -> EvalRunSubmitResponse:
+    """Persist the run as pending and return immediately.
+
+    A background worker evaluates it; poll ``GET /runs/{run_id}`` for
+    ``status`` and ``completed_cases``. With ``EVAL_QUEUE_BACKEND=database``
+    the cases are queued for standalone workers instead.
+    """
+    distributed = get_settings().eval_queue_backend == "database"
+    if distributed and payload.early_stop:
+        raise HTTPException(status_code=400, detail="early_stop is not supported by the database work queue")
+
+    test_cases, suite_id = await session.run_sync(_case_source, payload)
+    run = await session.run_sync(
+        EvalRunner.submit_run,
+        prompt=payload.prompt,
+        target_model=payload.target_model,
+        test_cases=test_cases,
+        pass_threshold=payload.pass_threshold,
+        suite_id=suite_id,
+        project_id=project_id,
+        execution_options=payload.execution_options(),
+    )
+    if distributed:
+        await session.run_sync(enqueue_run, run.id, payload.execution_options())
+    else:
+        job_queue.submit(run.id, **payload.execution_options())
+    return EvalRunSubmitResponse(run_id=str(run.id), status=run.status, total_cases=run.total_cases)
+
+
+@router.post("/run/stream")
+async def run_eval_stream(
+    payload: EvalRunRequest,
+    format: StreamFormat = Query(default="ndjson", description="ndjson (one JSON record per line) or sse."),
+    session: AsyncSession = Depends(get_async_session),
+    project_id: str | None = Depends(get_project_id),
+    runner: EvalRunner = Depends(get_eval_runner),
+) -> StreamingResponse:
+    """Run an eval and stream each result as soon as it is scored.
+
+    Emits one ``result`` record (shaped like ``EvalRunResultItem``) per case in
+    input order, then a final ``summary`` record, or an ``error`` record if
+    the run fails part-way.
+    """
+    test_cases, suite_id = await session.run_sync(_case_source, payload)
+    run = await session.run_sync(
+        EvalRunner.submit_run,
+        prompt=payload.prompt,
+        target_model=payload.target_model,
+        test_cases=test_cases,
+        pass_threshold=payload.pass_threshold,
+        suite_id=suite_id,
+        project_id=project_id,
+        execution_options=payload.execution_options(),
+    )
+    records = _live_result_records(runner, run.id, payload.execution_options())
+    return stream_records(records, format)
+
+
+@router.post("/matrix", response_model=EvalMatrixResponse)
+async def run_matrix(
+    payload: EvalMatrixRequest,
+    session: AsyncSession = Depends(get_async_session),
+    project_id: str | None = Depends(get_project_id),
+    runner: EvalRunner = Depends(get_eval_runner),
+) -> EvalMatrixResponse:
+    """Run one case set against every prompt and target model and return the grid.
+
+    Cells run concurrently; ``max_concurrency`` applies per target model.
+    """
+    test_cases, suite_id = await session.run_sync(_case_source, payload)
+    matrix, runs = await session.run_sync(
+        EvalRunner.submit_matrix,
+        prompts=payload.prompts,
+        target_models=payload.target_models,
+        test_cases=test_cases,
+        pass_threshold=payload.pass_threshold,
+        suite_id=suite_id,
+        project_id=project_id,
+        execution_options=payload.execution_options(),
+    )
+    await execute_matrix(runner, runs, payload.execution_options())
+    return await _matrix_response(session, matrix.id)
+
+
+@router.post(
+    "/matrix/async",
+    response_model=EvalMatrixResponse,
+    status_code=http_status.HTTP_202_ACCEPTED,
+)
+async def submit_matrix(
+    payload: EvalMatrixRequest,
+    session: AsyncSession = Depends(get_async_session),
+    project_id: str | None = Depends(get_project_id),
+) -> EvalMatrixResponse:
+    """Persist the matrix with pending cells and return immediately.
+
+    Each cell is queued like a run submitted to ``/run/async``; poll
+    ``GET /matrix/{matrix_id}`` for progress.
+    """
+    distributed = get_settings().eval_queue_backend == "database"
+    if distributed and payload.early_stop:
+        raise HTTPException(status_code=400, detail="early_stop is not supported by the database work queue")
+
+    test_cases, suite_id = await session.run_sync(_case_source, payload)
+    matrix, runs = await session.run_sync(
+        EvalRunner.submit_matrix,
+        prompts=payload.prompts,
+        target_models=payload.target_models,
+        test_cases=test_cases,
+        pass_threshold=payload.pass_threshold,
+        suite_id=suite_id,
+        project_id=project_id,
+        execution_options=payload.execution_options(),
+    )
+    for run in runs:
+        if distributed:
+            await session.run_sync(enqueue_run, run.id, payload.execution_options())
+        else:
+            job_queue.submit(run.id, **payload.execution_options())
+    return await _matrix_response(session, matrix.id)
+
+
+@router.get("/matrix/{matrix_id}", response_model=EvalMatrixResponse)
+async def get_matrix(
+    matrix_id: uuid.UUID,
+    session: AsyncSession = Depends(get_async_session),
+    project_id: str | None = Depends(get_project_id),
+) -> EvalMatrixResponse:
+    return await _matrix_response(session, matrix_id)
+
+
+async def _matrix_response(session: AsyncSession, matrix_id: uuid.UUID) -> EvalMatrixResponse:
+    # Cells may have been written by other sessions since they were loaded.
+    session.expire_all()
+    matrix = await session.get(EvalMatrix, matrix_id)
+    if matrix is None:
+        raise HTTPException(status_code=404, detail="Matrix not found")
+
+    runs = list((await session.exec(select(TestRun).where(TestRun.matrix_id == matrix_id))).all())
+    prompt_index = {prompt_hash: index for index, prompt_hash in enumerate(matrix.prompt_hashes)}
+    model_index = {model: index for index, model in enumerate(matrix.target_models)}
+    runs.sort(key=lambda run: (prompt_index[run.prompt_hash], model_index[run.target_model]))
+
+    return EvalMatrixResponse(
+        matrix_id=str(matrix.id),
+        created_at=matrix.created_at.isoformat() if matrix.created_at else "",
+        status=matrix_status(runs),
+        prompt_count=len(matrix.prompt_hashes),
+        target_models=matrix.target_models,
+        total_cases=matrix.total_cases,
+        pass_threshold=matrix.pass_threshold,
+        cells=[
+            EvalMatrixCell(**_run_summary(run).model_dump(), prompt_index=prompt_index[run.prompt_hash])
+            for run in runs
+        ],
+    )
+
+
+def _case_source(session: Session, payload: EvalCaseSource) -> Tuple[List[Dict[str, Any]], Optional[uuid.UUID]]:
+    """Return the cases to run and, for stored suites, the suite id."""
+    if payload.test_cases is not None:
+        return [tc.model_dump() for tc in payload.test_cases], None
+
+    suite_id: Optional[uuid.UUID] = None
+    if payload.suite_id is not None:
+        try:
+            suite_id = uuid.UUID(payload.suite_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid suite_id")
+
+    suite = resolve_suite(session, suite_id=suite_id, name=payload.suite_name, version=payload.suite_version)
+    if suite is None:
+        raise HTTPException(status_code=404, detail="Suite not found")
+
+    test_cases = load_suite_cases(session, suite, tags=payload.suite_tags)
+    if not test_cases:
+        raise HTTPException(status_code=400, detail="No suite cases match the requested tags")
+    return test_cases, suite.id
+
+
 @router.get("/runs", response_model=EvalRunListResponse)
-def list_runs(
-    limit: int = 50,
-    offset: int = 0,
+async def list_runs(
+    limit: int = Query(default=50, ge=1, le=500),
+    offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(
+        default=None,
+        description="Opaque cursor from a previous page's next_cursor; replaces offset for constant-time deep paging.",
+    ),
+    count: Literal["exact", "estimated", "none"] = Query(
+        default="exact",
+        description="How to compute total: exact COUNT(*), a planner estimate (Postgres, unfiltered only), or skip it.",
+    ),
     status: Optional[str] = None,
     overall_pass: Optional[bool] = None,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_async_session),
     project_id: str | None = Depends(get_project_id),
 ) -> EvalRunListResponse:
-    statement = select(TestRun)
-
+    filters = []
     if status is not None:
-        statement = statement.where(TestRun.status == status)
+        filters.append(TestRun.status == status)
     if overall_pass is not None:
-        statement = statement.where(TestRun.overall_pass == overall_pass)
-
-    statement = statement.order_by(TestRun.created_at.desc())
-    all_runs: List[TestRun] = session.exec(statement).all()
-
-    total = len(all_runs)
-    window = all_runs[offset : offset + limit]
-
-    items: List[EvalRunSummary] = []
-    for run in window:
-        items.append(
-            EvalRunSummary(
-                id=str(run.id),
-                created_at=run.created_at.isoformat() if run.created_at else "",
-                status=run.status,
-                target_model=run.target_model,
-                total_cases=run.total_cases,
-                passed_cases=run.passed_cases,
-                average_score=run.average_score,
-                overall_pass=run.overall_pass,
-            )
-        )
+        filters.append(TestRun.overall_pass == overall_pass)
 
-    return EvalRunListResponse(items=items, total=total, limit=limit, offset=offset)
+    statement = select(TestRun).where(*filters)
+    if cursor is not None:
+        cursor_created_at, cursor_id = _decode_cursor(cursor)
+        statement = statement.where(tuple_(TestRun.created_at, TestRun.id) < tuple_(cursor_created_at, cursor_id))
+    else:
+        statement = statement.offset(offset)
+
+    # Fetch one extra row to learn whether another page exists.
+    statement = statement.order_by(TestRun.created_at.desc(), TestRun.id.desc()).limit(limit + 1)
+    runs: List[TestRun] = list((await session.exec(statement)).all())
+
+    next_cursor: Optional[str] = None
+    if len(runs) > limit:
+        runs = runs[:limit]
+        next_cursor = _encode_cursor(runs[-1])
+
+    items: List[EvalRunSummary] = [_run_summary(run) for run in runs]
+
+    return EvalRunListResponse(
+        items=items,
+        total=await _count_runs(session, filters, count),
+        limit=limit,
+        offset=offset if cursor is None else 0,
+        next_cursor=next_cursor,
+    )
+
+
+def _encode_cursor(run: TestRun) -> str:
+    raw = json.dumps([run.created_at.isoformat(), str(run.id)])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    try:
+        created_at, run_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(created_at), uuid.UUID(run_id)
+    except (ValueError, TypeError, UnicodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def _count_runs(session: AsyncSession, filters: List[Any], mode: str) -> Optional[int]:
+    if mode == "none":
+        return None
+
+    if mode == "estimated" and not filters and session.bind.dialect.name == "postgresql":
+        estimate = (
+            await session.execute(text("SELECT reltuples::bigint FROM pg_class WHERE oid = 'test_runs'::regclass"))
+        ).scalar()
+        # reltuples is -1 until the table has been analyzed.
+        if estimate is not None and estimate >= 0:
+            return int(estimate)
+
+    return (await session.exec(select(func.count()).select_from(TestRun).where(*filters))).one()
 
 
 @router.get("/runs/{run_id}", response_model=EvalRunDetailResponse)
-def get_run_detail(
-    run_id: str,
-    session: Session = Depends(get_session),
+async def get_run_detail(
+    run_id: uuid.UUID,
+    limit: Optional[int] = Query(default=None, ge=1, description="Maximum number of results to return (all by default)."),
+    offset: int = Query(default=0, ge=0),
+    passed: Optional[bool] = Query(default=None, description="Only return passed (true) or failed (false) cases."),
+    session: AsyncSession = Depends(get_async_session),
     project_id: str | None = Depends(get_project_id),
 ) -> EvalRunDetailResponse:
-    run = session.get(TestRun, run_id)
+    run = await session.get(TestRun, run_id)
     if not run:
         raise HTTPException(status_code=404, detail="Run not found")
 
-    # Ensure relationships are loaded
-    session.refresh(run)
-
-    results: List[EvalResultItem] = []
-
-    for case in run.cases:
-        session.refresh(case)
-        result: Optional[EvalResult] = case.eval_result
-        if not result:
-            continue
-
-        results.append(
-            EvalResultItem(
-                test_case_id=str(case.id),
-                input_text=case.input_text,
-                expected_output=case.expected_output,
-                model_output=result.model_output_text,
-                heuristic_score=result.heuristic_score,
-                judge_score=result.judge_score,
-                combined_score=result.combined_score,
-                passed=result.passed,
-                judge_reasoning=result.judge_reasoning,
-            )
-        )
+    statement = _results_statement(run.id, passed).offset(offset)
+    if limit is not None:
+        statement = statement.limit(limit)
+    rows = (await session.exec(statement)).all()
+    texts = await session.run_sync(_result_texts, rows)
+
+    results: List[EvalResultItem] = [_result_item(case, result, content, texts) for case, result, content in rows]
+
+    if limit is None and offset == 0:
+        results_total = len(results)
+    else:
+        count_statement = _results_statement(run.id, passed).order_by(None).with_only_columns(func.count())
+        results_total = (await session.execute(count_statement)).scalar_one()
 
     return EvalRunDetailResponse(
         id=str(run.id),
         created_at=run.created_at.isoformat() if run.created_at else "",
         status=run.status,
         target_model=run.target_model,
-        prompt=run.prompt,
+        prompt=await session.run_sync(get_text, run.prompt_hash),
         total_cases=run.total_cases,
+        completed_cases=run.completed_cases,
         passed_cases=run.passed_cases,
         average_score=run.average_score,
         overall_pass=run.overall_pass,
         pass_threshold=run.pass_threshold,
+        skipped_cases=run.skipped_cases,
+        stop_reason=run.stop_reason,
+        error=run.error,
+        suite_id=str(run.suite_id) if run.suite_id else None,
+        matrix_id=str(run.matrix_id) if run.matrix_id else None,
         results=results,
+        results_total=results_total,
+    )
+
+
+@router.get("/runs/{run_id}/stream")
+async def stream_run_detail(
+    run_id: uuid.UUID,
+    format: StreamFormat = Query(default="ndjson"),
+    passed: Optional[bool] = Query(default=None, description="Only stream passed (true) or failed (false) cases."),
+    session: AsyncSession = Depends(get_async_session),
+    project_id: str | None = Depends(get_project_id),
+) -> StreamingResponse:
+    """Stream a run's results as ``result`` records followed by a ``summary`` record.
+
+    Rows are fetched from the database in batches while the response is being
+    written, so large runs never have to be held in memory.
+    """
+    if await session.get(TestRun, run_id) is None:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return stream_records(_stored_result_records(run_id, passed), format)
+
+
+@router.get("/runs/{base_run_id}/compare/{candidate_run_id}", response_model=EvalRunComparisonResponse)
+async def compare_runs(
+    base_run_id: uuid.UUID,
+    candidate_run_id: uuid.UUID,
+    change: Optional[ComparisonChange] = Query(default=None, description="Only return cases with this change."),
+    order: ComparisonOrder = Query(default="position", description="Base run order, or largest score drop first."),
+    limit: Optional[int] = Query(default=None, ge=1, description="Maximum number of cases to return (all by default)."),
+    offset: int = Query(default=0, ge=0),
+    session: AsyncSession = Depends(get_async_session),
+    project_id: str | None = Depends(get_project_id),
+) -> EvalRunComparisonResponse:
+    """Compare two runs case by case, matching cases by input, expected output and metadata.
+
+    Returns each matched case's score delta and pass/fail change, and
+    statistics over all matched cases.
+    """
+    base, candidate = await _comparison_runs(session, base_run_id, candidate_run_id)
+
+    statement = comparison_statement(base.id, candidate.id, change, order).offset(offset)
+    if limit is not None:
+        statement = statement.limit(limit)
+    rows = (await session.execute(statement)).all()
+    texts = await session.run_sync(_comparison_texts, rows)
+    items = [_comparison_item(row, texts) for row in rows]
+
+    if limit is None and offset == 0:
+        items_total = len(items)
+    else:
+        items_total = (await session.execute(comparison_count_statement(base.id, candidate.id, change))).scalar_one()
+
+    return EvalRunComparisonResponse(
+        base=_run_summary(base),
+        candidate=_run_summary(candidate),
+        stats=await _comparison_stats(session, base, candidate),
+        items=items,
+        items_total=items_total,
+        limit=limit,
+        offset=offset,
+    )
+
+
+@router.get("/runs/{base_run_id}/compare/{candidate_run_id}/stream")
+async def stream_run_comparison(
+    base_run_id: uuid.UUID,
+    candidate_run_id: uuid.UUID,
+    format: StreamFormat = Query(default="ndjson"),
+    change: Optional[ComparisonChange] = Query(default=None, description="Only stream cases with this change."),
+    order: ComparisonOrder = Query(default="position"),
+    session: AsyncSession = Depends(get_async_session),
+    project_id: str | None = Depends(get_project_id),
+) -> StreamingResponse:
+    """Stream a comparison as ``result`` records followed by a ``summary`` record with the statistics."""
+    await _comparison_runs(session, base_run_id, candidate_run_id)
+    return stream_records(_comparison_records(base_run_id, candidate_run_id, change, order), format)
+
+
+async def _comparison_runs(
+    session: AsyncSession, base_run_id: uuid.UUID, candidate_run_id: uuid.UUID
+) -> Tuple[TestRun, TestRun]:
+    base = await session.get(TestRun, base_run_id)
+    candidate = await session.get(TestRun, candidate_run_id)
+    if base is None or candidate is None:
+        raise HTTPException(status_code=404, detail="Run not found")
+    return base, candidate
+
+
+async def _comparison_stats(session: AsyncSession, base: TestRun, candidate: TestRun) -> EvalComparisonStats:
+    row = (await session.execute(comparison_stats_statement(base.id, candidate.id))).one()
+    matched, failing, passing, improved, worsened, base_average, candidate_average = row
+    return EvalComparisonStats(
+        matched_cases=matched,
+        base_cases=base.completed_cases,
+        candidate_cases=candidate.completed_cases,
+        newly_failing=failing,
+        newly_passing=passing,
+        improved_cases=improved,
+        worsened_cases=worsened,
+        base_average_score=base_average or 0.0,
+        candidate_average_score=candidate_average or 0.0,
+        mean_score_delta=(candidate_average or 0.0) - (base_average or 0.0),
+    )
+
+
+def _comparison_texts(session: Session, rows: List[Any]) -> Dict[str, str]:
+    """Load both runs' outputs for a page of comparison rows in one query."""
+    return get_texts(
+        session,
+        [key for _, base, _, candidate, _ in rows for key in (base.model_output_hash, candidate.model_output_hash)],
+    )
+
+
+def _comparison_item(row: Any, texts: Dict[str, str]) -> EvalComparisonItem:
+    base_case, base, candidate_case, candidate, content = row
+    if base.passed == candidate.passed:
+        change = "unchanged"
+    else:
+        change = "newly_passing" if candidate.passed else "newly_failing"
+    return EvalComparisonItem(
+        content_hash=content.hash,
+        input_text=content.input_text,
+        expected_output=content.expected_output,
+        change=change,
+        score_delta=candidate.combined_score - base.combined_score,
+        base_test_case_id=str(base_case.id),
+        candidate_test_case_id=str(candidate_case.id),
+        base_score=base.combined_score,
+        candidate_score=candidate.combined_score,
+        base_passed=base.passed,
+        candidate_passed=candidate.passed,
+        base_model_output=texts[base.model_output_hash],
+        candidate_model_output=texts[candidate.model_output_hash],
     )
+
+
+async def _comparison_records(
+    base_run_id: uuid.UUID,
+    candidate_run_id: uuid.UUID,
+    change: Optional[ComparisonChange],
+    order: ComparisonOrder,
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    async with new_async_session() as session:
+        statement = comparison_statement(base_run_id, candidate_run_id, change, order).execution_options(
+            yield_per=get_settings().db_bulk_chunk_size
+        )
+        result = await session.stream(statement)
+        async for rows in result.partitions():
+            texts = await session.run_sync(_comparison_texts, rows)
+            for row in rows:
+                yield "result", _comparison_item(row, texts).model_dump()
+
+        base, candidate = await _comparison_runs(session, base_run_id, candidate_run_id)
+        yield "summary", (await _comparison_stats(session, base, candidate)).model_dump()
+
+
+def _results_statement(run_id: uuid.UUID, passed: Optional[bool]) -> Any:
+    # Cases and their results come back from one joined query, filtered and
+    # ordered in SQL, instead of lazy-loading each case's result.
+    filters = [TestCase.run_id == run_id]
+    if passed is not None:
+        filters.append(EvalResult.passed == passed)
+    return (
+        select(TestCase, EvalResult, CaseContent)
+        .join(EvalResult, EvalResult.test_case_id == TestCase.id)
+        .outerjoin(CaseContent, CaseContent.hash == TestCase.content_hash)
+        .where(*filters)
+        .order_by(TestCase.position)
+    )
+
+
+def _result_texts(session: Session, rows: List[Tuple[TestCase, EvalResult, Optional[CaseContent]]]) -> Dict[str, str]:
+    """Load the output and reasoning blobs of a page of result rows in one query."""
+    return get_texts(
+        session,
+        [key for _, result, _ in rows for key in (result.model_output_hash, result.judge_reasoning_hash)],
+    )
+
+
+def _result_item(
+    case: TestCase,
+    result: EvalResult,
+    content: Optional[CaseContent],
+    texts: Dict[str, str],
+) -> EvalResultItem:
+    # Suite-run cases keep their text in the shared content row.
+    source = content if content is not None else case
+    return EvalResultItem(
+        test_case_id=str(case.id),
+        input_text=source.input_text,
+        expected_output=source.expected_output,
+        model_output=texts[result.model_output_hash],
+        heuristic_score=result.heuristic_score,
+        judge_score=result.judge_score,
+        combined_score=result.combined_score,
+        passed=result.passed,
+        judge_reasoning=texts[result.judge_reasoning_hash],
+        judge_skipped=result.judge_skipped,
+        reused_from_result_id=str(result.reused_from_result_id) if result.reused_from_result_id else None,
+        target_ms=result.target_ms,
+        judge_ms=result.judge_ms,
+        heuristic_ms=result.heuristic_ms,
+        judge_tokens=result.judge_tokens,
+    )
+
+
+def _run_summary(run: TestRun) -> EvalRunSummary:
+    return EvalRunSummary(
+        id=str(run.id),
+        created_at=run.created_at.isoformat() if run.created_at else "",
+        status=run.status,
+        target_model=run.target_model,
+        total_cases=run.total_cases,
+        completed_cases=run.completed_cases,
+        passed_cases=run.passed_cases,
+        average_score=run.average_score,
+        overall_pass=run.overall_pass,
+        skipped_cases=run.skipped_cases,
+        error=run.error,
+        suite_id=str(run.suite_id) if run.suite_id else None,
+        matrix_id=str(run.matrix_id) if run.matrix_id else None,
+    )
+
+
+def _stream_summary(run: TestRun) -> EvalRunStreamSummary:
+    return EvalRunStreamSummary(
+        run_id=str(run.id),
+        status=run.status,
+        overall_pass=run.overall_pass,
+        average_score=run.average_score,
+        total_cases=run.total_cases,
+        passed_cases=run.passed_cases,
+        pass_threshold=run.pass_threshold,
+        skipped_cases=run.skipped_cases,
+        stop_reason=run.stop_reason,
+    )
+
+
+async def _live_result_records(
+    runner: EvalRunner,
+    run_id: uuid.UUID,
+    options: Dict[str, Any],
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    # The request-scoped session is closed before a streaming body is sent,
+    # so the generator owns its own session.
+    async with new_async_session() as session:
+        try:
+            async for item in runner.aiter_execute_run(session, run_id, **options):
+                yield "result", EvalRunResultItem(**item).model_dump()
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("Streamed eval run %s failed", run_id)
+            await session.run_sync(EvalRunner.fail_run, run_id, exc)
+            yield "error", {"run_id": str(run_id), "detail": str(exc)}
+            return
+        except BaseException:
+            # The client disconnected: the response task was cancelled or the
+            # stream closed. Nothing else will finish the run, so fail it
+            # (shielded, as the surrounding scope is being cancelled).
+            logger.warning("Client disconnected from streamed eval run %s", run_id)
+            with anyio.CancelScope(shield=True):
+                await session.run_sync(EvalRunner.fail_run, run_id, RuntimeError("client disconnected"))
+            raise
+
+        yield "summary", _stream_summary(await session.get(TestRun, run_id)).model_dump()
+
+
+async def _stored_result_records(run_id: uuid.UUID, passed: Optional[bool]) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    async with new_async_session() as session:
+        statement = _results_statement(run_id, passed).execution_options(yield_per=get_settings().db_bulk_chunk_size)
+        result = await session.stream(statement)
+        async for rows in result.partitions():
+            texts = await session.run_sync(_result_texts, rows)
+            for case, result_row, content in rows:
+                yield "result", _result_item(case, result_row, content, texts).model_dump()
+
+        yield "summary", _run_summary(await session.get(TestRun, run_id)).model_dump()
+
+
+@router.get("/judge-cache/stats", response_model=JudgeCacheStats)
+def get_judge_cache_stats(
+    project_id: str | None = Depends(get_project_id),
+) -> JudgeCacheStats:
+    return JudgeCacheStats(**judge_cache.stats())
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+from datetime import date
+from typing import Any, List, Literal, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from ...database import get_session
+from ...models import RunStatsDaily, ScoreHistogramDaily
+from ..schemas import (
+    RunStatsItem,
+    RunStatsResponse,
+    ScoreHistogramBucket,
+    ScoreHistogramResponse,
+)
+from ...services.rollups import HISTOGRAM_BUCKETS
+
+
+router = APIRouter()
+
+StatsDimension = Literal["day", "target_model", "project_id"]
+
+
+@router.get("", response_model=RunStatsResponse)
+def get_run_stats(
+    group_by: List[StatsDimension] = Query(default=["day", "target_model"]),
+    target_model: Optional[str] = None,
+    project_id: Optional[str] = Query(default=None, description='Filter to one project; "" selects runs without one.'),
+    since: Optional[date] = Query(default=None, description="First day to include (UTC)."),
+    until: Optional[date] = Query(default=None, description="Last day to include (UTC)."),
+    session: Session = Depends(get_session),
+) -> RunStatsResponse:
+    """Pass rates and average scores of completed runs, grouped by any of day, target model and project.
+
+    Reads only the pre-aggregated ``run_stats_daily`` rows, so the cost depends
+    on the number of groups rather than on run history.
+    """
+    dimensions = list(dict.fromkeys(group_by))
+    columns = [getattr(RunStatsDaily, dimension) for dimension in dimensions]
+    statement = (
+        select(
+            *columns,
+            func.sum(RunStatsDaily.runs),
+            func.sum(RunStatsDaily.passed_runs),
+            func.sum(RunStatsDaily.cases),
+            func.sum(RunStatsDaily.passed_cases),
+            func.sum(RunStatsDaily.score_sum),
+        )
+        .where(*_filters(RunStatsDaily, target_model, project_id, since, until))
+        .group_by(*columns)
+        .order_by(*columns)
+    )
+
+    items: List[RunStatsItem] = []
+    for row in session.exec(statement):
+        keys = dict(zip(dimensions, row[: len(dimensions)]))
+        runs, passed_runs, cases, passed_cases, score_sum = row[len(dimensions) :]
+        if "day" in keys:
+            keys["day"] = keys["day"].isoformat()
+        items.append(
+            RunStatsItem(
+                **keys,
+                runs=runs,
+                passed_runs=passed_runs,
+                run_pass_rate=passed_runs / runs if runs else 0.0,
+                cases=cases,
+                passed_cases=passed_cases,
+                case_pass_rate=passed_cases / cases if cases else 0.0,
+                average_score=score_sum / cases if cases else 0.0,
+            )
+        )
+    return RunStatsResponse(items=items)
+
+
+@router.get("/histogram", response_model=ScoreHistogramResponse)
+def get_score_histogram(
+    target_model: Optional[str] = None,
+    project_id: Optional[str] = Query(default=None, description='Filter to one project; "" selects runs without one.'),
+    since: Optional[date] = Query(default=None),
+    until: Optional[date] = Query(default=None),
+    session: Session = Depends(get_session),
+) -> ScoreHistogramResponse:
+    """Distribution of per-case combined scores across completed runs."""
+    statement = (
+        select(ScoreHistogramDaily.bucket, func.sum(ScoreHistogramDaily.cases))
+        .where(*_filters(ScoreHistogramDaily, target_model, project_id, since, until))
+        .group_by(ScoreHistogramDaily.bucket)
+    )
+    counts = dict(session.exec(statement).all())
+
+    buckets = [
+        ScoreHistogramBucket(
+            lower=index / HISTOGRAM_BUCKETS,
+            upper=(index + 1) / HISTOGRAM_BUCKETS,
+            cases=counts.get(index, 0),
+        )
+        for index in range(HISTOGRAM_BUCKETS)
+    ]
+    return ScoreHistogramResponse(buckets=buckets, total_cases=sum(bucket.cases for bucket in buckets))
+
+
+def _filters(
+    model: Any,
+    target_model: Optional[str],
+    project_id: Optional[str],
+    since: Optional[date],
+    until: Optional[date],
+) -> List[Any]:
+    filters = []
+    if target_model is not None:
+        filters.append(model.target_model == target_model)
+    if project_id is not None:
+        filters.append(model.project_id == project_id)
+    if since is not None:
+        filters.append(model.day >= since)
+    if until is not None:
+        filters.append(model.day <= until)
+    return filters
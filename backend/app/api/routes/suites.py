@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import uuid
+from typing import AsyncIterator, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status as http_status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+
+from ...core.config import get_settings
+from ...database import get_session
+from ...models import TestSuite
+from ..schemas import TestSuiteListResponse, TestSuiteSummary, TestSuiteUploadResponse
+from ...services.test_suites import SuiteFormatError, SuiteImporter
+from ...core.security import get_project_id
+
+
+router = APIRouter()
+
+
+@router.post("", response_model=TestSuiteUploadResponse, status_code=http_status.HTTP_201_CREATED)
+async def upload_suite(
+    request: Request,
+    name: str = Query(..., min_length=1, description="Suite name; uploading an existing name adds a new version."),
+    description: Optional[str] = Query(default=None),
+    session: Session = Depends(get_session),
+    project_id: str | None = Depends(get_project_id),
+) -> TestSuiteUploadResponse:
+    """Store a suite sent as a JSONL request body (one test case per line).
+
+    The body is consumed as it arrives and written in chunks, so suites of any
+    size are never held in memory. Each line is an object with ``input`` and
+    optional ``expected_output``, ``metadata`` and ``tags``.
+    """
+    chunk_size = max(1, get_settings().db_bulk_chunk_size)
+    try:
+        importer = await run_in_threadpool(SuiteImporter, session, name=name, description=description)
+        lines: List[bytes] = []
+        async for line in _iter_lines(request.stream()):
+            lines.append(line)
+            if len(lines) >= chunk_size:
+                await run_in_threadpool(importer.add_lines, lines)
+                lines = []
+        await run_in_threadpool(importer.add_lines, lines)
+        suite = await run_in_threadpool(importer.finish)
+    except SuiteFormatError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail="Suite version was created concurrently; retry the upload")
+
+    return TestSuiteUploadResponse(**_suite_summary(suite).model_dump(), new_contents=importer.new_contents)
+
+
+@router.get("", response_model=TestSuiteListResponse)
+def list_suites(
+    name: Optional[str] = None,
+    limit: int = Query(default=50, ge=1, le=500),
+    offset: int = Query(default=0, ge=0),
+    session: Session = Depends(get_session),
+    project_id: str | None = Depends(get_project_id),
+) -> TestSuiteListResponse:
+    statement = select(TestSuite)
+    if name is not None:
+        statement = statement.where(TestSuite.name == name)
+    statement = statement.order_by(TestSuite.created_at.desc(), TestSuite.id.desc()).offset(offset).limit(limit)
+    return TestSuiteListResponse(items=[_suite_summary(suite) for suite in session.exec(statement)])
+
+
+@router.get("/{suite_id}", response_model=TestSuiteSummary)
+def get_suite(
+    suite_id: uuid.UUID,
+    session: Session = Depends(get_session),
+    project_id: str | None = Depends(get_project_id),
+) -> TestSuiteSummary:
+    suite = session.get(TestSuite, suite_id)
+    if suite is None:
+        raise HTTPException(status_code=404, detail="Suite not found")
+    return _suite_summary(suite)
+
+
+def _suite_summary(suite: TestSuite) -> TestSuiteSummary:
+    return TestSuiteSummary(
+        id=str(suite.id),
+        name=suite.name,
+        version=suite.version,
+        description=suite.description,
+        case_count=suite.case_count,
+        created_at=suite.created_at.isoformat() if suite.created_at else "",
+    )
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line
+    if pending:
+        yield pending
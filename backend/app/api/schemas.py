@@ -2,9 +2,11 @@ from __future__ import annotations
 
 from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator, model_validator
 
-from ..services.eval_runner import DEFAULT_PASS_THRESHOLD
+from ..services.eval_runner import DEFAULT_EARLY_STOP_CONFIDENCE, DEFAULT_PASS_THRESHOLD
+from ..services.heuristics import SCORERS, resolve_scorer
+from ..services.scoring_cascade import TIERS, parse_tiers
 
 
 # Request / response schemas for eval runs
@@ -18,20 +20,132 @@ class EvalTestCase(BaseModel):
     )
     metadata: Optional[Dict[str, Any]] = Field(
         default=None,
-        description="Optional metadata for this test case (e.g., tags, scenario).",
+        description=(
+            "Optional metadata for this test case (e.g., tags, scenario). "
+            f"'scorer' selects the heuristic ({', '.join(SCORERS)}; default contains), "
+            "either by name or as an object with a 'name' and the scorer's parameters."
+        ),
     )
 
+    @field_validator("metadata")
+    @classmethod
+    def _check_scorer(cls, value: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        resolve_scorer(value)
+        return value
+
+
+class EvalRunOptions(BaseModel):
+    """Scoring and execution options shared by single runs and matrix cells."""
 
-class EvalRunRequest(BaseModel):
-    prompt: str = Field(..., description="System prompt / instructions for the model.")
-    target_model: str = Field(..., description="Identifier of the target model under test.")
     pass_threshold: float = Field(
         default=DEFAULT_PASS_THRESHOLD,
         ge=0.0,
         le=1.0,
         description="Minimum combined score required to mark a test as passed.",
     )
-    test_cases: List[EvalTestCase]
+    max_concurrency: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Maximum number of cases evaluated in parallel for this run (defaults to EVAL_MAX_CONCURRENCY).",
+    )
+    use_judge_cache: bool = Field(
+        default=True,
+        description="Reuse cached judge verdicts for byte-identical cases; set to false to force fresh judge calls.",
+    )
+    early_stop: bool = Field(
+        default=False,
+        description=(
+            "Evaluate cases in random order and stop once the mean combined score is statistically "
+            "settled above or below pass_threshold; remaining cases are recorded as skipped."
+        ),
+    )
+    early_stop_confidence: float = Field(
+        default=DEFAULT_EARLY_STOP_CONFIDENCE,
+        gt=0.0,
+        lt=1.0,
+        description="Confidence level of the sequential bound used by early_stop.",
+    )
+    incremental: bool = Field(
+        default=False,
+        description=(
+            "Reuse the most recent result of an earlier run for cases with identical prompt, target model, "
+            "input, expected output and metadata, scored with the same judge model, judge prompt and scoring "
+            "cascade; only new or changed cases are evaluated."
+        ),
+    )
+    scoring_cascade: Optional[List[str]] = Field(
+        default=None,
+        description=(
+            f"Tiers that may settle a case without a judge call, tried in order ({', '.join(TIERS)}). "
+            "Defaults to SCORING_CASCADE; an empty list judges every case."
+        ),
+    )
+
+    @field_validator("scoring_cascade")
+    @classmethod
+    def _check_scoring_cascade(cls, value: Optional[List[str]]) -> Optional[List[str]]:
+        return None if value is None else parse_tiers(value)
+
+    def execution_options(self) -> Dict[str, Any]:
+        """Per-run options forwarded to ``EvalRunner`` execution methods."""
+        return {
+            "max_concurrency": self.max_concurrency,
+            "use_judge_cache": self.use_judge_cache,
+            "early_stop": self.early_stop,
+            "early_stop_confidence": self.early_stop_confidence,
+            "incremental": self.incremental,
+            "scoring_cascade": self.scoring_cascade,
+        }
+
+
+class EvalCaseSource(BaseModel):
+    """The cases to run: inline ``test_cases`` or a stored suite."""
+
+    test_cases: Optional[List[EvalTestCase]] = Field(
+        default=None,
+        description="Inline test cases; omit when running a stored suite.",
+    )
+    suite_id: Optional[str] = Field(default=None, description="Run the cases of this stored suite version.")
+    suite_name: Optional[str] = Field(
+        default=None,
+        description="Run a stored suite by name instead of id (latest version unless suite_version is set).",
+    )
+    suite_version: Optional[int] = Field(default=None, ge=1, description="Suite version to use with suite_name.")
+    suite_tags: Optional[List[str]] = Field(
+        default=None,
+        description="Only run suite cases carrying at least one of these tags.",
+    )
+
+    @model_validator(mode="after")
+    def _check_case_source(self) -> "EvalCaseSource":
+        sources = [self.test_cases is not None, self.suite_id is not None, self.suite_name is not None]
+        if sum(sources) != 1:
+            raise ValueError("Provide exactly one of test_cases, suite_id or suite_name")
+        if self.suite_version is not None and self.suite_name is None:
+            raise ValueError("suite_version requires suite_name")
+        return self
+
+
+class EvalRunRequest(EvalRunOptions, EvalCaseSource):
+    prompt: str = Field(..., description="System prompt / instructions for the model.")
+    target_model: str = Field(..., description="Identifier of the target model under test.")
+
+
+class EvalMatrixRequest(EvalRunOptions, EvalCaseSource):
+    """One case set run against every combination of ``prompts`` and ``target_models``.
+
+    Each combination is an ordinary run; ``max_concurrency`` caps the cases
+    in flight per target model across its runs.
+    """
+
+    prompts: List[str] = Field(..., min_length=1, description="System prompts; each is run against every target model.")
+    target_models: List[str] = Field(..., min_length=1, description="Identifiers of the target models under test.")
+
+    @model_validator(mode="after")
+    def _check_unique(self) -> "EvalMatrixRequest":
+        if len(set(self.prompts)) != len(self.prompts) or len(set(self.target_models)) != len(self.target_models):
+            raise ValueError("prompts and target_models must not contain duplicates")
+        return self
 
 
 class EvalRunResultItem(BaseModel):
@@ -44,6 +158,12 @@ class EvalRunResultItem(BaseModel):
     combined_score: float
     passed: bool
     judge_reasoning: str
+    judge_skipped: Optional[str] = None
+    reused_from_result_id: Optional[str] = None
+    target_ms: Optional[float] = None
+    judge_ms: Optional[float] = None
+    heuristic_ms: Optional[float] = None
+    judge_tokens: Optional[int] = None
 
 
 class EvalRunResponse(BaseModel):
@@ -53,9 +173,31 @@ class EvalRunResponse(BaseModel):
     total_cases: int
     passed_cases: int
     pass_threshold: float
+    skipped_cases: int = 0
+    stop_reason: Optional[str] = None
     results: List[EvalRunResultItem]
 
 
+class EvalRunStreamSummary(BaseModel):
+    """Final record of a streamed run; the per-case results precede it."""
+
+    run_id: str
+    status: str
+    overall_pass: bool
+    average_score: float
+    total_cases: int
+    passed_cases: int
+    pass_threshold: float
+    skipped_cases: int = 0
+    stop_reason: Optional[str] = None
+
+
+class EvalRunSubmitResponse(BaseModel):
+    run_id: str
+    status: str
+    total_cases: int
+
+
 # Listing / summary schemas
 
 
@@ -65,16 +207,40 @@ class EvalRunSummary(BaseModel):
     status: str
     target_model: str
     total_cases: int
+    completed_cases: int
     passed_cases: int
     average_score: float
     overall_pass: bool
+    skipped_cases: int = 0
+    error: Optional[str] = None
+    suite_id: Optional[str] = None
+    matrix_id: Optional[str] = None
 
 
 class EvalRunListResponse(BaseModel):
     items: List[EvalRunSummary]
-    total: int
+    total: Optional[int]
     limit: int
     offset: int
+    next_cursor: Optional[str] = None
+
+
+# Matrix runs
+
+
+class EvalMatrixCell(EvalRunSummary):
+    prompt_index: int = Field(description="Position of the cell's prompt in the matrix's prompts.")
+
+
+class EvalMatrixResponse(BaseModel):
+    matrix_id: str
+    created_at: str
+    status: str = Field(description="pending, running, completed, or failed once every cell is done and one failed.")
+    prompt_count: int
+    target_models: List[str]
+    total_cases: int = Field(description="Cases per cell.")
+    pass_threshold: float
+    cells: List[EvalMatrixCell] = Field(description="One run per prompt and target model, prompt-major.")
 
 
 # Detailed run view
@@ -90,6 +256,12 @@ class EvalResultItem(BaseModel):
     combined_score: float
     passed: bool
     judge_reasoning: str
+    judge_skipped: Optional[str] = None
+    reused_from_result_id: Optional[str] = None
+    target_ms: Optional[float] = None
+    judge_ms: Optional[float] = None
+    heuristic_ms: Optional[float] = None
+    judge_tokens: Optional[int] = None
 
 
 class EvalRunDetailResponse(BaseModel):
@@ -99,11 +271,119 @@ class EvalRunDetailResponse(BaseModel):
     target_model: str
     prompt: str
     total_cases: int
+    completed_cases: int
     passed_cases: int
     average_score: float
     overall_pass: bool
     pass_threshold: float
+    skipped_cases: int = 0
+    stop_reason: Optional[str] = None
+    error: Optional[str] = None
+    suite_id: Optional[str] = None
+    matrix_id: Optional[str] = None
     results: List[EvalResultItem]
+    results_total: int = Field(description="Number of results matching the filters, ignoring limit/offset.")
+
+
+# Run comparison
+
+
+class EvalComparisonItem(BaseModel):
+    content_hash: str
+    input_text: str
+    expected_output: Optional[str]
+    change: str = Field(description="newly_failing, newly_passing or unchanged (same pass/fail verdict).")
+    score_delta: float = Field(description="Candidate combined score minus base combined score.")
+    base_test_case_id: str
+    candidate_test_case_id: str
+    base_score: float
+    candidate_score: float
+    base_passed: bool
+    candidate_passed: bool
+    base_model_output: str
+    candidate_model_output: str
+
+
+class EvalComparisonStats(BaseModel):
+    matched_cases: int = Field(description="Cases scored in both runs, matched by content hash.")
+    base_cases: int = Field(description="Cases scored in the base run.")
+    candidate_cases: int = Field(description="Cases scored in the candidate run.")
+    newly_failing: int
+    newly_passing: int
+    improved_cases: int = Field(description="Matched cases whose combined score went up.")
+    worsened_cases: int = Field(description="Matched cases whose combined score went down.")
+    base_average_score: float = Field(description="Mean combined score of the base run over matched cases.")
+    candidate_average_score: float = Field(description="Mean combined score of the candidate run over matched cases.")
+    mean_score_delta: float
+
+
+class EvalRunComparisonResponse(BaseModel):
+    base: EvalRunSummary
+    candidate: EvalRunSummary
+    stats: EvalComparisonStats
+    items: List[EvalComparisonItem]
+    items_total: int = Field(description="Number of matched cases passing the filters, ignoring limit/offset.")
+    limit: Optional[int]
+    offset: int
+
+
+# Stored test suites
+
+
+class TestSuiteSummary(BaseModel):
+    id: str
+    name: str
+    version: int
+    description: Optional[str]
+    case_count: int
+    created_at: str
+
+
+class TestSuiteUploadResponse(TestSuiteSummary):
+    new_contents: int = Field(description="Distinct cases stored for the first time; the rest were already known.")
+
+
+class TestSuiteListResponse(BaseModel):
+    items: List[TestSuiteSummary]
+
+
+# Dashboard stats (served from the rollup tables)
+
+
+class RunStatsItem(BaseModel):
+    day: Optional[str] = None
+    target_model: Optional[str] = None
+    project_id: Optional[str] = None
+    runs: int
+    passed_runs: int
+    run_pass_rate: float
+    cases: int
+    passed_cases: int
+    case_pass_rate: float
+    average_score: float
+
+
+class RunStatsResponse(BaseModel):
+    items: List[RunStatsItem]
+
+
+class ScoreHistogramBucket(BaseModel):
+    lower: float
+    upper: float
+    cases: int
+
+
+class ScoreHistogramResponse(BaseModel):
+    buckets: List[ScoreHistogramBucket]
+    total_cases: int
+
+
+class JudgeCacheStats(BaseModel):
+    memory_hits: int
+    persistent_hits: int
+    misses: int
+    evictions: int
+    memory_entries: int
 
 
 class ErrorResponse(BaseModel):
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import json
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, Literal, Tuple, Union
+
+from fastapi.responses import StreamingResponse
+
+
+StreamFormat = Literal["ndjson", "sse"]
+
+_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+
+
+def encode_record(kind: str, data: Dict[str, Any], fmt: StreamFormat) -> str:
+    """Frame one record as an NDJSON line or a Server-Sent Event.
+
+    NDJSON records look like ``{"type": kind, "data": {...}}``; SSE records use
+    ``kind`` as the event name and the JSON payload as data.
+    """
+    if fmt == "sse":
+        return f"event: {kind}\ndata: {json.dumps(data)}\n\n"
+    return json.dumps({"type": kind, "data": data}) + "\n"
+
+
+Records = Union[Iterable[Tuple[str, Dict[str, Any]]], AsyncIterable[Tuple[str, Dict[str, Any]]]]
+
+
+def stream_records(records: Records, fmt: StreamFormat) -> StreamingResponse:
+    """Wrap ``(kind, data)`` records in a streaming response of the given format.
+
+    Sync iterables are drained in Starlette's threadpool; async ones on the
+    event loop.
+    """
+    if not hasattr(records, "__aiter__"):
+        return _response((encode_record(kind, data, fmt) for kind, data in records), fmt)
+
+    async def body() -> AsyncIterator[str]:
+        try:
+            async for kind, data in records:
+                yield encode_record(kind, data, fmt)
+        finally:
+            # Close the source right away when the client disconnects,
+            # instead of whenever it is garbage-collected.
+            aclose = getattr(records, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    return _response(body(), fmt)
+
+
+def _response(body: Union[Iterable[str], AsyncIterable[str]], fmt: StreamFormat) -> StreamingResponse:
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    return StreamingResponse(body, media_type=_MEDIA_TYPES[fmt], headers=headers)
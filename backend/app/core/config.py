@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from functools import lru_cache
+from typing import Literal
 
 from pydantic_settings import BaseSettings
 
@@ -10,10 +11,120 @@ class Settings(BaseSettings):
 
     API_KEY: Optional shared secret used for simple header-based auth.
     If API_KEY is not set, auth is effectively disabled (for local dev).
+
+    EVAL_MAX_CONCURRENCY: Default number of cases a single run evaluates in
+    parallel when the request does not specify its own cap.
+    EVAL_GLOBAL_CONCURRENCY: Process-wide ceiling on in-flight case
+    evaluations, shared by every run.
+    DB_BULK_CHUNK_SIZE: Number of rows sent per executemany when persisting
+    test cases and results in bulk.
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT_SECONDS: Connection pool
+    of each database engine (ignored for SQLite). The eval routes use the
+    asyncio engine, so a request only holds a connection while it talks to
+    the database, not for the whole evaluation.
+    DB_AUTO_MIGRATE: Whether the API and workers apply pending schema
+    migrations on startup; when false they refuse to start until
+    ``python -m app.migrations`` has been run.
+    EVAL_WORKER_COUNT: Number of background threads draining runs submitted
+    through the asynchronous run endpoint.
+    EVAL_SHUTDOWN_TIMEOUT_SECONDS: How long shutdown waits for the runs those
+    threads are executing; queued runs are left ``pending`` for the next
+    start, and runs still executing after the wait are resumed then.
+    EVAL_PROGRESS_FLUSH_SIZE: Number of scored cases buffered before a
+    background run writes results and updates its progress counter.
+    EARLY_STOP_MIN_CASES: Cases an early-stopping run always evaluates before
+    its confidence bound is consulted.
+    SCORING_CASCADE: Comma-separated tiers (``exact_match``, ``empty_output``,
+    ``score_bounds``) that may settle a case before the judge is called,
+    used when a run does not list its own. Empty judges every case.
+    EVAL_QUEUE_BACKEND: Where asynchronous runs are executed: ``thread`` (the
+    API process's background threads) or ``database`` (standalone workers
+    started with ``python -m app.worker`` claim cases from the ``case_jobs``
+    table; use Postgres for more than one worker).
+    WORKER_CLAIM_SIZE: Cases a worker claims per transaction.
+    WORKER_POLL_SECONDS: Idle wait before a worker polls for work again.
+    WORKER_HEARTBEAT_SECONDS: Interval at which workers refresh the lease on
+    their claimed cases.
+    WORKER_LEASE_SECONDS: Age of the last heartbeat after which claimed cases
+    are considered abandoned and re-queued.
+    WORKER_MAX_ATTEMPTS: Attempts per case before its run is marked failed.
+    JUDGE_MODEL: Judge model used when a run does not name one.
+    JUDGE_BASE_URL: OpenAI-compatible endpoint of the judge (defaults to
+    OPENAI_BASE_URL, then the OpenAI API).
+    JUDGE_TIMEOUT_SECONDS, JUDGE_MAX_CONNECTIONS, JUDGE_KEEPALIVE_SECONDS:
+    Request timeout, keep-alive pool size and idle-connection lifetime of
+    the process-wide client of each judge model.
+    JUDGE_CACHE_MAX_ENTRIES: Size of the in-process LRU of judge verdicts
+    (0 disables the memory tier).
+    JUDGE_CACHE_TTL_SECONDS: Age after which cached verdicts are ignored and
+    purged (0 keeps them forever).
+    JUDGE_CACHE_PERSISTENT: Whether verdicts are also stored in the database.
+    JUDGE_BATCH_SIZE: Number of cases packed into one judge request (1 sends
+    one request per case). Target calls are still made per case.
+    JUDGE_REQUESTS_PER_MINUTE / JUDGE_TOKENS_PER_MINUTE: Request and token
+    budgets per judge model (0 learns them from rate-limit response headers).
+    JUDGE_MAX_CONCURRENCY: Upper bound for the adaptive number of in-flight
+    judge requests per judge model.
+    JUDGE_MAX_RETRIES, JUDGE_BACKOFF_BASE_SECONDS, JUDGE_BACKOFF_MAX_SECONDS:
+    Retry policy for rate limits and transient judge errors.
+
+    Target-model providers are selected by the ``target_model`` prefix
+    (``openai:<model>``, ``http:<model>``; anything else uses the stub):
+    TARGET_OPENAI_BASE_URL / TARGET_OPENAI_API_KEY: OpenAI-compatible endpoint
+    (the key falls back to OPENAI_API_KEY).
+    TARGET_HTTP_URL: URL of a generic JSON model service.
+    TARGET_TIMEOUT_SECONDS, TARGET_MAX_CONNECTIONS, TARGET_MAX_CONCURRENCY:
+    Per-provider request timeout, keep-alive pool size and in-flight cap.
     """
 
     api_key: str | None = None
 
+    eval_max_concurrency: int = 8
+    eval_global_concurrency: int = 32
+
+    db_bulk_chunk_size: int = 500
+    db_pool_size: int = 20
+    db_max_overflow: int = 40
+    db_pool_timeout_seconds: float = 30.0
+    db_auto_migrate: bool = True
+
+    eval_worker_count: int = 2
+    eval_shutdown_timeout_seconds: float = 30.0
+    eval_progress_flush_size: int = 50
+    early_stop_min_cases: int = 10
+    scoring_cascade: str = ""
+
+    eval_queue_backend: Literal["thread", "database"] = "thread"
+    worker_claim_size: int = 50
+    worker_poll_seconds: float = 1.0
+    worker_heartbeat_seconds: float = 10.0
+    worker_lease_seconds: float = 60.0
+    worker_max_attempts: int = 3
+
+    judge_model: str = "gpt-4o-mini"
+    judge_base_url: str | None = None
+    judge_timeout_seconds: float = 120.0
+    judge_max_connections: int = 64
+    judge_keepalive_seconds: float = 30.0
+
+    judge_cache_max_entries: int = 10_000
+    judge_cache_ttl_seconds: int = 0
+    judge_cache_persistent: bool = True
+    judge_batch_size: int = 1
+    judge_requests_per_minute: int = 0
+    judge_tokens_per_minute: int = 0
+    judge_max_concurrency: int = 64
+    judge_max_retries: int = 8
+    judge_backoff_base_seconds: float = 0.5
+    judge_backoff_max_seconds: float = 30.0
+
+    target_openai_base_url: str = "https://api.openai.com/v1"
+    target_openai_api_key: str | None = None
+    target_http_url: str | None = None
+    target_timeout_seconds: float = 60.0
+    target_max_connections: int = 32
+    target_max_concurrency: int = 32
+
     class Config:
         env_prefix = ""
         case_sensitive = False
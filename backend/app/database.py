@@ -1,17 +1,57 @@
 import os
-from typing import Generator
+from typing import AsyncGenerator, Dict, Generator
 
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from .core.config import get_settings
 
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./vanguard_eval.db")
 
+# Drivers used by the asyncio engine for each dialect.
+_ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "postgres": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+
+def async_database_url(url: str) -> str:
+    """The same database addressed through its asyncio driver (asyncpg / aiosqlite)."""
+    scheme, sep, rest = url.partition("://")
+    dialect = scheme.split("+", 1)[0]
+    return _ASYNC_DRIVERS.get(dialect, scheme) + sep + rest
+
+
+def _pool_args() -> Dict[str, object]:
+    if DATABASE_URL.startswith("sqlite"):
+        return {}
+    settings = get_settings()
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+    }
+
+
 # For SQLite we need check_same_thread=False; for Postgres this is ignored.
 connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
 
-engine = create_engine(DATABASE_URL, echo=False, connect_args=connect_args)
+engine = create_engine(DATABASE_URL, echo=False, connect_args=connect_args, **_pool_args())
+
+# Used by the eval routes, so waiting on the judge or target does not pin a thread.
+async_engine = create_async_engine(async_database_url(DATABASE_URL), echo=False, **_pool_args())
 
 
 def get_session() -> Generator[Session, None, None]:
     with Session(engine) as session:
         yield session
+
+
+def new_async_session() -> AsyncSession:
+    # Attributes must stay loaded after commit: outside ``run_sync`` an
+    # expired attribute cannot be refreshed lazily.
+    return AsyncSession(async_engine, expire_on_commit=False)
+
+
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    async with new_async_session() as session:
+        yield session
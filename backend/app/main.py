@@ -1,9 +1,21 @@
-from fastapi import FastAPI
-from sqlmodel import SQLModel
+import time
 
-from .database import engine
+from fastapi import Depends, FastAPI, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from .database import async_engine, engine
 from .api.routes.evals import router as evals_router
+from .api.routes.stats import router as stats_router
+from .api.routes.suites import router as suites_router
+from .core.config import get_settings
 from .core.security import verify_api_key
+from .migrations import ensure_schema
+from .services.job_queue import job_queue
+from .services.judge_cache import judge_cache
+from .services.judge_service import judge_registry
+from .services.metrics import HTTP_REQUEST_SECONDS
+from .services.target_providers import provider_registry
 
 
 app = FastAPI(title="Vanguard AI Eval Platform", version="0.1.0")
@@ -11,8 +23,39 @@ app = FastAPI(title="Vanguard AI Eval Platform", version="0.1.0")
 
 @app.on_event("startup")
 async def on_startup() -> None:
-    # Create tables on startup for MVP; in production use migrations instead.
-    SQLModel.metadata.create_all(bind=engine)
+    # Creates a new database, or upgrades one created by an earlier release.
+    ensure_schema(engine)
+    judge_cache.purge_expired()
+    # With the database backend, standalone workers (python -m app.worker) run the jobs.
+    if get_settings().eval_queue_backend == "thread":
+        job_queue.start()
+
+
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    # Waits for in-flight runs (bounded), so keep it off the event loop.
+    await run_in_threadpool(job_queue.stop)
+    await provider_registry.aclose()
+    await judge_registry.aclose()
+    await async_engine.dispose()
+
+
+@app.middleware("http")
+async def time_requests(request: Request, call_next):
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        # Label by route template, not raw path, to keep run ids out of the labels.
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.labels(
+            request.method,
+            route.path if route is not None else "unmatched",
+            str(status_code),
+        ).observe(time.perf_counter() - started)
 
 
 @app.get("/health", tags=["system"])
@@ -20,9 +63,26 @@ async def healthcheck():
     return {"status": "ok"}
 
 
+@app.get("/metrics", tags=["system"], include_in_schema=False)
+def metrics() -> Response:
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+app.include_router(
+    stats_router,
+    prefix="/v1/evals/stats",
+    tags=["stats"],
+    dependencies=[Depends(verify_api_key)],
+)
 app.include_router(
     evals_router,
     prefix="/v1/evals",
     tags=["evals"],
     dependencies=[Depends(verify_api_key)],
 )
+app.include_router(
+    suites_router,
+    prefix="/v1/suites",
+    tags=["suites"],
+    dependencies=[Depends(verify_api_key)],
+)
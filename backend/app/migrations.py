@@ -0,0 +1,453 @@
+"""Versioned schema changes for databases created by earlier releases.
+
+``SQLModel.metadata.create_all`` creates missing tables but never changes
+existing ones, so a database created by an older release lacks the columns
+and indexes added since. Each step below upgrades it by one release, and
+``schema_migrations`` records the steps a database has been through. Steps
+inspect the live schema before every change, so they are also safe on
+databases that ``create_all`` already partly upgraded.
+
+A new database is created from the models and recorded as fully migrated.
+The API and the workers apply pending steps on startup; with
+``DB_AUTO_MIGRATE=false`` they refuse to start until the steps have been
+applied with::
+
+    python -m app.migrations
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Set, Tuple, Type
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, bindparam, inspect, literal, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.schema import CreateTable
+from sqlmodel import Session, SQLModel
+
+from .core.config import get_settings
+from .models import (
+    CaseContent,
+    CaseJob,
+    EvalMatrix,
+    EvalResult,
+    JudgeCacheEntry,
+    RunStatsDaily,
+    ScoreHistogramDaily,
+    TestCase,
+    TestRun,
+    TestSuite,
+    TestSuiteCase,
+    TextBlob,
+)
+from .services.blobs import put_texts
+from .services.test_suites import share_case_contents
+
+
+logger = logging.getLogger(__name__)
+
+Step = Callable[[Connection], None]
+
+# (id, step) in the order they must be applied; ids are never reused.
+MIGRATIONS: List[Tuple[str, Step]] = []
+
+_versions = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("id", String(64), primary_key=True),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+# Serializes processes that start against the same Postgres database at once.
+_ADVISORY_LOCK_KEY = 7_402_113
+
+
+class SchemaOutOfDate(RuntimeError):
+    """Raised on startup when the database needs migrations that were not applied."""
+
+
+def migration(migration_id: str) -> Callable[[Step], Step]:
+    """Register a step; steps run in the order they are defined."""
+
+    def register(step: Step) -> Step:
+        MIGRATIONS.append((migration_id, step))
+        return step
+
+    return register
+
+
+def pending_migrations(engine: Engine) -> List[str]:
+    """Ids of the steps the database has not been through (all of them for a new database)."""
+    with engine.connect() as conn:
+        return _pending(conn)
+
+
+def migrate(engine: Engine) -> List[str]:
+    """Create or upgrade the schema; returns the ids of the steps applied.
+
+    Each step commits on its own, so an interrupted upgrade resumes with the
+    step that failed.
+    """
+    with engine.connect() as conn:
+        postgres = conn.dialect.name == "postgresql"
+        if postgres:
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": _ADVISORY_LOCK_KEY})
+            conn.commit()
+        try:
+            return _migrate(conn)
+        finally:
+            if postgres:
+                conn.rollback()
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": _ADVISORY_LOCK_KEY})
+                conn.commit()
+
+
+def ensure_schema(engine: Engine) -> None:
+    """Bring the schema up to date on startup, or refuse to start when ``DB_AUTO_MIGRATE`` is off."""
+    if get_settings().db_auto_migrate:
+        applied = migrate(engine)
+        if applied:
+            logger.info("Applied schema migrations: %s", ", ".join(applied))
+        return
+
+    pending = pending_migrations(engine)
+    if pending:
+        raise SchemaOutOfDate(
+            f"The database schema is out of date (pending migrations: {', '.join(pending)}). "
+            "Run `python -m app.migrations` from backend/ before starting."
+        )
+
+
+def _migrate(conn: Connection) -> List[str]:
+    new_database = not set(inspect(conn).get_table_names()) & set(SQLModel.metadata.tables)
+    _versions.create(conn, checkfirst=True)
+    conn.commit()
+
+    pending = _pending(conn)
+    if new_database:
+        SQLModel.metadata.create_all(conn)
+        _record(conn, pending)
+        conn.commit()
+        return []
+
+    applied: List[str] = []
+    for migration_id, step in MIGRATIONS:
+        if migration_id not in pending:
+            continue
+        logger.info("Applying schema migration %s", migration_id)
+        step(conn)
+        _record(conn, [migration_id])
+        conn.commit()
+        applied.append(migration_id)
+    return applied
+
+
+def _pending(conn: Connection) -> List[str]:
+    applied: Set[str] = set()
+    if inspect(conn).has_table(_versions.name):
+        applied = set(conn.execute(select(_versions.c.id)).scalars())
+    return [migration_id for migration_id, _ in MIGRATIONS if migration_id not in applied]
+
+
+def _record(conn: Connection, migration_ids: List[str]) -> None:
+    if migration_ids:
+        now = datetime.utcnow()
+        conn.execute(_versions.insert(), [{"id": migration_id, "applied_at": now} for migration_id in migration_ids])
+
+
+# Schema helpers. Each is a no-op when the change is already in place.
+
+
+def _columns(conn: Connection, table: str) -> Set[str]:
+    return {column["name"] for column in inspect(conn).get_columns(table)}
+
+
+def _create_table(conn: Connection, model: Type[SQLModel]) -> None:
+    model.__table__.create(conn, checkfirst=True)
+
+
+def _create_index(conn: Connection, model: Type[SQLModel], name: str) -> None:
+    index = next(index for index in model.__table__.indexes if index.name == name)
+    index.create(conn, checkfirst=True)
+
+
+def _add_column(conn: Connection, model: Type[SQLModel], name: str, default: Any = None) -> bool:
+    """Add ``model``'s column ``name`` if it is missing; returns whether it was added.
+
+    Columns are added nullable unless a ``default`` for the existing rows is
+    given, in which case they are ``NOT NULL``.
+    """
+    table = model.__table__
+    if name in _columns(conn, table.name):
+        return False
+
+    column = table.c[name]
+    quote = conn.dialect.identifier_preparer.quote
+    ddl = f"ALTER TABLE {quote(table.name)} ADD COLUMN {quote(name)} {column.type.compile(dialect=conn.dialect)}"
+    if default is not None:
+        value = literal(default, column.type).compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+        ddl += f" DEFAULT {value} NOT NULL"
+    for foreign_key in column.foreign_keys:
+        ddl += f" REFERENCES {quote(foreign_key.column.table.name)} ({quote(foreign_key.column.name)})"
+    conn.exec_driver_sql(ddl)
+    return True
+
+
+def _drop_column(conn: Connection, table: str, name: str) -> None:
+    if name in _columns(conn, table):
+        quote = conn.dialect.identifier_preparer.quote
+        conn.exec_driver_sql(f"ALTER TABLE {quote(table)} DROP COLUMN {quote(name)}")
+
+
+def _drop_not_null(conn: Connection, model: Type[SQLModel], name: str) -> None:
+    table = model.__table__
+    column = next(column for column in inspect(conn).get_columns(table.name) if column["name"] == name)
+    if column["nullable"]:
+        return
+    if conn.dialect.name == "sqlite":
+        # SQLite cannot alter a column's constraints in place.
+        _rebuild_sqlite_table(conn, model)
+    else:
+        quote = conn.dialect.identifier_preparer.quote
+        conn.exec_driver_sql(f"ALTER TABLE {quote(table.name)} ALTER COLUMN {quote(name)} DROP NOT NULL")
+
+
+def _set_not_null(conn: Connection, model: Type[SQLModel], name: str) -> None:
+    """Make a column that every row now fills in ``NOT NULL``, as the model declares it."""
+    table = model.__table__
+    column = next(column for column in inspect(conn).get_columns(table.name) if column["name"] == name)
+    if not column["nullable"]:
+        return
+    if conn.dialect.name == "sqlite":
+        _rebuild_sqlite_table(conn, model)
+    else:
+        quote = conn.dialect.identifier_preparer.quote
+        conn.exec_driver_sql(f"ALTER TABLE {quote(table.name)} ALTER COLUMN {quote(name)} SET NOT NULL")
+
+
+def _rebuild_sqlite_table(conn: Connection, model: Type[SQLModel]) -> None:
+    """Recreate a table with the model's definition, keeping its rows (SQLite's documented procedure)."""
+    table = model.__table__
+    quote = conn.dialect.identifier_preparer.quote
+    shared = ", ".join(quote(column.name) for column in table.columns if column.name in _columns(conn, table.name))
+    staging = f"_new_{table.name}"
+
+    create = str(CreateTable(table).compile(dialect=conn.dialect))
+    conn.exec_driver_sql(create.replace(f"CREATE TABLE {table.name} ", f"CREATE TABLE {staging} ", 1))
+    conn.exec_driver_sql(f"INSERT INTO {staging} ({shared}) SELECT {shared} FROM {quote(table.name)}")
+    conn.exec_driver_sql(f"DROP TABLE {quote(table.name)}")
+    conn.exec_driver_sql(f"ALTER TABLE {staging} RENAME TO {quote(table.name)}")
+    for index in table.indexes:
+        index.create(conn, checkfirst=True)
+
+
+def main() -> None:
+    from .database import engine
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    applied = migrate(engine)
+    if applied:
+        print(f"Applied {len(applied)} migrations: {', '.join(applied)}")
+    else:
+        print("Applied 0 migrations; the schema is up to date")
+
+
+# Steps, oldest first.
+
+
+@migration("0001_run_progress")
+def _run_progress(conn: Connection) -> None:
+    """Case positions and run progress for submitted runs."""
+    if _add_column(conn, TestRun, "completed_cases", 0):
+        conn.execute(text("UPDATE test_runs SET completed_cases = total_cases WHERE status = 'completed'"))
+    _add_column(conn, TestRun, "error")
+    if _add_column(conn, TestCase, "position", 0):
+        # Cases used to be inserted one by one in input order.
+        conn.execute(
+            text(
+                "UPDATE test_cases SET position = ("
+                "SELECT COUNT(*) FROM test_cases AS earlier "
+                "WHERE earlier.run_id = test_cases.run_id AND earlier.created_at < test_cases.created_at)"
+            )
+        )
+
+
+@migration("0002_judge_cache")
+def _judge_cache(conn: Connection) -> None:
+    """Persistent tier of the judge cache."""
+    _create_table(conn, JudgeCacheEntry)
+
+
+@migration("0003_run_listing_indexes")
+def _run_listing_indexes(conn: Connection) -> None:
+    """Composite indexes behind the newest-first run listing and its cursor."""
+    for name in (
+        "ix_test_runs_created_at_id",
+        "ix_test_runs_status_created_at_id",
+        "ix_test_runs_overall_pass_created_at_id",
+    ):
+        _create_index(conn, TestRun, name)
+
+
+@migration("0004_case_position_index")
+def _case_position_index(conn: Connection) -> None:
+    """Index behind the joined, paged run detail query."""
+    _create_index(conn, TestCase, "ix_test_cases_run_id_position")
+
+
+@migration("0005_early_stop")
+def _early_stop(conn: Connection) -> None:
+    """Skipped cases and the stop reason of early-stopped runs."""
+    _add_column(conn, TestCase, "skipped", False)
+    _add_column(conn, TestRun, "skipped_cases", 0)
+    _add_column(conn, TestRun, "stop_reason")
+
+
+@migration("0006_incremental_runs")
+def _incremental_runs(conn: Connection) -> None:
+    """Case fingerprints and reused-result links; earlier cases have no fingerprint and are never reused."""
+    _add_column(conn, TestCase, "fingerprint")
+    _create_index(conn, TestCase, "ix_test_cases_fingerprint_created_at")
+    _add_column(conn, EvalResult, "reused_from_result_id")
+
+
+@migration("0007_test_suites")
+def _test_suites(conn: Connection) -> None:
+    """Stored suites and shared case content; cases may now leave their text empty."""
+    _create_table(conn, CaseContent)
+    _create_table(conn, TestSuite)
+    _create_table(conn, TestSuiteCase)
+    _add_column(conn, TestCase, "content_hash")
+    _drop_not_null(conn, TestCase, "input_text")
+    _add_column(conn, TestRun, "suite_id")
+    _create_index(conn, TestRun, "ix_test_runs_suite_id")
+
+
+@migration("0008_rollups")
+def _rollups(conn: Connection) -> None:
+    """Run projects and the daily rollup tables; fill them with ``python -m app.services.rollups``."""
+    _add_column(conn, TestRun, "project_id")
+    _create_index(conn, TestRun, "ix_test_runs_project_id")
+    _create_table(conn, RunStatsDaily)
+    _create_table(conn, ScoreHistogramDaily)
+
+
+@migration("0009_stage_timings")
+def _stage_timings(conn: Connection) -> None:
+    """Per-case stage timings and judge tokens."""
+    for name in ("target_ms", "judge_ms", "heuristic_ms", "judge_tokens"):
+        _add_column(conn, EvalResult, name)
+
+
+@migration("0010_case_jobs")
+def _case_jobs(conn: Connection) -> None:
+    """Database work queue and the options its workers run with."""
+    _add_column(conn, TestRun, "execution_options")
+    _create_table(conn, CaseJob)
+
+
+@migration("0011_text_blobs")
+def _text_blobs(conn: Connection) -> None:
+    """Move run prompts, model outputs and judge reasoning into ``text_blobs``."""
+    _create_table(conn, TextBlob)
+    _add_column(conn, TestRun, "prompt_hash")
+    _add_column(conn, EvalResult, "model_output_hash")
+    _add_column(conn, EvalResult, "judge_reasoning_hash")
+
+    if "prompt" in _columns(conn, "test_runs"):
+        _move_texts(conn, "test_runs", {"prompt": "prompt_hash"})
+    if "model_output_text" in _columns(conn, "eval_results"):
+        _move_texts(
+            conn,
+            "eval_results",
+            {"model_output_text": "model_output_hash", "judge_reasoning": "judge_reasoning_hash"},
+        )
+
+    for table, name in (
+        ("test_runs", "prompt"),
+        ("eval_results", "model_output_text"),
+        ("eval_results", "judge_reasoning"),
+    ):
+        _drop_column(conn, table, name)
+    _set_not_null(conn, TestRun, "prompt_hash")
+    _set_not_null(conn, EvalResult, "model_output_hash")
+    _set_not_null(conn, EvalResult, "judge_reasoning_hash")
+
+
+def _move_texts(conn: Connection, table: str, columns: Dict[str, str]) -> None:
+    """Store each row's ``columns`` as blobs and point the hash columns at them, a batch at a time."""
+    quote = conn.dialect.identifier_preparer.quote
+    first_hash = quote(next(iter(columns.values())))
+    selected = ", ".join(quote(name) for name in columns)
+    assignments = ", ".join(f"{quote(hash_column)} = :{hash_column}" for hash_column in columns.values())
+    update = text(f"UPDATE {quote(table)} SET {assignments} WHERE id = :id")
+    size = max(1, get_settings().db_bulk_chunk_size)
+
+    # The session joins the migration's transaction, so the blobs commit with the step.
+    with Session(bind=conn) as session:
+        while True:
+            rows = conn.exec_driver_sql(
+                f"SELECT id, {selected} FROM {quote(table)} WHERE {first_hash} IS NULL LIMIT {size}"
+            ).all()
+            if not rows:
+                break
+            params = [{"id": row[0]} for row in rows]
+            for offset, hash_column in enumerate(columns.values(), start=1):
+                hashes = put_texts(session, [row[offset] or "" for row in rows])
+                for param, key in zip(params, hashes):
+                    param[hash_column] = key
+            conn.execute(update, params)
+
+
+@migration("0012_judge_skipped")
+def _judge_skipped(conn: Connection) -> None:
+    """Which scoring tier, if any, settled a case without the judge."""
+    _add_column(conn, EvalResult, "judge_skipped")
+
+
+@migration("0013_eval_matrices")
+def _eval_matrices(conn: Connection) -> None:
+    """Matrix runs and the link from each cell run to its matrix."""
+    _create_table(conn, EvalMatrix)
+    _add_column(conn, TestRun, "matrix_id")
+    _create_index(conn, TestRun, "ix_test_runs_matrix_id")
+
+
+@migration("0014_case_content_hashes")
+def _case_content_hashes(conn: Connection) -> None:
+    """Store inline cases of earlier runs as shared case content, so those runs can be compared."""
+    _create_index(conn, TestCase, "ix_test_cases_run_id_content_hash")
+
+    cases = TestCase.__table__
+    pending = (
+        select(cases.c.id, cases.c.input_text, cases.c.expected_output, cases.c.extra_metadata)
+        .where(cases.c.content_hash.is_(None), cases.c.input_text.is_not(None))
+        .limit(max(1, get_settings().db_bulk_chunk_size))
+    )
+    update = (
+        cases.update()
+        .where(cases.c.id == bindparam("case_id"))
+        .values(content_hash=bindparam("hash"), input_text=None, expected_output=None, extra_metadata=None)
+    )
+    # The session joins the migration's transaction, so the contents commit with the step.
+    with Session(bind=conn) as session:
+        while True:
+            rows = conn.execute(pending).all()
+            if not rows:
+                break
+            batch = [
+                TestCase(
+                    id=row.id,
+                    input_text=row.input_text,
+                    expected_output=row.expected_output,
+                    extra_metadata=row.extra_metadata,
+                )
+                for row in rows
+            ]
+            share_case_contents(session, batch)
+            conn.execute(update, [{"case_id": case.id, "hash": case.content_hash} for case in batch])
+
+
+if __name__ == "__main__":
+    main()
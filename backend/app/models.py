@@ -1,10 +1,8 @@
-from __future__ import annotations
-
 import uuid
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional, List, Dict, Any
 
-from sqlalchemy import Column, JSON
+from sqlalchemy import Column, Index, JSON, LargeBinary, UniqueConstraint
 from sqlmodel import SQLModel, Field, Relationship
 
 
@@ -14,52 +12,247 @@ class EvalResult(SQLModel, table=True):
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True, index=True)
     test_case_id: uuid.UUID = Field(foreign_key="test_cases.id", index=True)
 
-    model_output_text: str
+    # Model output and judge reasoning live in ``text_blobs``.
+    model_output_hash: str = Field(foreign_key="text_blobs.hash", max_length=64)
     heuristic_score: float
     judge_score: float
     combined_score: float
     passed: bool = Field(default=False, index=True)
-    judge_reasoning: str
+    judge_reasoning_hash: str = Field(foreign_key="text_blobs.hash", max_length=64)
+    # Set when an incremental run copied this result from an earlier run.
+    reused_from_result_id: Optional[uuid.UUID] = None
+    # Scoring cascade tier that settled the case without a judge call.
+    judge_skipped: Optional[str] = Field(default=None, max_length=32)
+
+    # Per-case timings in milliseconds and judge tokens, empty for reused
+    # results. Cases judged in one batched request share its latency and
+    # split its tokens; heuristic time is the case's share of its group's batch.
+    target_ms: Optional[float] = None
+    judge_ms: Optional[float] = None
+    heuristic_ms: Optional[float] = None
+    judge_tokens: Optional[int] = None
 
     created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
 
+    test_case: Optional["TestCase"] = Relationship(back_populates="eval_result")
+
 
 class TestCase(SQLModel, table=True):
     __tablename__ = "test_cases"
+    __table_args__ = (
+        Index("ix_test_cases_run_id_position", "run_id", "position"),
+        Index("ix_test_cases_run_id_content_hash", "run_id", "content_hash"),
+        Index("ix_test_cases_fingerprint_created_at", "fingerprint", "created_at"),
+    )
 
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True, index=True)
     run_id: uuid.UUID = Field(foreign_key="test_runs.id", index=True)
+    position: int = 0
+    # Set when an early-stopped run never evaluated this case.
+    skipped: bool = False
 
-    input_text: str
+    # Stored cases leave these empty and point at the shared ``CaseContent``
+    # row through ``content_hash`` instead; they are only set in memory.
+    input_text: Optional[str] = None
     expected_output: Optional[str] = None
     extra_metadata: Optional[Dict[str, Any]] = Field(
         default=None,
         sa_column=Column(JSON, nullable=True),
     )
+    content_hash: Optional[str] = Field(default=None, foreign_key="case_contents.hash", max_length=64)
+    # Hash of prompt, target model, input, expected output, metadata, judge
+    # model, judge prompt and scoring cascade, set when the case is scored;
+    # used by incremental runs to find reusable results from earlier runs.
+    fingerprint: Optional[str] = Field(default=None, max_length=64)
 
     created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
 
-    eval_result: Optional[EvalResult] = Relationship(back_populates="test_case")
+    eval_result: Optional[EvalResult] = Relationship(
+        back_populates="test_case",
+        sa_relationship_kwargs={"uselist": False},
+    )
+    run: Optional["TestRun"] = Relationship(
+        back_populates="cases",
+        sa_relationship_kwargs={"lazy": "selectin"},
+    )
 
 
 class TestRun(SQLModel, table=True):
     __tablename__ = "test_runs"
+    # Composite indexes back the newest-first listing and its keyset cursor,
+    # with and without the status / overall_pass filters.
+    __table_args__ = (
+        Index("ix_test_runs_created_at_id", "created_at", "id"),
+        Index("ix_test_runs_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_test_runs_overall_pass_created_at_id", "overall_pass", "created_at", "id"),
+    )
 
     id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True, index=True)
     created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
     status: str = Field(default="pending", index=True)
 
     target_model: str
-    prompt: str
+    # The system prompt lives in ``text_blobs``, stored once however many runs use it.
+    prompt_hash: str = Field(foreign_key="text_blobs.hash", max_length=64)
 
     total_cases: int = 0
+    completed_cases: int = 0
+    skipped_cases: int = 0
     passed_cases: int = 0
     average_score: float = 0.0
     overall_pass: bool = Field(default=False, index=True)
     pass_threshold: float = 0.75
+    error: Optional[str] = None
+    stop_reason: Optional[str] = None
+    suite_id: Optional[uuid.UUID] = Field(default=None, foreign_key="test_suites.id", index=True)
+    matrix_id: Optional[uuid.UUID] = Field(default=None, foreign_key="eval_matrices.id", index=True)
+    project_id: Optional[str] = Field(default=None, index=True)
+    # Options the run was submitted with, for workers that execute or resume
+    # it outside the submitting request.
+    execution_options: Optional[Dict[str, Any]] = Field(
+        default=None,
+        sa_column=Column(JSON, nullable=True),
+    )
 
     cases: List[TestCase] = Relationship(back_populates="run")
 
 
-TestCase.run = Relationship(back_populates="cases", sa_relationship_kwargs={"lazy": "selectin"})
-EvalResult.test_case = Relationship(back_populates="eval_result")
+class EvalMatrix(SQLModel, table=True):
+    """One case set run against several prompts and target models; each cell is a ``TestRun``."""
+
+    __tablename__ = "eval_matrices"
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True, index=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+
+    # Prompts live in ``text_blobs``; cells reference them by position.
+    prompt_hashes: List[str] = Field(sa_column=Column(JSON, nullable=False))
+    target_models: List[str] = Field(sa_column=Column(JSON, nullable=False))
+    total_cases: int = 0
+    pass_threshold: float = 0.75
+    suite_id: Optional[uuid.UUID] = Field(default=None, foreign_key="test_suites.id")
+    project_id: Optional[str] = Field(default=None, index=True)
+
+
+class JudgeCacheEntry(SQLModel, table=True):
+    __tablename__ = "judge_cache"
+
+    key: str = Field(primary_key=True, max_length=64)
+    judge_model: str = Field(index=True)
+    score: float
+    reasoning: str
+
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+
+
+class CaseContent(SQLModel, table=True):
+    """Test case content stored once per distinct input / expected output / metadata."""
+
+    __tablename__ = "case_contents"
+
+    hash: str = Field(primary_key=True, max_length=64)
+    input_text: str
+    expected_output: Optional[str] = None
+    extra_metadata: Optional[Dict[str, Any]] = Field(
+        default=None,
+        sa_column=Column(JSON, nullable=True),
+    )
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class TestSuite(SQLModel, table=True):
+    """One uploaded version of a named test suite."""
+
+    __tablename__ = "test_suites"
+    __table_args__ = (UniqueConstraint("name", "version", name="uq_test_suites_name_version"),)
+
+    id: uuid.UUID = Field(default_factory=uuid.uuid4, primary_key=True, index=True)
+    name: str = Field(index=True)
+    version: int = 1
+    description: Optional[str] = None
+    case_count: int = 0
+
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+
+
+class TestSuiteCase(SQLModel, table=True):
+    __tablename__ = "test_suite_cases"
+
+    suite_id: uuid.UUID = Field(foreign_key="test_suites.id", primary_key=True)
+    position: int = Field(primary_key=True)
+    content_hash: str = Field(foreign_key="case_contents.hash", max_length=64)
+    tags: Optional[List[str]] = Field(
+        default=None,
+        sa_column=Column(JSON, nullable=True),
+    )
+
+
+# Rollups, maintained incrementally as runs complete (see services/rollups.py).
+# ``project_id`` is "" for runs submitted without a project.
+
+
+class RunStatsDaily(SQLModel, table=True):
+    __tablename__ = "run_stats_daily"
+
+    day: date = Field(primary_key=True)
+    target_model: str = Field(primary_key=True)
+    project_id: str = Field(default="", primary_key=True)
+
+    runs: int = 0
+    passed_runs: int = 0
+    cases: int = 0
+    passed_cases: int = 0
+    score_sum: float = 0.0
+
+
+class ScoreHistogramDaily(SQLModel, table=True):
+    """Per-case combined score counts in ``HISTOGRAM_BUCKETS`` equal-width buckets."""
+
+    __tablename__ = "score_histogram_daily"
+
+    day: date = Field(primary_key=True)
+    target_model: str = Field(primary_key=True)
+    project_id: str = Field(default="", primary_key=True)
+    bucket: int = Field(primary_key=True)
+
+    cases: int = 0
+
+
+class CaseJob(SQLModel, table=True):
+    """Queue entry for one case of a run executed by standalone workers.
+
+    Rows are claimed with ``FOR UPDATE SKIP LOCKED``, kept alive by worker
+    heartbeats and deleted once their run is finalized.
+    """
+
+    __tablename__ = "case_jobs"
+    __table_args__ = (
+        Index("ix_case_jobs_status_created_at", "status", "created_at"),
+        Index("ix_case_jobs_status_heartbeat_at", "status", "heartbeat_at"),
+    )
+
+    test_case_id: uuid.UUID = Field(foreign_key="test_cases.id", primary_key=True)
+    run_id: uuid.UUID = Field(foreign_key="test_runs.id", index=True)
+    # pending -> claimed -> done
+    status: str = Field(default="pending")
+    worker_id: Optional[str] = Field(default=None, index=True)
+    attempts: int = 0
+    heartbeat_at: Optional[datetime] = None
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+
+class TextBlob(SQLModel, table=True):
+    """Content-addressed large text, see services/blobs.py."""
+
+    __tablename__ = "text_blobs"
+
+    hash: str = Field(primary_key=True, max_length=64)
+    # "raw" or "zlib"
+    codec: str = "raw"
+    # Uncompressed size in bytes.
+    size: int
+    data: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
+
+    created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,39 @@
+"""Concurrency limits shared by code running on more than one event loop."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import weakref
+from typing import Any
+
+
+class AsyncSlots:
+    """An ``asyncio.BoundedSemaphore`` per running event loop, created on first use.
+
+    asyncio primitives bind to the loop that first waits on them, so a
+    module- or process-level semaphore breaks as soon as a second loop (a
+    test client, ``asyncio.run`` in a worker thread) uses it. The limit
+    applies per event loop; a loop's semaphore goes away with the loop.
+    """
+
+    def __init__(self, value: int) -> None:
+        self.value = max(1, value)
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.BoundedSemaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+
+    def _semaphore(self) -> asyncio.BoundedSemaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                semaphore = self._semaphores[loop] = asyncio.BoundedSemaphore(self.value)
+            return semaphore
+
+    async def __aenter__(self) -> None:
+        await self._semaphore().acquire()
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self._semaphore().release()
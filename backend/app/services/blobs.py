@@ -0,0 +1,86 @@
+"""Content-addressed, compressed storage for large text fields.
+
+Run prompts, model outputs and judge reasoning are stored once per distinct
+value in ``text_blobs`` and referenced by their SHA-256. Rows that repeat a
+value (the same system prompt on every run, identical outputs) cost one hash,
+and list / aggregate queries never read the payloads. Values worth
+compressing are stored zlib-compressed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import zlib
+from typing import Dict, Iterable, List, Optional
+
+from sqlmodel import Session, select
+
+from ..core.config import get_settings
+from ..models import TextBlob
+from .persistence import bulk_insert
+
+
+# Shorter values rarely shrink enough to pay for decompression.
+_COMPRESS_MIN_BYTES = 128
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def put_texts(session: Session, texts: Iterable[str]) -> List[str]:
+    """Store ``texts`` that are not stored yet and return their hashes in order.
+
+    Nothing is committed; the blobs become visible with the caller's
+    transaction, together with the rows that reference them.
+    """
+    hashes: List[str] = []
+    pending: Dict[str, str] = {}
+    for text in texts:
+        key = text_hash(text)
+        hashes.append(key)
+        pending.setdefault(key, text)
+
+    size = max(1, get_settings().db_bulk_chunk_size)
+    keys = list(pending)
+    for start in range(0, len(keys), size):
+        chunk = keys[start : start + size]
+        known = set(session.exec(select(TextBlob.hash).where(TextBlob.hash.in_(chunk))).all())
+        rows = [_blob_row(key, pending[key]) for key in chunk if key not in known]
+        # Another writer may store the same value concurrently.
+        bulk_insert(session, TextBlob, rows, ignore_conflicts=True)
+    return hashes
+
+
+def get_texts(session: Session, hashes: Iterable[Optional[str]]) -> Dict[str, str]:
+    """Load and decompress the blobs for ``hashes`` (``None`` entries are skipped)."""
+    keys = sorted({key for key in hashes if key})
+    size = max(1, get_settings().db_bulk_chunk_size)
+    texts: Dict[str, str] = {}
+    for start in range(0, len(keys), size):
+        statement = select(TextBlob).where(TextBlob.hash.in_(keys[start : start + size]))
+        for blob in session.exec(statement):
+            texts[blob.hash] = _decode(blob)
+    return texts
+
+
+def get_text(session: Session, key: str) -> str:
+    blob = session.get(TextBlob, key)
+    if blob is None:
+        raise LookupError(f"Text blob {key} not found")
+    return _decode(blob)
+
+
+def _blob_row(key: str, text: str) -> Dict[str, object]:
+    raw = text.encode("utf-8")
+    codec, data = "raw", raw
+    if len(raw) >= _COMPRESS_MIN_BYTES:
+        compressed = zlib.compress(raw)
+        if len(compressed) < len(raw):
+            codec, data = "zlib", compressed
+    return TextBlob(hash=key, codec=codec, size=len(raw), data=data).model_dump()
+
+
+def _decode(blob: TextBlob) -> str:
+    data = zlib.decompress(blob.data) if blob.codec == "zlib" else blob.data
+    return data.decode("utf-8")
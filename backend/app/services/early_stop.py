@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import math
+from typing import Optional
+
+
+class SequentialStopper:
+    """Decides when the mean combined score is settled relative to a threshold.
+
+    Scores are in ``[0, 1]``, so after ``n`` cases the running mean lies within
+    ``sqrt(log(2 * n * (n + 1) / alpha) / (2 * n))`` of the true mean with
+    probability ``1 - alpha / (n * (n + 1))`` (Hoeffding). Those failure
+    probabilities sum to ``alpha`` over all ``n``, so the bound may be checked
+    after every case while the overall error rate stays at most ``alpha``.
+    Cases must be evaluated in random order for the sample mean to be an
+    unbiased estimate of the full suite's mean.
+    """
+
+    def __init__(self, threshold: float, *, confidence: float = 0.95, min_cases: int = 1) -> None:
+        self.threshold = threshold
+        self.alpha = 1.0 - confidence
+        self.min_cases = max(1, min_cases)
+        self.count = 0
+        self.total = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def radius(self) -> float:
+        n = self.count
+        return math.sqrt(math.log(2.0 * n * (n + 1) / self.alpha) / (2.0 * n))
+
+    def update(self, score: float) -> Optional[str]:
+        """Record one combined score; return a stop reason once the verdict is settled."""
+        self.count += 1
+        self.total += score
+        if self.count < self.min_cases:
+            return None
+
+        radius = self.radius()
+        if self.mean - radius >= self.threshold:
+            return (
+                f"Lower confidence bound {self.mean - radius:.4f} is above pass threshold "
+                f"{self.threshold:.4f} after {self.count} cases"
+            )
+        if self.mean + radius < self.threshold:
+            return (
+                f"Upper confidence bound {self.mean + radius:.4f} is below pass threshold "
+                f"{self.threshold:.4f} after {self.count} cases"
+            )
+        return None
@@ -0,0 +1,78 @@
+"""Execute the cells of a matrix run together on the event loop.
+
+Every cell of a matrix is an ordinary ``TestRun``. Cells are executed
+concurrently, and cells with the same target model share one
+``max_concurrency`` limit, so each model sees the load a single run would
+put on it while work for the other models proceeds in between. The
+process-wide ``EVAL_GLOBAL_CONCURRENCY`` ceiling still applies across all
+of them. A grid therefore takes about as long as its slowest model rather
+than the sum of all models.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Dict, List, Sequence
+
+import anyio
+
+from ..core.config import get_settings
+from ..database import new_async_session
+from ..models import TestRun
+from .eval_runner import EvalRunner
+
+
+logger = logging.getLogger(__name__)
+
+
+async def execute_matrix(runner: EvalRunner, runs: Sequence[TestRun], options: Dict[str, Any]) -> None:
+    """Execute every cell, interleaving work across target models.
+
+    ``options`` are the run options of ``EvalRunner.aiter_execute_run``; its
+    ``max_concurrency`` is applied per target model. A failed cell is marked
+    ``failed`` without stopping the others.
+    """
+    options = dict(options)
+    workers = max(1, options.pop("max_concurrency", None) or get_settings().eval_max_concurrency)
+    slots = {run.target_model: asyncio.Semaphore(workers) for run in runs}
+    # Cells handle their own errors. Collecting instead of raising makes a
+    # cancelled matrix wait until every cell has recorded its failure.
+    await asyncio.gather(
+        *(_execute_cell(runner, run, slots[run.target_model], options) for run in runs),
+        return_exceptions=True,
+    )
+
+
+async def _execute_cell(
+    runner: EvalRunner,
+    run: TestRun,
+    slots: asyncio.Semaphore,
+    options: Dict[str, Any],
+) -> None:
+    # Cells write progress independently, so each owns its session.
+    async with new_async_session() as session:
+        try:
+            async for _ in runner.aiter_execute_run(session, run.id, slots=slots, **options):
+                pass
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("Matrix cell %s (%s) failed", run.id, run.target_model)
+            await session.run_sync(EvalRunner.fail_run, run.id, exc)
+        except BaseException:
+            # The request was cancelled (the client disconnected); nothing else
+            # will finish the cell, so fail it before the cancellation unwinds.
+            with anyio.CancelScope(shield=True):
+                await session.run_sync(EvalRunner.fail_run, run.id, RuntimeError("client disconnected"))
+            raise
+
+
+def matrix_status(runs: List[TestRun]) -> str:
+    """Overall status of a matrix from the status of its cells."""
+    statuses = {run.status for run in runs}
+    if statuses == {"pending"}:
+        return "pending"
+    if statuses & {"pending", "running"}:
+        return "running"
+    if "failed" in statuses:
+        return "failed"
+    return "completed"
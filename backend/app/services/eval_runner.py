@@ -1,29 +1,91 @@
 from __future__ import annotations
 
-from typing import List, Dict, Any
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import AsyncIterator, Deque, Iterator, List, Dict, Any, Sequence, Tuple
 
-from sqlmodel import Session
+from sqlalchemy import case as case_, func, update
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from ..models import TestRun, TestCase, EvalResult
-from .judge_service import JudgeService
+from ..core.config import get_settings
+from ..models import EvalMatrix, TestRun, TestCase, EvalResult
+from .async_slots import AsyncSlots
+from .blobs import get_text, get_texts, put_texts, text_hash
+from .early_stop import SequentialStopper
+from .heuristics import HeuristicScorer, resolve_scorer, score_outputs
+from .judge_cache import JudgeCache, judge_cache as default_judge_cache
+from .judge_service import GRADING_PROMPT, PARSE_FAILURE_PREFIX, JudgeCase, JudgeService, judge_registry, track_judge_usage
+from .metrics import EVAL_CASES, JUDGE_SKIPPED, time_stage
+from .persistence import bulk_insert, model_row
+from .rollups import record_completed_run
+from .scoring_cascade import CascadeDecision, ScoringCascade, parse_tiers
+from .target_providers import ProviderRegistry, provider_registry as default_provider_registry
+from .test_suites import hydrate_cases, share_case_contents, store_case_contents
 
 
 DEFAULT_PASS_THRESHOLD = 0.75
+DEFAULT_EARLY_STOP_CONFIDENCE = 0.95
 
 
-def call_target_model_stub(prompt: str, test_input: str, target_model: str) -> str:
-    """Stub for the target model call.
+def case_fingerprint(
+    *,
+    prompt: str,
+    target_model: str,
+    input_text: str,
+    expected_output: str | None,
+    metadata: Dict[str, Any] | None,
+    scoring: Sequence[Any],
+) -> str:
+    """Stable hash of everything that determines a case's result in a run.
 
-    In production this would call your actual model endpoint (OpenAI, Anthropic,
-    internal HTTP service, etc.). For the MVP we just echo the input in a simple
-    templated way so the pipeline is fully runnable.
+    ``scoring`` is the judge and scoring configuration the case is scored
+    with (see ``EvalRunner._scoring_config``); the heuristic scorer is part
+    of ``metadata``.
     """
-    return f"[model={target_model}] Prompt: {prompt}\nInput: {test_input}"
+    payload = json.dumps(
+        [prompt, target_model, input_text, expected_output, metadata, list(scoring)],
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _StopState:
+    """Filled in by ``_iter_outcomes`` when an early stop triggers."""
+
+    def __init__(self) -> None:
+        self.reason: str | None = None
+        self.skipped: List[TestCase] = []
+
+
+# Process-wide cap on in-flight target and judge calls, shared by all concurrent runs.
+# Threaded evaluations and those on each event loop are capped separately.
+_global_slots = threading.BoundedSemaphore(get_settings().eval_global_concurrency)
+_global_async_slots = AsyncSlots(get_settings().eval_global_concurrency)
+
+# Groups an async run schedules ahead of its consumer, per allowed in-flight group.
+_ASYNC_WINDOW_PER_WORKER = 4
 
 
 class EvalRunner:
-    def __init__(self, judge_service: JudgeService | None = None) -> None:
-        self.judge_service = judge_service or JudgeService()
+    def __init__(
+        self,
+        judge_service: JudgeService | None = None,
+        judge_cache: JudgeCache | None = None,
+        providers: ProviderRegistry | None = None,
+    ) -> None:
+        self.judge_service = judge_service or judge_registry.get()
+        self.judge_cache = judge_cache or default_judge_cache
+        self.providers = providers or default_provider_registry
 
     def run_eval(
         self,
@@ -33,106 +95,1298 @@ class EvalRunner:
         target_model: str,
         test_cases: List[Dict[str, Any]],
         pass_threshold: float = DEFAULT_PASS_THRESHOLD,
+        max_concurrency: int | None = None,
+        use_judge_cache: bool = True,
+        early_stop: bool = False,
+        early_stop_confidence: float = DEFAULT_EARLY_STOP_CONFIDENCE,
+        incremental: bool = False,
+        scoring_cascade: Sequence[str] | None = None,
+        suite_id: uuid.UUID | None = None,
+        project_id: str | None = None,
     ) -> Dict[str, Any]:
-        run = TestRun(
+        """Run every test case and persist the run, its cases and results.
+
+        Target and judge calls for up to ``max_concurrency`` cases (falling back
+        to ``EVAL_MAX_CONCURRENCY``) are in flight at once, additionally bounded
+        by the process-wide ``EVAL_GLOBAL_CONCURRENCY``. Ids are generated
+        client-side, so nothing touches the database until scoring is done; the
+        run, its cases and results are then written in a single transaction
+        using chunked bulk inserts. Results are returned in input order.
+
+        Judge verdicts are served from the judge cache when an identical case
+        was scored before, unless ``use_judge_cache`` is false.
+
+        With ``early_stop``, cases are evaluated in random order and the run
+        stops as soon as a sequential confidence bound on the mean combined
+        score is clearly above or below ``pass_threshold``; the remaining
+        cases are stored as skipped and the reason is kept on the run.
+
+        With ``incremental``, cases whose fingerprint (prompt, target model,
+        input, expected output, metadata, judge model, judge prompt and
+        scoring cascade) matches a case of an earlier run reuse that case's
+        most recent result instead of being re-evaluated.
+
+        ``scoring_cascade`` names the tiers (see ``scoring_cascade``) that may
+        settle a case from its output and heuristic score alone, skipping the
+        judge call; it defaults to ``SCORING_CASCADE``. The deciding tier is
+        stored on the result as ``judge_skipped``.
+
+        ``suite_id`` records the stored suite the cases were loaded from. Case
+        content is stored once in ``case_contents`` and referenced by
+        ``content_hash``, whether it came from a suite or from ``test_cases``.
+        """
+        run, cases = self._new_run(
+            prompt=prompt,
             target_model=target_model,
+            test_cases=test_cases,
+            pass_threshold=pass_threshold,
+            suite_id=suite_id,
+            project_id=project_id,
+            status="running",
+            scoring=self._scoring_config(scoring_cascade, pass_threshold),
+        )
+        stop = _StopState()
+        outcomes = self._iter_outcomes(
+            session,
+            run,
+            cases,
+            stop,
             prompt=prompt,
+            max_concurrency=max_concurrency,
+            use_judge_cache=use_judge_cache,
+            early_stop=early_stop,
+            early_stop_confidence=early_stop_confidence,
+            incremental=incremental,
+            scoring_cascade=scoring_cascade,
+        )
+        return self._store_completed_run(session, run, cases, list(outcomes), stop, prompt)
+
+    async def arun_eval(
+        self,
+        session: AsyncSession,
+        *,
+        prompt: str,
+        target_model: str,
+        test_cases: List[Dict[str, Any]],
+        pass_threshold: float = DEFAULT_PASS_THRESHOLD,
+        max_concurrency: int | None = None,
+        use_judge_cache: bool = True,
+        early_stop: bool = False,
+        early_stop_confidence: float = DEFAULT_EARLY_STOP_CONFIDENCE,
+        incremental: bool = False,
+        scoring_cascade: Sequence[str] | None = None,
+        suite_id: uuid.UUID | None = None,
+        project_id: str | None = None,
+    ) -> Dict[str, Any]:
+        """Async :meth:`run_eval`.
+
+        Target and judge calls run as tasks on the event loop instead of on
+        worker threads, so a pending evaluation holds no thread. ``session``
+        must not expire attributes on commit (see ``new_async_session``).
+        """
+        run, cases = self._new_run(
+            prompt=prompt,
+            target_model=target_model,
+            test_cases=test_cases,
+            pass_threshold=pass_threshold,
+            suite_id=suite_id,
+            project_id=project_id,
             status="running",
+            scoring=self._scoring_config(scoring_cascade, pass_threshold),
+        )
+        stop = _StopState()
+        outcomes = self._aiter_outcomes(
+            session,
+            run,
+            cases,
+            stop,
+            prompt=prompt,
+            max_concurrency=max_concurrency,
+            use_judge_cache=use_judge_cache,
+            early_stop=early_stop,
+            early_stop_confidence=early_stop_confidence,
+            incremental=incremental,
+            scoring_cascade=scoring_cascade,
+        )
+        scored = [pair async for pair in outcomes]
+        return await session.run_sync(self._store_completed_run, run, cases, scored, stop, prompt)
+
+    def _store_completed_run(
+        self,
+        session: Session,
+        run: TestRun,
+        cases: List[TestCase],
+        outcomes: List[Tuple[TestCase, Dict[str, Any]]],
+        stop: "_StopState",
+        prompt: str,
+    ) -> Dict[str, Any]:
+        """Persist a run evaluated in one go and return the run response."""
+        passed_cases = 0
+        total_score = 0.0
+        result_rows: List[Dict[str, Any]] = []
+        texts: List[str] = [prompt]
+        detailed_results: List[Dict[str, Any]] = []
+
+        for case, outcome in outcomes:
+            result_rows.append(model_row(self._build_result(case, outcome)))
+            texts.extend(self._result_texts(outcome))
+
+            passed_cases += 1 if outcome["passed"] else 0
+            total_score += outcome["combined_score"]
+
+            detailed_results.append(self._result_item(case, outcome))
+
+        for case in stop.skipped:
+            case.skipped = True
+        # Reused and randomly ordered cases come back out of input order.
+        positions = {str(case.id): case.position for case in cases}
+        detailed_results.sort(key=lambda item: positions[item["test_case_id"]])
+
+        evaluated = len(result_rows)
+        run.total_cases = len(cases)
+        run.completed_cases = evaluated
+        run.skipped_cases = len(stop.skipped)
+        run.stop_reason = stop.reason
+        run.passed_cases = passed_cases
+        run.average_score = total_score / evaluated if evaluated else 0.0
+        run.overall_pass = run.average_score >= run.pass_threshold
+        run.status = "completed"
+
+        with time_stage("db_flush", target_model=run.target_model, judge_model=self.judge_service.model):
+            put_texts(session, texts)
+            share_case_contents(session, cases)
+            session.add(run)
+            session.flush()
+            bulk_insert(session, TestCase, [self._case_row(case) for case in cases])
+            bulk_insert(session, EvalResult, result_rows)
+            record_completed_run(session, run)
+            session.commit()
+
+        return {
+            "run_id": str(run.id),
+            "overall_pass": run.overall_pass,
+            "average_score": run.average_score,
+            "total_cases": run.total_cases,
+            "passed_cases": run.passed_cases,
+            "pass_threshold": run.pass_threshold,
+            "skipped_cases": run.skipped_cases,
+            "stop_reason": run.stop_reason,
+            "results": detailed_results,
+        }
+
+    @staticmethod
+    def submit_run(
+        session: Session,
+        *,
+        prompt: str,
+        target_model: str,
+        test_cases: List[Dict[str, Any]],
+        pass_threshold: float = DEFAULT_PASS_THRESHOLD,
+        suite_id: uuid.UUID | None = None,
+        project_id: str | None = None,
+        execution_options: Dict[str, Any] | None = None,
+    ) -> TestRun:
+        """Persist a ``pending`` run and its cases without evaluating anything.
+
+        The run is picked up later by :meth:`execute_run`, typically from a
+        background worker. ``execution_options`` are the options it is to be
+        executed with, stored so any worker can resume it with the same ones.
+        """
+        run, cases = EvalRunner._new_run(
+            prompt=prompt,
+            target_model=target_model,
+            test_cases=test_cases,
             pass_threshold=pass_threshold,
+            suite_id=suite_id,
+            project_id=project_id,
+            status="pending",
         )
+        run.execution_options = execution_options
+
+        put_texts(session, [prompt])
+        share_case_contents(session, cases)
         session.add(run)
+        session.flush()
+        bulk_insert(session, TestCase, [EvalRunner._case_row(case) for case in cases])
         session.commit()
         session.refresh(run)
+        return run
 
-        passed_cases = 0
-        total_score = 0.0
-        detailed_results: List[Dict[str, Any]] = []
+    @staticmethod
+    def submit_matrix(
+        session: Session,
+        *,
+        prompts: List[str],
+        target_models: List[str],
+        test_cases: List[Dict[str, Any]],
+        pass_threshold: float = DEFAULT_PASS_THRESHOLD,
+        suite_id: uuid.UUID | None = None,
+        project_id: str | None = None,
+        execution_options: Dict[str, Any] | None = None,
+    ) -> Tuple[EvalMatrix, List[TestRun]]:
+        """Persist a matrix and one ``pending`` run per (prompt, target model) cell.
+
+        Inline cases are stored once as shared case content, like suite cases,
+        so every cell references the same rows. Runs are returned prompt-major.
+        """
+        test_cases = store_case_contents(session, test_cases)
+        matrix = EvalMatrix(
+            prompt_hashes=[text_hash(prompt) for prompt in prompts],
+            target_models=list(target_models),
+            total_cases=len(test_cases),
+            pass_threshold=pass_threshold,
+            suite_id=suite_id,
+            project_id=project_id or None,
+        )
+        runs: List[TestRun] = []
+        case_rows: List[Dict[str, Any]] = []
+        for prompt in prompts:
+            for target_model in target_models:
+                run, cases = EvalRunner._new_run(
+                    prompt=prompt,
+                    target_model=target_model,
+                    test_cases=test_cases,
+                    pass_threshold=pass_threshold,
+                    suite_id=suite_id,
+                    project_id=project_id,
+                    status="pending",
+                )
+                run.matrix_id = matrix.id
+                run.execution_options = execution_options
+                runs.append(run)
+                case_rows.extend(EvalRunner._case_row(case) for case in cases)
+
+        put_texts(session, prompts)
+        session.add(matrix)
+        session.add_all(runs)
+        session.flush()
+        bulk_insert(session, TestCase, case_rows)
+        session.commit()
+        for run in runs:
+            session.refresh(run)
+        session.refresh(matrix)
+        return matrix, runs
+
+    def execute_run(
+        self,
+        session: Session,
+        run_id: uuid.UUID,
+        *,
+        max_concurrency: int | None = None,
+        use_judge_cache: bool = True,
+        early_stop: bool = False,
+        early_stop_confidence: float = DEFAULT_EARLY_STOP_CONFIDENCE,
+        incremental: bool = False,
+        scoring_cascade: Sequence[str] | None = None,
+    ) -> TestRun:
+        """Evaluate the unscored cases of a persisted run and finalize it.
+
+        Results are flushed every ``EVAL_PROGRESS_FLUSH_SIZE`` cases together
+        with the run's ``completed_cases`` counter, so pollers can follow
+        progress. Cases that already have a result are skipped, which makes
+        re-executing an interrupted run safe.
+        """
+        results = self.iter_execute_run(
+            session,
+            run_id,
+            max_concurrency=max_concurrency,
+            use_judge_cache=use_judge_cache,
+            early_stop=early_stop,
+            early_stop_confidence=early_stop_confidence,
+            incremental=incremental,
+            scoring_cascade=scoring_cascade,
+        )
+        for _ in results:
+            pass
+        return session.get(TestRun, run_id)
+
+    def iter_execute_run(
+        self,
+        session: Session,
+        run_id: uuid.UUID,
+        *,
+        max_concurrency: int | None = None,
+        use_judge_cache: bool = True,
+        early_stop: bool = False,
+        early_stop_confidence: float = DEFAULT_EARLY_STOP_CONFIDENCE,
+        incremental: bool = False,
+        scoring_cascade: Sequence[str] | None = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Like :meth:`execute_run`, but yield each result as soon as it is scored.
+
+        Items are shaped like ``EvalRunResultItem`` and come in input order
+        (in evaluation order with ``early_stop``, see :meth:`run_eval`). The
+        run is finalized once the iterator is exhausted.
+        """
+        run, cases, prompt = self._start_execution(session, run_id, scoring_cascade)
+        labels = {"target_model": run.target_model, "judge_model": self.judge_service.model}
+        flush_size = max(1, get_settings().eval_progress_flush_size)
+        pending_rows: List[Dict[str, Any]] = []
+        pending_texts: List[str] = []
+
+        stop = _StopState()
+        outcomes = self._iter_outcomes(
+            session,
+            run,
+            cases,
+            stop,
+            prompt=prompt,
+            max_concurrency=max_concurrency,
+            use_judge_cache=use_judge_cache,
+            early_stop=early_stop,
+            early_stop_confidence=early_stop_confidence,
+            incremental=incremental,
+            scoring_cascade=scoring_cascade,
+        )
+        for case, outcome in outcomes:
+            pending_rows.append(model_row(self._build_result(case, outcome)))
+            pending_texts.extend(self._result_texts(outcome))
+            if len(pending_rows) >= flush_size:
+                with time_stage("db_flush", **labels):
+                    self._flush_progress(session, run, pending_rows, pending_texts)
+                pending_rows, pending_texts = [], []
+
+            yield self._result_item(case, outcome)
+
+        with time_stage("db_flush", **labels):
+            self._finish_execution(session, run, pending_rows, pending_texts, stop)
+
+    async def aiter_execute_run(
+        self,
+        session: AsyncSession,
+        run_id: uuid.UUID,
+        *,
+        max_concurrency: int | None = None,
+        use_judge_cache: bool = True,
+        early_stop: bool = False,
+        early_stop_confidence: float = DEFAULT_EARLY_STOP_CONFIDENCE,
+        incremental: bool = False,
+        scoring_cascade: Sequence[str] | None = None,
+        slots: asyncio.Semaphore | None = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Async :meth:`iter_execute_run`; see :meth:`arun_eval` for ``session``.
+
+        ``slots`` replaces the run's own ``max_concurrency`` limit, so several
+        runs can share one limit (see :mod:`.eval_matrix`).
+        """
+        run, cases, prompt = await session.run_sync(self._start_execution, run_id, scoring_cascade)
+        labels = {"target_model": run.target_model, "judge_model": self.judge_service.model}
+        flush_size = max(1, get_settings().eval_progress_flush_size)
+        pending_rows: List[Dict[str, Any]] = []
+        pending_texts: List[str] = []
+
+        stop = _StopState()
+        outcomes = self._aiter_outcomes(
+            session,
+            run,
+            cases,
+            stop,
+            prompt=prompt,
+            max_concurrency=max_concurrency,
+            use_judge_cache=use_judge_cache,
+            early_stop=early_stop,
+            early_stop_confidence=early_stop_confidence,
+            incremental=incremental,
+            scoring_cascade=scoring_cascade,
+            slots=slots,
+        )
+        try:
+            async for case, outcome in outcomes:
+                pending_rows.append(model_row(self._build_result(case, outcome)))
+                pending_texts.extend(self._result_texts(outcome))
+                if len(pending_rows) >= flush_size:
+                    with time_stage("db_flush", **labels):
+                        await session.run_sync(self._flush_progress, run, pending_rows, pending_texts)
+                    pending_rows, pending_texts = [], []
+
+                yield self._result_item(case, outcome)
+        finally:
+            await outcomes.aclose()
+
+        with time_stage("db_flush", **labels):
+            await session.run_sync(self._finish_execution, run, pending_rows, pending_texts, stop)
+
+    def _start_execution(
+        self,
+        session: Session,
+        run_id: uuid.UUID,
+        scoring_cascade: Sequence[str] | None,
+    ) -> Tuple[TestRun, List[TestCase], str]:
+        """Mark a persisted run as running; return it, its unscored cases and its prompt.
+
+        The cases are fingerprinted for the judge and cascade this execution
+        scores them with.
+        """
+        run = session.get(TestRun, run_id)
+        if run is None:
+            raise ValueError(f"Run {run_id} not found")
+
+        statement = (
+            select(TestCase)
+            .outerjoin(EvalResult, EvalResult.test_case_id == TestCase.id)
+            .where(TestCase.run_id == run.id, EvalResult.id.is_(None))
+            .order_by(TestCase.position)
+        )
+        cases: List[TestCase] = list(session.exec(statement).all())
+        # Detach the cases so the progress commits below do not expire them.
+        for case in cases:
+            session.expunge(case)
+        hydrate_cases(session, cases)
+        prompt = get_text(session, run.prompt_hash)
+        scoring = self._scoring_config(scoring_cascade, run.pass_threshold)
+        self._fingerprint(cases, prompt=prompt, target_model=run.target_model, scoring=scoring)
+        self._update_fingerprints(session, cases)
+
+        run.status = "running"
+        run.completed_cases = run.total_cases - len(cases)
+        session.add(run)
+        session.commit()
+        return run, cases, prompt
+
+    @staticmethod
+    def _finish_execution(
+        session: Session,
+        run: TestRun,
+        result_rows: List[Dict[str, Any]],
+        texts: List[str],
+        stop: "_StopState",
+    ) -> None:
+        EvalRunner._flush_progress(session, run, result_rows, texts)
+        skipped = [case.id for case in stop.skipped]
+        EvalRunner._mark_skipped(session, skipped)
+        EvalRunner.finalize_run(session, run, skipped_cases=len(skipped), stop_reason=stop.reason)
+
+    def evaluate_cases(
+        self,
+        session: Session,
+        run: TestRun,
+        cases: List[TestCase],
+        *,
+        max_concurrency: int | None = None,
+        use_judge_cache: bool = True,
+        incremental: bool = False,
+        scoring_cascade: Sequence[str] | None = None,
+    ) -> List[Dict[str, Any]]:
+        """Score some cases of ``run`` and return their result rows unsaved.
+
+        ``cases`` must be detached from the session and hydrated. Used by
+        standalone workers, which persist results together with their queue
+        bookkeeping. The text blobs the rows reference are added to the
+        session's transaction but not committed, as are the cases' fingerprints.
+        """
+        prompt = get_text(session, run.prompt_hash)
+        scoring = self._scoring_config(scoring_cascade, run.pass_threshold)
+        self._fingerprint(cases, prompt=prompt, target_model=run.target_model, scoring=scoring)
+        outcomes = self._iter_outcomes(
+            session,
+            run,
+            cases,
+            _StopState(),
+            prompt=prompt,
+            max_concurrency=max_concurrency,
+            use_judge_cache=use_judge_cache,
+            early_stop=False,
+            early_stop_confidence=DEFAULT_EARLY_STOP_CONFIDENCE,
+            incremental=incremental,
+            scoring_cascade=scoring_cascade,
+        )
+        rows: List[Dict[str, Any]] = []
+        texts: List[str] = []
+        for case, outcome in outcomes:
+            rows.append(model_row(self._build_result(case, outcome)))
+            texts.extend(self._result_texts(outcome))
+        # Written only now, so the transaction holds no write locks while scoring.
+        self._update_fingerprints(session, cases)
+        put_texts(session, texts)
+        return rows
+
+    @staticmethod
+    def fail_run(session: Session, run_id: uuid.UUID, exc: BaseException) -> None:
+        """Roll back any partial work and mark the run as failed with ``exc``."""
+        session.rollback()
+        run = session.get(TestRun, run_id)
+        if run is not None:
+            run.status = "failed"
+            run.error = str(exc)
+            session.add(run)
+            session.commit()
+
+    def _iter_outcomes(
+        self,
+        session: Session,
+        run: TestRun,
+        cases: List[TestCase],
+        stop: "_StopState",
+        *,
+        prompt: str,
+        max_concurrency: int | None,
+        use_judge_cache: bool,
+        early_stop: bool,
+        early_stop_confidence: float,
+        incremental: bool,
+        scoring_cascade: Sequence[str] | None,
+    ) -> Iterator[Tuple[TestCase, Dict[str, Any]]]:
+        """Yield ``(case, outcome)`` pairs for ``cases``.
+
+        Reused results (``incremental``) come first, followed by freshly scored
+        cases in evaluation order. When an early stop triggers, ``stop`` holds
+        the reason and the cases that were never evaluated.
+        """
+        target_model, pass_threshold = run.target_model, run.pass_threshold
+        judge_model = self.judge_service.model
+
+        prior = self._prior_outcomes(session, cases, run.id, pass_threshold) if incremental else {}
+        reused, fresh = self._split_reused(cases, prior, target_model)
+        yield from reused
+
+        order = self._evaluation_order(fresh, early_stop)
+        stopper = self._stopper(pass_threshold, early_stop, early_stop_confidence)
+        evaluated = 0
+
+        outcomes = self._score_cases(
+            order,
+            prompt=prompt,
+            target_model=target_model,
+            pass_threshold=pass_threshold,
+            max_concurrency=max_concurrency,
+            use_judge_cache=use_judge_cache,
+            cascade=self._cascade(scoring_cascade, pass_threshold),
+        )
+        try:
+            for case, outcome in zip(order, outcomes):
+                evaluated += 1
+                EVAL_CASES.labels(target_model, judge_model, "passed" if outcome["passed"] else "failed").inc()
+                yield case, outcome
 
-        for case_payload in test_cases:
-            input_text = str(case_payload.get("input"))
-            expected_output = case_payload.get("expected_output")
-            metadata = case_payload.get("metadata")
+                if stopper is not None:
+                    stop.reason = stopper.update(outcome["combined_score"])
+                    if stop.reason:
+                        stop.skipped = order[evaluated:]
+                        break
+        finally:
+            # Cancels cases still queued after an early stop or a failure.
+            outcomes.close()
 
-            case = TestCase(
+    async def _aiter_outcomes(
+        self,
+        session: AsyncSession,
+        run: TestRun,
+        cases: List[TestCase],
+        stop: "_StopState",
+        *,
+        prompt: str,
+        max_concurrency: int | None,
+        use_judge_cache: bool,
+        early_stop: bool,
+        early_stop_confidence: float,
+        incremental: bool,
+        scoring_cascade: Sequence[str] | None,
+        slots: asyncio.Semaphore | None = None,
+    ) -> AsyncIterator[Tuple[TestCase, Dict[str, Any]]]:
+        """Async :meth:`_iter_outcomes`."""
+        target_model, pass_threshold = run.target_model, run.pass_threshold
+        judge_model = self.judge_service.model
+
+        prior = await session.run_sync(self._prior_outcomes, cases, run.id, pass_threshold) if incremental else {}
+        reused, fresh = self._split_reused(cases, prior, target_model)
+        for pair in reused:
+            yield pair
+
+        order = self._evaluation_order(fresh, early_stop)
+        stopper = self._stopper(pass_threshold, early_stop, early_stop_confidence)
+        evaluated = 0
+
+        outcomes = self._ascore_cases(
+            order,
+            prompt=prompt,
+            target_model=target_model,
+            pass_threshold=pass_threshold,
+            max_concurrency=max_concurrency,
+            use_judge_cache=use_judge_cache,
+            cascade=self._cascade(scoring_cascade, pass_threshold),
+            slots=slots,
+        )
+        try:
+            async for outcome in outcomes:
+                case = order[evaluated]
+                evaluated += 1
+                EVAL_CASES.labels(target_model, judge_model, "passed" if outcome["passed"] else "failed").inc()
+                yield case, outcome
+
+                if stopper is not None:
+                    stop.reason = stopper.update(outcome["combined_score"])
+                    if stop.reason:
+                        stop.skipped = order[evaluated:]
+                        break
+        finally:
+            await outcomes.aclose()
+
+    def _split_reused(
+        self,
+        cases: List[TestCase],
+        prior: Dict[str, Dict[str, Any]],
+        target_model: str,
+    ) -> Tuple[List[Tuple[TestCase, Dict[str, Any]]], List[TestCase]]:
+        """Pair cases with a prior outcome; return them and the cases left to score."""
+        reused: List[Tuple[TestCase, Dict[str, Any]]] = []
+        fresh: List[TestCase] = []
+        for case in cases:
+            outcome = prior.get(case.fingerprint)
+            if outcome is None:
+                fresh.append(case)
+            else:
+                EVAL_CASES.labels(target_model, self.judge_service.model, "reused").inc()
+                reused.append((case, outcome))
+        return reused, fresh
+
+    @staticmethod
+    def _prior_outcomes(
+        session: Session,
+        cases: List[TestCase],
+        run_id: uuid.UUID,
+        pass_threshold: float,
+    ) -> Dict[str, Dict[str, Any]]:
+        """Map case fingerprints to the most recent result of an earlier run.
+
+        Uses one windowed query per chunk of fingerprints, backed by the
+        ``(fingerprint, created_at)`` index, plus one blob lookup for the
+        outputs and reasoning. ``passed`` is re-derived from the stored
+        combined score against this run's threshold.
+        """
+        fingerprints = sorted({case.fingerprint for case in cases if case.fingerprint})
+        size = max(1, get_settings().db_bulk_chunk_size)
+        prior: Dict[str, Dict[str, Any]] = {}
+
+        for start in range(0, len(fingerprints), size):
+            ranked = (
+                select(
+                    TestCase.fingerprint.label("fingerprint"),
+                    EvalResult.id.label("result_id"),
+                    func.row_number()
+                    .over(partition_by=TestCase.fingerprint, order_by=EvalResult.created_at.desc())
+                    .label("rank"),
+                )
+                .join(EvalResult, EvalResult.test_case_id == TestCase.id)
+                .where(
+                    TestCase.fingerprint.in_(fingerprints[start : start + size]),
+                    TestCase.run_id != run_id,
+                )
+                .subquery()
+            )
+            statement = (
+                select(ranked.c.fingerprint, EvalResult)
+                .join(ranked, ranked.c.result_id == EvalResult.id)
+                .where(ranked.c.rank == 1)
+            )
+            matches = session.exec(statement).all()
+            texts = get_texts(
+                session,
+                [key for _, result in matches for key in (result.model_output_hash, result.judge_reasoning_hash)],
+            )
+            for fingerprint, result in matches:
+                prior[fingerprint] = {
+                    "model_output": texts[result.model_output_hash],
+                    "heuristic_score": result.heuristic_score,
+                    "judge_score": result.judge_score,
+                    "combined_score": result.combined_score,
+                    "passed": result.combined_score >= pass_threshold,
+                    "judge_reasoning": texts[result.judge_reasoning_hash],
+                    "judge_skipped": result.judge_skipped,
+                    "reused_from_result_id": str(result.id),
+                    "target_ms": None,
+                    "judge_ms": None,
+                    "heuristic_ms": None,
+                    "judge_tokens": None,
+                }
+        return prior
+
+    @staticmethod
+    def _new_run(
+        *,
+        prompt: str,
+        target_model: str,
+        test_cases: List[Dict[str, Any]],
+        pass_threshold: float,
+        suite_id: uuid.UUID | None,
+        project_id: str | None,
+        status: str,
+        scoring: Sequence[Any] | None = None,
+    ) -> Tuple[TestRun, List[TestCase]]:
+        """Build a run and its cases; they are fingerprinted when ``scoring`` is known."""
+        run = TestRun(
+            target_model=target_model,
+            prompt_hash=text_hash(prompt),
+            status=status,
+            pass_threshold=pass_threshold,
+            total_cases=len(test_cases),
+            suite_id=suite_id,
+            project_id=project_id or None,
+        )
+        cases = EvalRunner._build_cases(run, test_cases)
+        if scoring is not None:
+            EvalRunner._fingerprint(cases, prompt=prompt, target_model=target_model, scoring=scoring)
+        return run, cases
+
+    @staticmethod
+    def _build_cases(run: TestRun, test_cases: List[Dict[str, Any]]) -> List[TestCase]:
+        return [
+            TestCase(
                 run_id=run.id,
-                input_text=input_text,
-                expected_output=expected_output,
-                extra_metadata=metadata,
+                position=position,
+                input_text=str(case_payload.get("input")),
+                expected_output=case_payload.get("expected_output"),
+                extra_metadata=case_payload.get("metadata"),
+                content_hash=case_payload.get("content_hash"),
             )
-            session.add(case)
-            session.commit()
-            session.refresh(case)
+            for position, case_payload in enumerate(test_cases)
+        ]
 
-            model_output = call_target_model_stub(prompt, input_text, target_model)
+    def _scoring_config(self, scoring_cascade: Sequence[str] | None, pass_threshold: float) -> List[Any]:
+        """The judge and scoring configuration that, besides the case itself, decides its result."""
+        tiers = parse_tiers(get_settings().scoring_cascade if scoring_cascade is None else scoring_cascade)
+        # Which cases score_bounds settles depends on the threshold.
+        threshold = pass_threshold if "score_bounds" in tiers else None
+        return [self.judge_service.model, text_hash(GRADING_PROMPT), tiers, threshold]
 
-            heuristic_score = self._heuristic_score(model_output, expected_output)
-            judge_score, reasoning = self.judge_service.score_output(
-                system_prompt=prompt,
-                test_input=input_text,
-                model_output=model_output,
-                expected_output=expected_output,
+    @staticmethod
+    def _fingerprint(cases: List[TestCase], *, prompt: str, target_model: str, scoring: Sequence[Any]) -> None:
+        for case in cases:
+            case.fingerprint = case_fingerprint(
+                prompt=prompt,
+                target_model=target_model,
+                input_text=case.input_text or "",
+                expected_output=case.expected_output,
+                metadata=case.extra_metadata,
+                scoring=scoring,
             )
-            combined_score = 0.5 * heuristic_score + 0.5 * judge_score
-            passed = combined_score >= pass_threshold
-
-            result = EvalResult(
-                test_case_id=case.id,
-                output_text=model_output,
-                heuristic_score=heuristic_score,
-                judge_score=judge_score,
-                combined_score=combined_score,
-                passed=passed,
-                judge_reasoning=reasoning,
+
+    @staticmethod
+    def _update_fingerprints(session: Session, cases: List[TestCase]) -> None:
+        """Store the fingerprints of persisted cases (not committed).
+
+        Submitted runs are fingerprinted when they are executed, since the
+        judge and cascade are only known then.
+        """
+        if cases:
+            session.execute(
+                update(TestCase),
+                [{"id": case.id, "fingerprint": case.fingerprint} for case in cases],
             )
 
-            session.add(result)
-            session.commit()
+    @staticmethod
+    def _case_row(case: TestCase) -> Dict[str, Any]:
+        row = model_row(case)
+        if case.content_hash:
+            # The text lives once in ``case_contents``; it is only needed in
+            # memory while the case is scored.
+            row.update(input_text=None, expected_output=None, extra_metadata=None)
+        return row
+
+    @staticmethod
+    def _build_result(case: TestCase, outcome: Dict[str, Any]) -> EvalResult:
+        return EvalResult(
+            test_case_id=case.id,
+            model_output_hash=text_hash(outcome["model_output"]),
+            heuristic_score=outcome["heuristic_score"],
+            judge_score=outcome["judge_score"],
+            combined_score=outcome["combined_score"],
+            passed=outcome["passed"],
+            judge_reasoning_hash=text_hash(outcome["judge_reasoning"]),
+            judge_skipped=outcome["judge_skipped"],
+            reused_from_result_id=(
+                uuid.UUID(outcome["reused_from_result_id"]) if outcome["reused_from_result_id"] else None
+            ),
+            target_ms=outcome["target_ms"],
+            judge_ms=outcome["judge_ms"],
+            heuristic_ms=outcome["heuristic_ms"],
+            judge_tokens=outcome["judge_tokens"],
+        )
+
+    @staticmethod
+    def _result_item(case: TestCase, outcome: Dict[str, Any]) -> Dict[str, Any]:
+        """Shape a scored case like ``EvalRunResultItem``."""
+        return {
+            "test_case_id": str(case.id),
+            "input": case.input_text,
+            "expected_output": case.expected_output,
+            **outcome,
+        }
+
+    @staticmethod
+    def _result_texts(outcome: Dict[str, Any]) -> Tuple[str, str]:
+        """The blob-stored texts of a result row built by :meth:`_build_result`."""
+        return outcome["model_output"], outcome["judge_reasoning"]
+
+    def _score_cases(
+        self,
+        cases: List[TestCase],
+        *,
+        prompt: str,
+        target_model: str,
+        pass_threshold: float,
+        max_concurrency: int | None,
+        use_judge_cache: bool,
+        cascade: ScoringCascade,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield one outcome per case, in input order, scoring them concurrently.
+
+        Up to ``max_concurrency`` target calls are in flight, one per case.
+        Their outputs are then judged in groups of ``JUDGE_BATCH_SIZE``, so
+        each group's uncached judge calls can share a single batched request
+        and its heuristics are scored in one batch; up to ``max_concurrency``
+        groups are judged at once.
+        """
+        # Read ORM attributes here; worker threads must never touch the session.
+        inputs = [(case.input_text, case.expected_output, resolve_scorer(case.extra_metadata)) for case in cases]
+        batch_size = max(1, get_settings().judge_batch_size)
+        groups = [inputs[start : start + batch_size] for start in range(0, len(inputs), batch_size)]
+        labels = {"target_model": target_model, "judge_model": self.judge_service.model}
+
+        def judge_group(
+            group: List[Tuple[str, str | None, HeuristicScorer]],
+            generated: List["Future[Tuple[str, float]]"],
+        ) -> List[Dict[str, Any]]:
+            return self._evaluate_group(
+                group,
+                [future.result() for future in generated],
+                prompt=prompt,
+                labels=labels,
+                pass_threshold=pass_threshold,
+                use_judge_cache=use_judge_cache,
+                cascade=cascade,
+            )
+
+        workers = max(1, max_concurrency or get_settings().eval_max_concurrency)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="eval-case") as targets, ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="eval-judge"
+        ) as judges:
+            outputs: List["Future[Tuple[str, float]]"] = []
+            pending: Deque["Future[List[Dict[str, Any]]]"] = deque()
+            for group in groups:
+                generated = [
+                    targets.submit(self._generate, prompt, input_text, target_model, labels)
+                    for input_text, _, _ in group
+                ]
+                outputs.extend(generated)
+                pending.append(judges.submit(judge_group, group, generated))
+            try:
+                # Waiting on the oldest group first keeps outcomes in input order.
+                while pending:
+                    yield from pending.popleft().result()
+            finally:
+                # Cancel work that has not started, so abandoning this
+                # generator does not wait for the whole run.
+                for future in [*outputs, *pending]:
+                    future.cancel()
+
+    async def _ascore_cases(
+        self,
+        cases: List[TestCase],
+        *,
+        prompt: str,
+        target_model: str,
+        pass_threshold: float,
+        max_concurrency: int | None,
+        use_judge_cache: bool,
+        cascade: ScoringCascade,
+        slots: asyncio.Semaphore | None = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Async :meth:`_score_cases`: groups are scored as tasks on the event loop.
+
+        Up to ``max_concurrency`` target calls are in flight, or as many as
+        ``slots`` allows when it is given, and up to ``max_concurrency``
+        groups are judged at once. Tasks are only created for a bounded window
+        of groups ahead of the consumer, so a large run does not hold one task
+        per case.
+        """
+        inputs = [(case.input_text, case.expected_output, resolve_scorer(case.extra_metadata)) for case in cases]
+        batch_size = max(1, get_settings().judge_batch_size)
+        groups = iter([inputs[start : start + batch_size] for start in range(0, len(inputs), batch_size)])
+        labels = {"target_model": target_model, "judge_model": self.judge_service.model}
+
+        workers = max(1, max_concurrency or get_settings().eval_max_concurrency)
+        slots = slots or asyncio.Semaphore(workers)
+        judge_slots = asyncio.Semaphore(workers)
+
+        async def generate(input_text: str) -> Tuple[str, float]:
+            async with slots:
+                return await self._agenerate(prompt, input_text, target_model, labels)
+
+        async def evaluate(group: List[Tuple[str, str | None, HeuristicScorer]]) -> List[Dict[str, Any]]:
+            outputs = await asyncio.gather(*(generate(input_text) for input_text, _, _ in group))
+            async with judge_slots:
+                return await self._aevaluate_group(
+                    group,
+                    outputs,
+                    prompt=prompt,
+                    labels=labels,
+                    pass_threshold=pass_threshold,
+                    use_judge_cache=use_judge_cache,
+                    cascade=cascade,
+                )
+
+        window: Deque["asyncio.Task[List[Dict[str, Any]]]"] = deque()
+
+        def fill() -> None:
+            while len(window) < workers * _ASYNC_WINDOW_PER_WORKER:
+                group = next(groups, None)
+                if group is None:
+                    return
+                window.append(asyncio.ensure_future(evaluate(group)))
+
+        fill()
+        try:
+            # Awaiting the window head first keeps outcomes in input order.
+            while window:
+                outcomes = await window.popleft()
+                fill()
+                for outcome in outcomes:
+                    yield outcome
+        finally:
+            # Cancels groups still queued after an early stop or a failure.
+            for task in window:
+                task.cancel()
 
-            passed_cases += 1 if passed else 0
-            total_score += combined_score
+    def _generate(self, prompt: str, input_text: str, target_model: str, labels: Dict[str, str]) -> Tuple[str, float]:
+        """Call the target model for one case; returns its output and latency in milliseconds."""
+        with _global_slots, time_stage("target", **labels) as timing:
+            model_output = self.providers.generate(prompt, input_text, target_model)
+        return model_output, timing.milliseconds
 
-            detailed_results.append(
+    async def _agenerate(
+        self, prompt: str, input_text: str, target_model: str, labels: Dict[str, str]
+    ) -> Tuple[str, float]:
+        """Async :meth:`_generate`."""
+        async with _global_async_slots:
+            with time_stage("target", **labels) as timing:
+                model_output = await self.providers.agenerate(prompt, input_text, target_model)
+        return model_output, timing.milliseconds
+
+    def _evaluate_group(
+        self,
+        group: List[Tuple[str, str | None, HeuristicScorer]],
+        outputs: List[Tuple[str, float]],
+        *,
+        prompt: str,
+        labels: Dict[str, str],
+        pass_threshold: float,
+        use_judge_cache: bool,
+        cascade: ScoringCascade,
+    ) -> List[Dict[str, Any]]:
+        """Score and judge a group of ``(input, expected, scorer)`` cases from their target outputs.
+
+        ``outputs`` holds each case's ``(model output, target latency)``.
+        Runs on a worker thread, so it must not touch the database session.
+        Only cases the scoring cascade leaves undecided are judged, in one
+        request. Stage latencies are recorded per case, except the judge
+        stage, which is shared by the judged cases of the group.
+        """
+        judge_cases = [
+            JudgeCase(input_text, model_output, expected_output)
+            for (input_text, expected_output, _), (model_output, _) in zip(group, outputs)
+        ]
+        heuristics, heuristic_ms, decisions = self._settle(
+            judge_cases, [scorer for _, _, scorer in group], cascade, labels
+        )
+        undecided = [judge_case for judge_case, decision in zip(judge_cases, decisions) if decision is None]
+        verdicts: List[Tuple[float, str]] = []
+        judge_tokens: List[int] = []
+        judge_ms: float | None = None
+        if undecided:
+            with _global_slots, time_stage("judge", **labels) as judge_timing:
+                verdicts, judge_tokens = self._judge(prompt, undecided, use_judge_cache=use_judge_cache)
+            judge_ms = judge_timing.milliseconds
+
+        return self._group_outcomes(
+            judge_cases,
+            heuristics,
+            decisions,
+            verdicts,
+            judge_tokens,
+            target_ms=[milliseconds for _, milliseconds in outputs],
+            heuristic_ms=heuristic_ms,
+            judge_ms=judge_ms,
+            pass_threshold=pass_threshold,
+        )
+
+    async def _aevaluate_group(
+        self,
+        group: List[Tuple[str, str | None, HeuristicScorer]],
+        outputs: List[Tuple[str, float]],
+        *,
+        prompt: str,
+        labels: Dict[str, str],
+        pass_threshold: float,
+        use_judge_cache: bool,
+        cascade: ScoringCascade,
+    ) -> List[Dict[str, Any]]:
+        """Async :meth:`_evaluate_group`."""
+        judge_cases = [
+            JudgeCase(input_text, model_output, expected_output)
+            for (input_text, expected_output, _), (model_output, _) in zip(group, outputs)
+        ]
+        heuristics, heuristic_ms, decisions = self._settle(
+            judge_cases, [scorer for _, _, scorer in group], cascade, labels
+        )
+        undecided = [judge_case for judge_case, decision in zip(judge_cases, decisions) if decision is None]
+        verdicts: List[Tuple[float, str]] = []
+        judge_tokens: List[int] = []
+        judge_ms: float | None = None
+        if undecided:
+            async with _global_async_slots:
+                with time_stage("judge", **labels) as judge_timing:
+                    verdicts, judge_tokens = await self._ajudge(prompt, undecided, use_judge_cache=use_judge_cache)
+            judge_ms = judge_timing.milliseconds
+
+        return self._group_outcomes(
+            judge_cases,
+            heuristics,
+            decisions,
+            verdicts,
+            judge_tokens,
+            target_ms=[milliseconds for _, milliseconds in outputs],
+            heuristic_ms=heuristic_ms,
+            judge_ms=judge_ms,
+            pass_threshold=pass_threshold,
+        )
+
+    def _settle(
+        self,
+        judge_cases: List[JudgeCase],
+        scorers: List[HeuristicScorer],
+        cascade: ScoringCascade,
+        labels: Dict[str, str],
+    ) -> Tuple[List[float], float, List[CascadeDecision | None]]:
+        """Heuristic-score a group in one batch and let the cascade decide what it can.
+
+        Returns the heuristic scores, each case's share of the batch's time,
+        and the cascade's decision per case (``None`` where the judge is
+        still needed).
+        """
+        with time_stage("heuristic", **labels) as timing:
+            scores = score_outputs(
+                [judge_case.model_output for judge_case in judge_cases],
+                [judge_case.expected_output for judge_case in judge_cases],
+                scorers,
+            )
+            decisions = [
+                cascade.decide(judge_case.model_output, judge_case.expected_output, score)
+                for judge_case, score in zip(judge_cases, scores)
+            ]
+        for decision in decisions:
+            if decision is not None:
+                JUDGE_SKIPPED.labels(self.judge_service.model, decision.reason).inc()
+        return scores, timing.milliseconds / len(judge_cases), decisions
+
+    @staticmethod
+    def _group_outcomes(
+        judge_cases: List[JudgeCase],
+        heuristic_scores: List[float],
+        decisions: List[CascadeDecision | None],
+        verdicts: List[Tuple[float, str]],
+        judge_tokens: List[int],
+        *,
+        target_ms: List[float],
+        heuristic_ms: float,
+        judge_ms: float | None,
+        pass_threshold: float,
+    ) -> List[Dict[str, Any]]:
+        """Combine heuristic scores with cascade decisions and judge verdicts into outcome dicts.
+
+        ``verdicts`` and ``judge_tokens`` hold one entry per undecided case, in order.
+        """
+        judged = iter(zip(verdicts, judge_tokens))
+        outcomes: List[Dict[str, Any]] = []
+        for index, judge_case in enumerate(judge_cases):
+            heuristic_score = heuristic_scores[index]
+            decision = decisions[index]
+            passed: bool | None = None
+            if decision is None:
+                (judge_score, reasoning), tokens = next(judged)
+                case_judge_ms, skipped = judge_ms, None
+            else:
+                judge_score, reasoning, skipped, passed = decision
+                tokens, case_judge_ms = 0, None
+            combined_score = 0.5 * heuristic_score + 0.5 * judge_score
+            if passed is None:
+                passed = combined_score >= pass_threshold
+            outcomes.append(
                 {
-                    "test_case_id": str(case.id),
-                    "input": input_text,
-                    "expected_output": expected_output,
-                    "model_output": model_output,
+                    "model_output": judge_case.model_output,
                     "heuristic_score": heuristic_score,
                     "judge_score": judge_score,
                     "combined_score": combined_score,
                     "passed": passed,
                     "judge_reasoning": reasoning,
+                    "judge_skipped": skipped,
+                    "reused_from_result_id": None,
+                    "target_ms": target_ms[index],
+                    "judge_ms": case_judge_ms,
+                    "heuristic_ms": heuristic_ms,
+                    "judge_tokens": tokens,
                 }
             )
+        return outcomes
 
-        run.total_cases = len(test_cases)
-        run.passed_cases = passed_cases
-        run.average_score = total_score / run.total_cases if run.total_cases else 0.0
-        run.overall_pass = run.average_score >= pass_threshold
-        run.status = "completed"
+    def _judge(
+        self,
+        prompt: str,
+        cases: List[JudgeCase],
+        *,
+        use_judge_cache: bool,
+    ) -> Tuple[List[Tuple[float, str]], List[int]]:
+        """Score outputs with the judge, going through the judge cache if enabled.
 
+        Only cache misses are sent to the judge, as one batched request.
+        Returns the verdicts and each case's share of the judge tokens spent
+        (0 for cache hits).
+        """
+        keys = self._cache_keys(prompt, cases) if use_judge_cache else []
+        # This runs on a worker thread, away from the run's session, so the
+        # cache reads and writes the group through a session of its own.
+        verdicts: List[Tuple[float, str] | None] = (
+            self.judge_cache.get_many(keys) if use_judge_cache else [None] * len(cases)
+        )
+        tokens = [0] * len(cases)
+        misses = [index for index, verdict in enumerate(verdicts) if verdict is None]
+        if misses:
+            with track_judge_usage() as usage:
+                fresh = self.judge_service.score_batch(prompt, [cases[index] for index in misses])
+            shares = self._token_shares(usage.total_tokens, len(misses))
+            cacheable: List[Tuple[str, float, str]] = []
+            for index, (score, reasoning), share in zip(misses, fresh, shares):
+                verdicts[index] = (score, reasoning)
+                tokens[index] = share
+                # Unparseable judge replies are transient; do not pin them in the cache.
+                if use_judge_cache and not reasoning.startswith(PARSE_FAILURE_PREFIX):
+                    cacheable.append((keys[index], score, reasoning))
+            if cacheable:
+                self.judge_cache.put_many(cacheable, judge_model=self.judge_service.model)
+        return verdicts, tokens
+
+    async def _ajudge(
+        self,
+        prompt: str,
+        cases: List[JudgeCase],
+        *,
+        use_judge_cache: bool,
+    ) -> Tuple[List[Tuple[float, str]], List[int]]:
+        """Async :meth:`_judge`."""
+        keys = self._cache_keys(prompt, cases) if use_judge_cache else []
+        verdicts: List[Tuple[float, str] | None] = (
+            await self.judge_cache.aget_many(keys) if use_judge_cache else [None] * len(cases)
+        )
+        tokens = [0] * len(cases)
+        misses = [index for index, verdict in enumerate(verdicts) if verdict is None]
+        if misses:
+            with track_judge_usage() as usage:
+                fresh = await self.judge_service.ascore_batch(prompt, [cases[index] for index in misses])
+            shares = self._token_shares(usage.total_tokens, len(misses))
+            cacheable: List[Tuple[str, float, str]] = []
+            for index, (score, reasoning), share in zip(misses, fresh, shares):
+                verdicts[index] = (score, reasoning)
+                tokens[index] = share
+                if use_judge_cache and not reasoning.startswith(PARSE_FAILURE_PREFIX):
+                    cacheable.append((keys[index], score, reasoning))
+            if cacheable:
+                await self.judge_cache.aput_many(cacheable, judge_model=self.judge_service.model)
+        return verdicts, tokens
+
+    def _cache_keys(self, prompt: str, cases: List[JudgeCase]) -> List[str]:
+        return [
+            JudgeCache.make_key(
+                judge_model=self.judge_service.model,
+                system_prompt=prompt,
+                test_input=case.test_input,
+                model_output=case.model_output,
+                expected_output=case.expected_output,
+            )
+            for case in cases
+        ]
+
+    @staticmethod
+    def _token_shares(total_tokens: int, count: int) -> List[int]:
+        """Split ``total_tokens`` into ``count`` near-equal integer shares."""
+        share, remainder = divmod(total_tokens, count)
+        return [share + (1 if position < remainder else 0) for position in range(count)]
+
+    @staticmethod
+    def _flush_progress(
+        session: Session,
+        run: TestRun,
+        result_rows: List[Dict[str, Any]],
+        texts: List[str],
+    ) -> None:
+        if not result_rows:
+            return
+        put_texts(session, texts)
+        bulk_insert(session, EvalResult, result_rows)
+        run.completed_cases += len(result_rows)
         session.add(run)
         session.commit()
-        session.refresh(run)
 
-        return {
-            "run_id": str(run.id),
-            "overall_pass": run.overall_pass,
-            "average_score": run.average_score,
-            "total_cases": run.total_cases,
-            "passed_cases": run.passed_cases,
-            "pass_threshold": run.pass_threshold,
-            "results": detailed_results,
-        }
+    @staticmethod
+    def _evaluation_order(cases: List[TestCase], randomize: bool) -> List[TestCase]:
+        if not randomize:
+            return cases
+        return random.sample(cases, len(cases))
+
+    @staticmethod
+    def _cascade(tiers: Sequence[str] | None, pass_threshold: float) -> ScoringCascade:
+        """The run's scoring cascade, falling back to ``SCORING_CASCADE``."""
+        return ScoringCascade(get_settings().scoring_cascade if tiers is None else tiers, pass_threshold)
+
+    @staticmethod
+    def _stopper(pass_threshold: float, early_stop: bool, confidence: float) -> SequentialStopper | None:
+        if not early_stop:
+            return None
+        return SequentialStopper(
+            pass_threshold,
+            confidence=confidence,
+            min_cases=get_settings().early_stop_min_cases,
+        )
 
     @staticmethod
-    def _heuristic_score(model_output: str, expected_output: str | None) -> float:
-        """Very simple heuristic for MVP.
+    def _mark_skipped(session: Session, case_ids: List[uuid.UUID]) -> None:
+        size = max(1, get_settings().db_bulk_chunk_size)
+        for start in range(0, len(case_ids), size):
+            session.execute(
+                update(TestCase).where(TestCase.id.in_(case_ids[start : start + size])).values(skipped=True)
+            )
 
-        If expected_output is provided, returns 1.0 if it is a substring of the
-        model output (case-insensitive), else 0.0. If no expected_output is
-        provided, always returns 0.5.
+    @staticmethod
+    def finalize_run(
+        session: Session,
+        run: TestRun,
+        *,
+        skipped_cases: int = 0,
+        stop_reason: str | None = None,
+    ) -> None:
+        """Compute run aggregates from the stored results and mark it completed.
+
+        The run is added to the dashboard rollups in the same transaction.
         """
-        if not expected_output:
-            return 0.5
-        return 1.0 if expected_output.lower() in model_output.lower() else 0.0
+        statement = (
+            select(
+                func.count(EvalResult.id),
+                func.coalesce(func.sum(case_((EvalResult.passed, 1), else_=0)), 0),
+                func.coalesce(func.avg(EvalResult.combined_score), 0.0),
+            )
+            .select_from(EvalResult)
+            .join(TestCase, TestCase.id == EvalResult.test_case_id)
+            .where(TestCase.run_id == run.id)
+        )
+        scored, passed_cases, average_score = session.exec(statement).one()
+
+        run.completed_cases = scored
+        run.skipped_cases = skipped_cases
+        run.stop_reason = stop_reason
+        run.passed_cases = passed_cases
+        run.average_score = float(average_score)
+        run.overall_pass = run.average_score >= run.pass_threshold
+        newly_completed = run.status != "completed"
+        run.status = "completed"
+        session.add(run)
+        if newly_completed:
+            record_completed_run(session, run)
+        session.commit()
@@ -0,0 +1,362 @@
+"""Heuristic scorers, selectable per test case and applied in batch.
+
+A case picks its scorer through ``metadata["scorer"]``. The value is either
+a scorer name or an object with a ``name`` and that scorer's parameters:
+
+    {"scorer": "token_f1"}
+    {"scorer": {"name": "numeric", "rel_tol": 0.01}}
+    {"scorer": {"name": "regex", "pattern": "^yes\\b", "flags": "i"}}
+
+Cases without one use ``contains``, the original case-insensitive
+substring check. Scorers are built once per distinct spec, with patterns
+and schemas compiled up front. Expected outputs repeat across runs, so
+their normalized forms, token counts and numbers are memoized; outputs are
+processed once. :func:`score_outputs` groups a batch of outputs by scorer
+and scores each group in one call, with the per-case arithmetic done in
+NumPy.
+
+Scores are in ``[0, 1]``. Scorers that compare against ``expected_output``
+score a case without one as 0.5, like the original heuristic.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import string
+import unicodedata
+from collections import Counter, defaultdict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from jsonschema import exceptions as jsonschema_exceptions, validators as jsonschema_validators
+
+
+DEFAULT_SCORER = "contains"
+NO_REFERENCE_SCORE = 0.5
+
+_NUMBER = re.compile(r"[-+]?(?:(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?|\.\d+)(?:[eE][-+]?\d+)?")
+_ARTICLES = frozenset(("a", "an", "the"))
+_PUNCTUATION = str.maketrans("", "", string.punctuation)
+_PUNCTUATION_BYTES = string.punctuation.encode("ascii")
+_DIGITS = "0123456789"
+# Longest numeral :func:`_last_number` looks for.
+_NUMBER_WINDOW = 64
+_FENCE = re.compile(r"^```(?:json)?\s*(.*?)\s*```$", re.S)
+_REGEX_FLAGS = {"i": re.IGNORECASE, "m": re.MULTILINE, "s": re.DOTALL, "x": re.VERBOSE}
+
+
+def words(text: str) -> List[str]:
+    """Casefolded words of ``text`` without punctuation and articles."""
+    if text.isascii():
+        # Byte-level deletion is much faster than str.translate.
+        text = text.lower().encode("ascii").translate(None, _PUNCTUATION_BYTES).decode("ascii")
+    else:
+        text = unicodedata.normalize("NFKC", text).casefold().translate(_PUNCTUATION)
+    return [word for word in text.split() if word not in _ARTICLES]
+
+
+def normalize(text: str) -> str:
+    return " ".join(words(text))
+
+
+def _last_number(text: str) -> float:
+    end = max(text.rfind(digit) for digit in _DIGITS)
+    if end < 0:
+        return float("nan")
+    matches = _NUMBER.findall(text, max(0, end - _NUMBER_WINDOW), end + 1)
+    return float(matches[-1].replace(",", "")) if matches else float("nan")
+
+
+@lru_cache(maxsize=65536)
+def _reference_normalized(text: str) -> str:
+    return normalize(text)
+
+
+@lru_cache(maxsize=65536)
+def _reference_words(text: str) -> Tuple[str, ...]:
+    return tuple(words(text))
+
+
+@lru_cache(maxsize=65536)
+def _reference_counts(text: str) -> Counter:
+    return Counter(_reference_words(text))
+
+
+@lru_cache(maxsize=65536)
+def _reference_masks(text: str) -> Dict[str, int]:
+    """Bit mask of each word's positions in the reference, for :func:`_lcs_length`."""
+    masks: Dict[str, int] = {}
+    for index, word in enumerate(_reference_words(text)):
+        masks[word] = masks.get(word, 0) | (1 << index)
+    return masks
+
+
+@lru_cache(maxsize=65536)
+def _reference_casefold(text: str) -> str:
+    return text.casefold()
+
+
+@lru_cache(maxsize=65536)
+def _reference_number(text: str) -> float:
+    return _last_number(text)
+
+
+@lru_cache(maxsize=4096)
+def _compile(pattern: str, flags: int) -> Optional[re.Pattern]:
+    try:
+        return re.compile(pattern, flags)
+    except re.error:
+        return None
+
+
+class HeuristicScorer:
+    """Scores a batch of outputs; subclasses implement :meth:`_score`."""
+
+    name = ""
+    # Scorers that compare against ``expected_output``.
+    needs_reference = True
+
+    def score_batch(self, outputs: Sequence[str], references: Sequence[Optional[str]]) -> np.ndarray:
+        scores = np.full(len(outputs), NO_REFERENCE_SCORE)
+        if not self.needs_reference:
+            scores[:] = self._score(outputs, references)
+            return scores
+
+        present = [index for index, reference in enumerate(references) if reference]
+        if present:
+            scores[present] = self._score([outputs[i] for i in present], [references[i] for i in present])
+        return scores
+
+    def _score(self, outputs: Sequence[str], references: Sequence[Optional[str]]) -> np.ndarray:
+        raise NotImplementedError
+
+
+class ContainsScorer(HeuristicScorer):
+    """1.0 when the expected output occurs in the output, ignoring case."""
+
+    name = "contains"
+
+    def _score(self, outputs: Sequence[str], references: Sequence[str]) -> np.ndarray:
+        return np.fromiter(
+            (_reference_casefold(reference) in output.casefold() for output, reference in zip(outputs, references)),
+            dtype=float,
+            count=len(outputs),
+        )
+
+
+class ExactScorer(HeuristicScorer):
+    """1.0 when the output equals the expected output, ignoring surrounding whitespace."""
+
+    name = "exact"
+
+    def _score(self, outputs: Sequence[str], references: Sequence[str]) -> np.ndarray:
+        return np.fromiter(
+            (output.strip() == reference.strip() for output, reference in zip(outputs, references)),
+            dtype=float,
+            count=len(outputs),
+        )
+
+
+class NormalizedScorer(HeuristicScorer):
+    """Exact match after :func:`normalize`."""
+
+    name = "normalized"
+
+    def _score(self, outputs: Sequence[str], references: Sequence[str]) -> np.ndarray:
+        return np.fromiter(
+            (normalize(output) == _reference_normalized(reference) for output, reference in zip(outputs, references)),
+            dtype=float,
+            count=len(outputs),
+        )
+
+
+class RegexScorer(HeuristicScorer):
+    """1.0 when ``pattern`` (or, without one, the expected output as a pattern) matches.
+
+    ``flags`` is any of ``imsx``; ``fullmatch`` requires the whole output to match.
+    """
+
+    name = "regex"
+
+    def __init__(self, pattern: str | None = None, flags: str = "", fullmatch: bool = False) -> None:
+        unknown = set(flags) - set(_REGEX_FLAGS)
+        if unknown:
+            raise ValueError(f"Unknown regex flags: {''.join(sorted(unknown))}")
+        self.flags = 0
+        for flag in flags:
+            self.flags |= _REGEX_FLAGS[flag]
+        self.fullmatch = fullmatch
+        self.pattern = None
+        if pattern is not None:
+            self.pattern = _compile(pattern, self.flags)
+            if self.pattern is None:
+                raise ValueError(f"Invalid regex pattern: {pattern!r}")
+            self.needs_reference = False
+
+    def _score(self, outputs: Sequence[str], references: Sequence[Optional[str]]) -> np.ndarray:
+        scores = np.zeros(len(outputs))
+        for index, (output, reference) in enumerate(zip(outputs, references)):
+            pattern = self.pattern or _compile(reference, self.flags)
+            if pattern is not None:
+                match = pattern.fullmatch(output) if self.fullmatch else pattern.search(output)
+                scores[index] = match is not None
+        return scores
+
+
+class TokenF1Scorer(HeuristicScorer):
+    """Harmonic mean of token precision and recall over normalized tokens."""
+
+    name = "token_f1"
+
+    def _score(self, outputs: Sequence[str], references: Sequence[str]) -> np.ndarray:
+        overlap = np.empty(len(outputs))
+        lengths = np.empty(len(outputs))
+        for index, (output, reference) in enumerate(zip(outputs, references)):
+            predicted, expected = Counter(words(output)), _reference_counts(reference)
+            overlap[index] = sum(min(count, predicted[word]) for word, count in expected.items() if word in predicted)
+            lengths[index] = predicted.total() + expected.total()
+        return _f_measure(overlap, lengths)
+
+
+class RougeLScorer(HeuristicScorer):
+    """ROUGE-L F-measure: longest common token subsequence against both lengths.
+
+    The LCS is computed bit-parallel over the reference's cached position
+    masks, one big-int step per output token.
+    """
+
+    name = "rouge_l"
+
+    def _score(self, outputs: Sequence[str], references: Sequence[str]) -> np.ndarray:
+        common = np.empty(len(outputs))
+        lengths = np.empty(len(outputs))
+        for index, (output, reference) in enumerate(zip(outputs, references)):
+            predicted, expected = words(output), _reference_words(reference)
+            common[index] = _lcs_length(_reference_masks(reference), len(expected), predicted)
+            lengths[index] = len(predicted) + len(expected)
+        return _f_measure(common, lengths)
+
+
+class NumericScorer(HeuristicScorer):
+    """1.0 when the last number in the output is within tolerance of the expected number."""
+
+    name = "numeric"
+
+    def __init__(self, abs_tol: float = 1e-6, rel_tol: float = 0.0) -> None:
+        if abs_tol < 0 or rel_tol < 0:
+            raise ValueError("abs_tol and rel_tol must not be negative")
+        self.abs_tol = float(abs_tol)
+        self.rel_tol = float(rel_tol)
+
+    def _score(self, outputs: Sequence[str], references: Sequence[str]) -> np.ndarray:
+        actual = np.fromiter((_last_number(output) for output in outputs), dtype=float, count=len(outputs))
+        expected = np.fromiter((_reference_number(reference) for reference in references), dtype=float, count=len(outputs))
+        # NaN (no number found) never compares close.
+        return np.isclose(actual, expected, rtol=self.rel_tol, atol=self.abs_tol).astype(float)
+
+
+class JsonSchemaScorer(HeuristicScorer):
+    """1.0 when the output (optionally in a ```json fence) is JSON valid against ``schema``.
+
+    Without a schema, any well-formed JSON scores 1.0.
+    """
+
+    name = "json_schema"
+    needs_reference = False
+
+    def __init__(self, schema: Dict[str, Any] | bool | None = None) -> None:
+        self.validator = None
+        if schema is not None:
+            validator_class = jsonschema_validators.validator_for(schema)
+            try:
+                validator_class.check_schema(schema)
+            except jsonschema_exceptions.SchemaError as exc:
+                raise ValueError(f"Invalid JSON schema: {exc.message}") from exc
+            self.validator = validator_class(schema)
+
+    def _score(self, outputs: Sequence[str], references: Sequence[Optional[str]]) -> np.ndarray:
+        scores = np.zeros(len(outputs))
+        for index, output in enumerate(outputs):
+            text = output.strip()
+            fenced = _FENCE.match(text)
+            try:
+                document = json.loads(fenced.group(1) if fenced else text)
+            except ValueError:
+                continue
+            scores[index] = self.validator is None or self.validator.is_valid(document)
+        return scores
+
+
+SCORERS: Dict[str, type[HeuristicScorer]] = {
+    scorer.name: scorer
+    for scorer in (
+        ContainsScorer,
+        ExactScorer,
+        NormalizedScorer,
+        RegexScorer,
+        TokenF1Scorer,
+        RougeLScorer,
+        NumericScorer,
+        JsonSchemaScorer,
+    )
+}
+
+
+def resolve_scorer(metadata: Dict[str, Any] | None) -> HeuristicScorer:
+    """The scorer a case's metadata selects; raises ``ValueError`` for an invalid spec."""
+    spec = (metadata or {}).get("scorer", DEFAULT_SCORER)
+    return _build_scorer(json.dumps(spec, sort_keys=True))
+
+
+@lru_cache(maxsize=1024)
+def _build_scorer(spec_json: str) -> HeuristicScorer:
+    spec = json.loads(spec_json)
+    if isinstance(spec, str):
+        spec = {"name": spec}
+    if not isinstance(spec, dict) or not isinstance(spec.get("name"), str):
+        raise ValueError("metadata.scorer must be a scorer name or an object with a 'name'")
+
+    params = dict(spec)
+    name = params.pop("name")
+    scorer_class = SCORERS.get(name)
+    if scorer_class is None:
+        raise ValueError(f"Unknown scorer {name!r} (expected one of {', '.join(SCORERS)})")
+    try:
+        return scorer_class(**params)
+    except TypeError as exc:
+        raise ValueError(f"Invalid parameters for scorer {name!r}: {exc}") from exc
+
+
+def score_outputs(
+    outputs: Sequence[str],
+    references: Sequence[Optional[str]],
+    scorers: Sequence[HeuristicScorer],
+) -> List[float]:
+    """Score each output with its scorer, one batch per distinct scorer."""
+    batches: Dict[int, List[int]] = defaultdict(list)
+    for index, scorer in enumerate(scorers):
+        batches[id(scorer)].append(index)
+
+    scores = np.empty(len(outputs))
+    for indices in batches.values():
+        scorer = scorers[indices[0]]
+        scores[indices] = scorer.score_batch([outputs[i] for i in indices], [references[i] for i in indices])
+    return scores.tolist()
+
+
+def _f_measure(common: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """``2 * common / (len_a + len_b)``; two empty token lists match perfectly."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(lengths > 0, 2.0 * common / lengths, 1.0)
+
+
+def _lcs_length(masks: Dict[str, int], length: int, sequence: Sequence[str]) -> int:
+    """LCS length of ``sequence`` and the ``length``-word text ``masks`` describes (Hyyro's bit-vector algorithm)."""
+    full = (1 << length) - 1
+    vector = full
+    for word in sequence:
+        matches = vector & masks.get(word, 0)
+        vector = ((vector + matches) | (vector - matches)) & full
+    return length - vector.bit_count()
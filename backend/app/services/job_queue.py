@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Tuple
+
+from sqlmodel import Session, select
+
+from ..core.config import get_settings
+from ..database import engine
+from ..models import TestRun
+from .eval_runner import EvalRunner
+
+
+logger = logging.getLogger(__name__)
+
+# (run_id, keyword options forwarded to EvalRunner.execute_run)
+_Job = Tuple[uuid.UUID, Dict[str, Any]]
+
+
+class EvalJobQueue:
+    """In-process queue of submitted runs drained by background worker threads.
+
+    The database is the source of truth: a submitted run is already persisted
+    as ``pending`` before it is queued, and :meth:`start` re-queues runs that
+    were left ``pending`` or ``running`` by a previous process. This assumes a
+    single API process owns the queue.
+    """
+
+    def __init__(self, runner_factory: Callable[[], EvalRunner] = EvalRunner) -> None:
+        self._runner_factory = runner_factory
+        self._runner: EvalRunner | None = None
+        self._runner_lock = threading.Lock()
+        self._jobs: "queue.Queue[_Job | None]" = queue.Queue()
+        self._workers: List[threading.Thread] = []
+        self._stopping = threading.Event()
+
+    def start(self, worker_count: int | None = None) -> None:
+        if self._workers:
+            return
+
+        self._stopping.clear()
+        count = max(1, worker_count or get_settings().eval_worker_count)
+        for index in range(count):
+            worker = threading.Thread(target=self._work, name=f"eval-worker-{index}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+        self._recover_unfinished_runs()
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Stop the workers without starting any more runs.
+
+        Queued runs are dropped from the queue; they stay ``pending`` in the
+        database and are recovered by the next :meth:`start`. Runs already
+        executing get up to ``timeout`` seconds (``EVAL_SHUTDOWN_TIMEOUT_SECONDS``)
+        to finish; the rest are resumed on the next start as well. This
+        blocks, so call it from a thread in async code.
+        """
+        self._stopping.set()
+        while True:
+            try:
+                self._jobs.get_nowait()
+            except queue.Empty:
+                break
+            self._jobs.task_done()
+        for _ in self._workers:
+            self._jobs.put(None)
+
+        timeout = get_settings().eval_shutdown_timeout_seconds if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        for worker in self._workers:
+            worker.join(max(0.0, deadline - time.monotonic()))
+        unfinished = [worker.name for worker in self._workers if worker.is_alive()]
+        if unfinished:
+            logger.warning(
+                "Eval workers %s still running after %.0fs; their runs resume on the next start",
+                ", ".join(unfinished),
+                timeout,
+            )
+        self._workers = []
+
+    def set_runner_factory(self, runner_factory: Callable[[], EvalRunner]) -> None:
+        """Replace the runner used for jobs picked up from now on."""
+        with self._runner_lock:
+            self._runner_factory = runner_factory
+            self._runner = None
+
+    def submit(self, run_id: uuid.UUID, **options: Any) -> None:
+        """Queue a persisted run; ``options`` are passed to ``EvalRunner.execute_run``."""
+        self._jobs.put((run_id, options))
+
+    def _get_runner(self) -> EvalRunner:
+        # Built lazily so a missing judge configuration surfaces as a failed
+        # run instead of preventing the app from starting.
+        with self._runner_lock:
+            if self._runner is None:
+                self._runner = self._runner_factory()
+            return self._runner
+
+    def _recover_unfinished_runs(self) -> None:
+        with Session(engine) as session:
+            statement = (
+                select(TestRun.id, TestRun.execution_options)
+                .where(TestRun.status.in_(("pending", "running")))
+                .order_by(TestRun.created_at)
+            )
+            for run_id, options in session.exec(statement).all():
+                # Resume with the options the run was submitted with.
+                self.submit(run_id, **(options or {}))
+
+    def _work(self) -> None:
+        while True:
+            job = self._jobs.get()
+            try:
+                if job is None:
+                    return
+                if not self._stopping.is_set():
+                    self._run_job(*job)
+            finally:
+                self._jobs.task_done()
+
+    def _run_job(self, run_id: uuid.UUID, options: Dict[str, Any]) -> None:
+        with Session(engine) as session:
+            try:
+                self._get_runner().execute_run(session, run_id, **options)
+            except Exception as exc:  # noqa: BLE001
+                logger.exception("Eval run %s failed", run_id)
+                EvalRunner.fail_run(session, run_id, exc)
+
+
+job_queue = EvalJobQueue()
@@ -0,0 +1,267 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from ..core.config import get_settings
+from ..database import engine, new_async_session
+from ..models import JudgeCacheEntry
+from .judge_service import GRADING_PROMPT
+from .persistence import bulk_insert
+
+
+class JudgeCache:
+    """Content-addressed cache of judge verdicts.
+
+    Entries are keyed by a hash of everything that influences the judge's
+    answer: the grading prompt, judge model, system prompt, test input, model
+    output and expected output. Lookups go to a bounded in-process LRU first
+    and then to the ``judge_cache`` table; persistent hits are promoted into
+    memory. Both tiers honour ``JUDGE_CACHE_TTL_SECONDS`` (0 disables expiry).
+    ``get_many`` / ``put_many`` serve a whole judge group with one query and
+    one bulk insert; the ``a``-prefixed variants go through the asyncio engine.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_entries: int | None = None,
+        ttl_seconds: int | None = None,
+        persistent: bool | None = None,
+    ) -> None:
+        settings = get_settings()
+        self.max_entries = max_entries if max_entries is not None else settings.judge_cache_max_entries
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.judge_cache_ttl_seconds
+        self.persistent = persistent if persistent is not None else settings.judge_cache_persistent
+
+        self._entries: "OrderedDict[str, Tuple[float, str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "persistent_hits": 0, "misses": 0, "evictions": 0}
+
+    @staticmethod
+    def make_key(
+        *,
+        judge_model: str,
+        system_prompt: str,
+        test_input: str,
+        model_output: str,
+        expected_output: str | None,
+    ) -> str:
+        payload = json.dumps(
+            [GRADING_PROMPT, judge_model, system_prompt, test_input, model_output, expected_output],
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[float, str]]:
+        return self.get_many([key])[0]
+
+    async def aget(self, key: str) -> Optional[Tuple[float, str]]:
+        return (await self.aget_many([key]))[0]
+
+    def put(self, key: str, *, judge_model: str, score: float, reasoning: str) -> None:
+        self.put_many([(key, score, reasoning)], judge_model=judge_model)
+
+    async def aput(self, key: str, *, judge_model: str, score: float, reasoning: str) -> None:
+        await self.aput_many([(key, score, reasoning)], judge_model=judge_model)
+
+    def get_many(self, keys: Sequence[str], session: Session | None = None) -> List[Optional[Tuple[float, str]]]:
+        """Look up ``keys`` in memory, then the rest with one ``IN`` query per chunk.
+
+        The persistent tier is read through ``session`` when given (nothing is
+        committed), otherwise through one short-lived session for all keys.
+        """
+        verdicts = [self._get_memory(key) for key in keys]
+        missing = self._missing(keys, verdicts)
+        if missing:
+            if session is not None:
+                rows = self._select(session, missing)
+            else:
+                with Session(engine) as own_session:
+                    rows = self._select(own_session, missing)
+            self._promote_many(keys, verdicts, rows)
+        return self._count_misses(verdicts)
+
+    async def aget_many(
+        self, keys: Sequence[str], session: AsyncSession | None = None
+    ) -> List[Optional[Tuple[float, str]]]:
+        """Async :meth:`get_many`."""
+        verdicts = [self._get_memory(key) for key in keys]
+        missing = self._missing(keys, verdicts)
+        if missing:
+            if session is not None:
+                rows = await session.run_sync(self._select, missing)
+            else:
+                async with new_async_session() as own_session:
+                    rows = await own_session.run_sync(self._select, missing)
+            self._promote_many(keys, verdicts, rows)
+        return self._count_misses(verdicts)
+
+    def put_many(
+        self,
+        verdicts: Sequence[Tuple[str, float, str]],
+        *,
+        judge_model: str,
+        session: Session | None = None,
+    ) -> None:
+        """Store ``(key, score, reasoning)`` verdicts with one bulk insert per chunk.
+
+        With ``session`` the rows join the caller's transaction; otherwise
+        they are committed through a short-lived session.
+        """
+        self._remember_many(verdicts)
+        if not self.persistent or not verdicts:
+            return
+        if session is not None:
+            self._insert(session, verdicts, judge_model)
+            return
+        with Session(engine) as own_session:
+            self._insert(own_session, verdicts, judge_model)
+            own_session.commit()
+
+    async def aput_many(
+        self,
+        verdicts: Sequence[Tuple[str, float, str]],
+        *,
+        judge_model: str,
+        session: AsyncSession | None = None,
+    ) -> None:
+        """Async :meth:`put_many`."""
+        self._remember_many(verdicts)
+        if not self.persistent or not verdicts:
+            return
+        if session is not None:
+            await session.run_sync(self._insert, verdicts, judge_model)
+            return
+        async with new_async_session() as own_session:
+            await own_session.run_sync(self._insert, verdicts, judge_model)
+            await own_session.commit()
+
+    def purge_expired(self) -> int:
+        """Delete expired rows from the persistent tier and return how many."""
+        if not self.persistent or not self.ttl_seconds:
+            return 0
+        cutoff = datetime.utcnow() - timedelta(seconds=self.ttl_seconds)
+        with Session(engine) as session:
+            result = session.execute(delete(JudgeCacheEntry).where(JudgeCacheEntry.created_at < cutoff))
+            session.commit()
+            return result.rowcount or 0
+
+    def clear(self) -> None:
+        """Drop the in-memory tier; persistent entries are left untouched."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._counters, "memory_entries": len(self._entries)}
+
+    def _get_memory(self, key: str) -> Optional[Tuple[float, str]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                score, reasoning, stored_at = entry
+                if not self._expired(stored_at):
+                    self._entries.move_to_end(key)
+                    self._counters["memory_hits"] += 1
+                    return score, reasoning
+                del self._entries[key]
+        return None
+
+    def _missing(self, keys: Sequence[str], verdicts: List[Optional[Tuple[float, str]]]) -> List[str]:
+        """Distinct keys the memory tier missed, if the persistent tier is enabled."""
+        if not self.persistent:
+            return []
+        return sorted({key for key, verdict in zip(keys, verdicts) if verdict is None})
+
+    @staticmethod
+    def _select(session: Session, keys: List[str]) -> Dict[str, JudgeCacheEntry]:
+        size = max(1, get_settings().db_bulk_chunk_size)
+        rows: Dict[str, JudgeCacheEntry] = {}
+        for start in range(0, len(keys), size):
+            statement = select(JudgeCacheEntry).where(JudgeCacheEntry.key.in_(keys[start : start + size]))
+            rows.update((row.key, row) for row in session.exec(statement))
+        return rows
+
+    def _insert(self, session: Session, verdicts: Sequence[Tuple[str, float, str]], judge_model: str) -> None:
+        entries = {key: self._entry(key, judge_model, score, reasoning) for key, score, reasoning in verdicts}
+        if self.ttl_seconds:
+            # Expired rows would otherwise block the fresh verdict below.
+            cutoff = datetime.utcnow() - timedelta(seconds=self.ttl_seconds)
+            session.execute(
+                delete(JudgeCacheEntry).where(
+                    JudgeCacheEntry.key.in_(list(entries)), JudgeCacheEntry.created_at < cutoff
+                )
+            )
+        # Another worker may store the same verdict first.
+        bulk_insert(session, JudgeCacheEntry, [entry.model_dump() for entry in entries.values()], ignore_conflicts=True)
+
+    def _promote_many(
+        self,
+        keys: Sequence[str],
+        verdicts: List[Optional[Tuple[float, str]]],
+        rows: Dict[str, JudgeCacheEntry],
+    ) -> None:
+        for index, key in enumerate(keys):
+            if verdicts[index] is None:
+                verdicts[index] = self._promote(key, rows.get(key))
+
+    def _count_misses(self, verdicts: List[Optional[Tuple[float, str]]]) -> List[Optional[Tuple[float, str]]]:
+        misses = sum(verdict is None for verdict in verdicts)
+        if misses:
+            with self._lock:
+                self._counters["misses"] += misses
+        return verdicts
+
+    def _promote(self, key: str, row: Optional[JudgeCacheEntry]) -> Optional[Tuple[float, str]]:
+        """Return a persistent row's verdict and keep it in memory, unless it expired."""
+        if row is None:
+            return None
+        age = (datetime.utcnow() - row.created_at).total_seconds()
+        if self._expired(time.time() - age):
+            return None
+        self._remember(key, row.score, row.reasoning, time.time() - age)
+        with self._lock:
+            self._counters["persistent_hits"] += 1
+        return row.score, row.reasoning
+
+    @staticmethod
+    def _entry(key: str, judge_model: str, score: float, reasoning: str) -> JudgeCacheEntry:
+        return JudgeCacheEntry(
+            key=key,
+            judge_model=judge_model,
+            score=score,
+            reasoning=reasoning,
+            created_at=datetime.utcnow(),
+        )
+
+    def _remember_many(self, verdicts: Sequence[Tuple[str, float, str]]) -> None:
+        now = time.time()
+        for key, score, reasoning in verdicts:
+            self._remember(key, score, reasoning, now)
+
+    def _remember(self, key: str, score: float, reasoning: str, stored_at: float) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (score, reasoning, stored_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def _expired(self, stored_at: float) -> bool:
+        return bool(self.ttl_seconds) and time.time() - stored_at > self.ttl_seconds
+
+
+judge_cache = JudgeCache()
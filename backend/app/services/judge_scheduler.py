@@ -0,0 +1,298 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, Mapping, Optional, TypeVar
+
+import openai
+
+from ..core.config import get_settings
+
+
+T = TypeVar("T")
+
+_RETRYABLE_ERRORS = (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError)
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+# How often an event-loop caller re-checks for a free request slot.
+_SLOT_POLL_SECONDS = 0.005
+
+
+def parse_reset_duration(value: str | None) -> Optional[float]:
+    """Parse OpenAI-style reset durations such as ``"1s"``, ``"6m0s"`` or ``"20ms"``."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    scale = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+    return sum(float(amount) * scale[unit] for amount, unit in parts)
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at ``per_minute / 60`` per second.
+
+    Reservations may overdraw the bucket; the caller is told how long to wait
+    until its share has been refilled, which keeps waiters in arrival order.
+    A rate of 0 disables the bucket.
+    """
+
+    def __init__(self, per_minute: float) -> None:
+        self._lock = threading.Lock()
+        self._updated = time.monotonic()
+        self.set_rate(per_minute)
+
+    def set_rate(self, per_minute: float) -> None:
+        with self._lock:
+            self.per_minute = max(0.0, per_minute)
+            self._tokens = self.per_minute
+            self._updated = time.monotonic()
+
+    def reserve(self, amount: float) -> float:
+        """Take ``amount`` tokens and return the seconds to wait before using them."""
+        with self._lock:
+            if not self.per_minute:
+                return 0.0
+            rate = self.per_minute / 60.0
+            now = time.monotonic()
+            self._tokens = min(self.per_minute, self._tokens + (now - self._updated) * rate)
+            self._updated = now
+            self._tokens -= amount
+            return 0.0 if self._tokens >= 0 else -self._tokens / rate
+
+    def adjust(self, delta: float) -> None:
+        """Return (positive) or charge (negative) tokens after the real cost is known."""
+        with self._lock:
+            if self.per_minute:
+                self._tokens = min(self.per_minute, self._tokens + delta)
+
+
+class JudgeScheduler:
+    """Shared gate in front of every judge request for one judge model.
+
+    - Request and token budgets are enforced with :class:`TokenBucket`; when no
+      budget is configured, the limits advertised in ``x-ratelimit-limit-*``
+      response headers are adopted.
+    - When ``x-ratelimit-remaining-*`` reaches zero, new requests are held
+      until the matching ``x-ratelimit-reset-*`` time.
+    - Concurrency adapts AIMD-style: it grows by roughly one slot per window
+      of successful calls and halves on every 429.
+    - Rate limits, timeouts, connection errors and 5xx responses are retried
+      with full-jitter exponential backoff, honouring ``retry-after``.
+    """
+
+    def __init__(
+        self,
+        *,
+        requests_per_minute: int | None = None,
+        tokens_per_minute: int | None = None,
+        max_concurrency: int | None = None,
+        min_concurrency: int = 1,
+        max_retries: int | None = None,
+        backoff_base_seconds: float | None = None,
+        backoff_max_seconds: float | None = None,
+    ) -> None:
+        settings = get_settings()
+        rpm = requests_per_minute if requests_per_minute is not None else settings.judge_requests_per_minute
+        tpm = tokens_per_minute if tokens_per_minute is not None else settings.judge_tokens_per_minute
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self._learn_limits = not rpm and not tpm
+
+        self.max_concurrency = max(1, max_concurrency or settings.judge_max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.max_retries = max_retries if max_retries is not None else settings.judge_max_retries
+        self.backoff_base = backoff_base_seconds or settings.judge_backoff_base_seconds
+        self.backoff_max = backoff_max_seconds or settings.judge_backoff_max_seconds
+
+        self._limit = float(self.max_concurrency)
+        self._in_flight = 0
+        self._paused_until = 0.0
+        self._cond = threading.Condition()
+        self._counters = {"requests": 0, "retries": 0, "throttled": 0}
+
+    def call(self, fn: Callable[[], T], *, estimated_tokens: int = 0) -> T:
+        """Run ``fn`` (one judge request) within the budgets, retrying transient failures.
+
+        ``fn`` should return a raw response exposing ``headers`` so limits can
+        be learned from it.
+        """
+        attempt = 0
+        while True:
+            self._wait_for_budget(estimated_tokens)
+            with self._slot():
+                try:
+                    response = fn()
+                except (*_RETRYABLE_ERRORS, openai.InternalServerError) as exc:
+                    if attempt >= self.max_retries:
+                        raise
+                    self._on_failure(exc)
+                    delay = self._backoff(attempt, exc)
+                else:
+                    self._on_success(getattr(response, "headers", None) or {})
+                    return response
+
+            attempt += 1
+            with self._cond:
+                self._counters["retries"] += 1
+            time.sleep(delay)
+
+    async def acall(self, fn: Callable[[], Awaitable[T]], *, estimated_tokens: int = 0) -> T:
+        """Async :meth:`call`: waits on the event loop instead of blocking a thread.
+
+        Budgets, pauses and the concurrency limit are shared with threaded callers.
+        """
+        attempt = 0
+        while True:
+            pause = self._paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+            delay = max(self.requests.reserve(1), self.tokens.reserve(estimated_tokens))
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            await self._acquire_slot_async()
+            try:
+                response = await fn()
+            except (*_RETRYABLE_ERRORS, openai.InternalServerError) as exc:
+                if attempt >= self.max_retries:
+                    raise
+                self._on_failure(exc)
+                delay = self._backoff(attempt, exc)
+            else:
+                self._on_success(getattr(response, "headers", None) or {})
+                return response
+            finally:
+                self._release_slot()
+
+            attempt += 1
+            with self._cond:
+                self._counters["retries"] += 1
+            await asyncio.sleep(delay)
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: int | None) -> None:
+        """Reconcile the token bucket with the usage reported by the judge."""
+        if actual_tokens is not None:
+            self.tokens.adjust(estimated_tokens - actual_tokens)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                **self._counters,
+                "concurrency_limit": int(self._limit),
+                "in_flight": self._in_flight,
+                "requests_per_minute": self.requests.per_minute,
+                "tokens_per_minute": self.tokens.per_minute,
+            }
+
+    def _wait_for_budget(self, estimated_tokens: int) -> None:
+        pause = self._paused_until - time.monotonic()
+        if pause > 0:
+            time.sleep(pause)
+        delay = max(self.requests.reserve(1), self.tokens.reserve(estimated_tokens))
+        if delay > 0:
+            time.sleep(delay)
+
+    @contextmanager
+    def _slot(self) -> Iterator[None]:
+        with self._cond:
+            while self._in_flight >= int(self._limit):
+                self._cond.wait()
+            self._in_flight += 1
+            self._counters["requests"] += 1
+        try:
+            yield
+        finally:
+            self._release_slot()
+
+    async def _acquire_slot_async(self) -> None:
+        # The event loop must not block on the condition shared with threaded
+        # callers, so it polls for a free slot instead.
+        while True:
+            with self._cond:
+                if self._in_flight < int(self._limit):
+                    self._in_flight += 1
+                    self._counters["requests"] += 1
+                    return
+            await asyncio.sleep(_SLOT_POLL_SECONDS)
+
+    def _release_slot(self) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def _on_success(self, headers: Mapping[str, str]) -> None:
+        with self._cond:
+            self._limit = min(float(self.max_concurrency), self._limit + 1.0 / self._limit)
+            self._cond.notify_all()
+
+        if self._learn_limits:
+            for bucket, header in ((self.requests, "x-ratelimit-limit-requests"), (self.tokens, "x-ratelimit-limit-tokens")):
+                limit = _int_header(headers, header)
+                if limit and limit != bucket.per_minute:
+                    bucket.set_rate(limit)
+
+        for kind in ("requests", "tokens"):
+            remaining = _int_header(headers, f"x-ratelimit-remaining-{kind}")
+            reset = parse_reset_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+            if remaining == 0 and reset:
+                self._pause(reset)
+
+    def _on_failure(self, exc: Exception) -> None:
+        if isinstance(exc, openai.RateLimitError):
+            with self._cond:
+                self._counters["throttled"] += 1
+                self._limit = max(float(self.min_concurrency), self._limit / 2.0)
+
+    def _backoff(self, attempt: int, exc: Exception) -> float:
+        delay = random.uniform(0.0, min(self.backoff_max, self.backoff_base * (2**attempt)))
+        retry_after = _retry_after(exc)
+        if retry_after is not None:
+            self._pause(retry_after)
+            delay = max(delay, retry_after)
+        return delay
+
+    def _pause(self, seconds: float) -> None:
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+def _int_header(headers: Mapping[str, str], name: str) -> Optional[int]:
+    try:
+        return int(float(headers[name]))
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _retry_after(exc: Exception) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    if "retry-after-ms" in headers:
+        try:
+            return float(headers["retry-after-ms"]) / 1000.0
+        except ValueError:
+            return None
+    return parse_reset_duration(headers.get("retry-after"))
+
+
+_schedulers: Dict[str, JudgeScheduler] = {}
+_schedulers_lock = threading.Lock()
+
+
+def scheduler_for(model: str) -> JudgeScheduler:
+    """Return the process-wide scheduler for ``model``, creating it on first use."""
+    with _schedulers_lock:
+        scheduler = _schedulers.get(model)
+        if scheduler is None:
+            scheduler = _schedulers[model] = JudgeScheduler()
+        return scheduler
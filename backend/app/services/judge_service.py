@@ -1,9 +1,19 @@
 from __future__ import annotations
 
+import json
 import os
-from typing import Tuple
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, NamedTuple, Sequence, Tuple
 
-from openai import OpenAI
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+from ..core.config import get_settings
+from .judge_scheduler import JudgeScheduler, scheduler_for
+from .metrics import JUDGE_POOL_CONNECTIONS, JUDGE_REQUEST_SECONDS, JUDGE_TOKENS
 
 
 GRADING_PROMPT = """You are an expert evaluator for an AI-powered product.
@@ -23,14 +33,61 @@ Your job is to:
 Be strict but fair. Minor issues should reduce the score slightly; major failures should produce a low score.
 """
 
+PARSE_FAILURE_PREFIX = "Failed to parse judge response"
+
+
+class JudgeCase(NamedTuple):
+    test_input: str
+    model_output: str
+    expected_output: str | None = None
+
+
+# Rough allowance for the judge's JSON answer, per graded case.
+_COMPLETION_TOKENS_PER_CASE = 200
+
+
+class JudgeUsage:
+    """Token usage of the judge requests made inside :func:`track_judge_usage`."""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+# A context variable rather than a thread-local, so concurrent asyncio tasks
+# on one thread each see their own tracker.
+_usage: ContextVar[JudgeUsage | None] = ContextVar("judge_usage", default=None)
+
+
+@contextmanager
+def track_judge_usage() -> Iterator[JudgeUsage]:
+    """Collect the usage of judge requests made by this thread or task within the block."""
+    usage = JudgeUsage()
+    token = _usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _usage.reset(token)
+
 
 class JudgeService:
-    def __init__(self, model: str = "gpt-4o-mini") -> None:
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise RuntimeError("OPENAI_API_KEY environment variable is required for JudgeService")
-        self.client = OpenAI(api_key=api_key)
-        self.model = model
+    def __init__(
+        self,
+        model: str | None = None,
+        scheduler: JudgeScheduler | None = None,
+        client: OpenAI | None = None,
+        async_client: AsyncOpenAI | None = None,
+    ) -> None:
+        self.model = model or get_settings().judge_model
+        # Prefer ``judge_registry.get()``, which shares pooled clients per model.
+        self.client = client or build_judge_client()
+        self.async_client = async_client or build_async_judge_client()
+        self.scheduler = scheduler or scheduler_for(self.model)
 
     def score_output(
         self,
@@ -43,6 +100,69 @@ class JudgeService:
 
         Score is expected to be between 0.0 and 1.0; we clamp to this range defensively.
         """
+        content = self._complete(self._single_messages(system_prompt, test_input, model_output, expected_output), cases=1)
+        return self._parse_single(content)
+
+    async def ascore_output(
+        self,
+        system_prompt: str,
+        test_input: str,
+        model_output: str,
+        expected_output: str | None = None,
+    ) -> Tuple[float, str]:
+        """Async :meth:`score_output`."""
+        messages = self._single_messages(system_prompt, test_input, model_output, expected_output)
+        return self._parse_single(await self._acomplete(messages, cases=1))
+
+    def score_batch(self, system_prompt: str, cases: Sequence[JudgeCase]) -> List[Tuple[float, str]]:
+        """Score several cases that share ``system_prompt`` in one judge request.
+
+        The grading and system prompts are sent once, followed by the numbered
+        cases, and the judge answers with one verdict per case. Cases whose
+        verdict is missing or malformed are re-scored individually with
+        :meth:`score_output`. Returns ``(score, reasoning)`` pairs in input order.
+        """
+        if len(cases) == 1:
+            case = cases[0]
+            return [self.score_output(system_prompt, case.test_input, case.model_output, case.expected_output)]
+
+        content = self._complete(self._batch_messages(system_prompt, cases), cases=len(cases))
+        verdicts = self._parse_batch(content)
+
+        scores: List[Tuple[float, str]] = []
+        for index, case in enumerate(cases):
+            verdict = verdicts.get(index)
+            if verdict is None:
+                verdict = self.score_output(system_prompt, case.test_input, case.model_output, case.expected_output)
+            scores.append(verdict)
+        return scores
+
+    async def ascore_batch(self, system_prompt: str, cases: Sequence[JudgeCase]) -> List[Tuple[float, str]]:
+        """Async :meth:`score_batch`."""
+        if len(cases) == 1:
+            case = cases[0]
+            return [await self.ascore_output(system_prompt, case.test_input, case.model_output, case.expected_output)]
+
+        content = await self._acomplete(self._batch_messages(system_prompt, cases), cases=len(cases))
+        verdicts = self._parse_batch(content)
+
+        scores: List[Tuple[float, str]] = []
+        for index, case in enumerate(cases):
+            verdict = verdicts.get(index)
+            if verdict is None:
+                verdict = await self.ascore_output(
+                    system_prompt, case.test_input, case.model_output, case.expected_output
+                )
+            scores.append(verdict)
+        return scores
+
+    @staticmethod
+    def _single_messages(
+        system_prompt: str,
+        test_input: str,
+        model_output: str,
+        expected_output: str | None,
+    ) -> List[Dict[str, Any]]:
         user_content = [
             {"type": "text", "text": f"System prompt / instructions:\n{system_prompt}"},
             {"type": "text", "text": f"Test input:\n{test_input}"},
@@ -51,37 +171,217 @@ class JudgeService:
         if expected_output is not None:
             user_content.append({"type": "text", "text": f"Expected / reference output:\n{expected_output}"})
 
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": GRADING_PROMPT},
-                {
-                    "role": "user",
-                    "content": user_content,
-                },
-                {
-                    "role": "system",
-                    "content": (
-                        "Respond strictly in JSON with keys 'score' (float 0-1) and 'reason' (string). "
-                        "Example: {\"score\": 0.82, \"reason\": \"...\"}"
-                    ),
-                },
-            ],
-            temperature=0.0,
-        )
+        return [
+            {"role": "system", "content": GRADING_PROMPT},
+            {
+                "role": "user",
+                "content": user_content,
+            },
+            {
+                "role": "system",
+                "content": (
+                    "Respond strictly in JSON with keys 'score' (float 0-1) and 'reason' (string). "
+                    "Example: {\"score\": 0.82, \"reason\": \"...\"}"
+                ),
+            },
+        ]
 
-        content = response.choices[0].message.content or "{}"
+    @staticmethod
+    def _batch_messages(system_prompt: str, cases: Sequence[JudgeCase]) -> List[Dict[str, Any]]:
+        user_content = [{"type": "text", "text": f"System prompt / instructions:\n{system_prompt}"}]
+        for index, case in enumerate(cases):
+            text = f"Case {index}\nTest input:\n{case.test_input}\n\nModel output:\n{case.model_output}"
+            if case.expected_output is not None:
+                text += f"\n\nExpected / reference output:\n{case.expected_output}"
+            user_content.append({"type": "text", "text": text})
 
-        # Very small and safe JSON parsing without external deps
-        import json
+        return [
+            {"role": "system", "content": GRADING_PROMPT},
+            {
+                "role": "user",
+                "content": user_content,
+            },
+            {
+                "role": "system",
+                "content": (
+                    f"Grade each of the {len(cases)} cases independently. Respond strictly in JSON with a key "
+                    "'results' holding one object per case with keys 'id' (the case number), 'score' "
+                    "(float 0-1) and 'reason' (string). "
+                    "Example: {\"results\": [{\"id\": 0, \"score\": 0.82, \"reason\": \"...\"}]}"
+                ),
+            },
+        ]
 
+    @classmethod
+    def _parse_single(cls, content: str) -> Tuple[float, str]:
         try:
-            data = json.loads(content)
-            raw_score = float(data.get("score", 0.0))
-            reason = str(data.get("reason", "No reasoning provided"))
+            return cls._parse_verdict(json.loads(content))
         except Exception:
-            raw_score = 0.0
-            reason = f"Failed to parse judge response: {content!r}"
+            return 0.0, f"{PARSE_FAILURE_PREFIX}: {content!r}"
+
+    @classmethod
+    def _parse_batch(cls, content: str) -> Dict[int, Tuple[float, str]]:
+        """Map case numbers to the well-formed verdicts of a batched reply."""
+        verdicts: Dict[int, Tuple[float, str]] = {}
+        try:
+            for entry in json.loads(content).get("results", []):
+                try:
+                    if "score" in entry:
+                        verdicts[int(entry["id"])] = cls._parse_verdict(entry)
+                except Exception:
+                    continue
+        except Exception:
+            pass
+        return verdicts
+
+    def _complete(self, messages: List[Dict[str, Any]], *, cases: int) -> str:
+        """Send one chat completion through the shared scheduler and return its text."""
+        estimated_tokens = _estimate_tokens(messages) + _COMPLETION_TOKENS_PER_CASE * cases
+        started = time.perf_counter()
+        raw = self.scheduler.call(
+            lambda: self.client.chat.completions.with_raw_response.create(
+                model=self.model,
+                messages=messages,
+                temperature=0.0,
+            ),
+            estimated_tokens=estimated_tokens,
+        )
+        JUDGE_REQUEST_SECONDS.labels(self.model).observe(time.perf_counter() - started)
+        return self._handle_response(raw.parse(), estimated_tokens)
+
+    async def _acomplete(self, messages: List[Dict[str, Any]], *, cases: int) -> str:
+        """Async :meth:`_complete`, through the same scheduler."""
+        estimated_tokens = _estimate_tokens(messages) + _COMPLETION_TOKENS_PER_CASE * cases
+        started = time.perf_counter()
+        raw = await self.scheduler.acall(
+            lambda: self.async_client.chat.completions.with_raw_response.create(
+                model=self.model,
+                messages=messages,
+                temperature=0.0,
+            ),
+            estimated_tokens=estimated_tokens,
+        )
+        JUDGE_REQUEST_SECONDS.labels(self.model).observe(time.perf_counter() - started)
+        return self._handle_response(raw.parse(), estimated_tokens)
+
+    def _handle_response(self, response: Any, estimated_tokens: int) -> str:
+        self.scheduler.record_usage(estimated_tokens, response.usage.total_tokens if response.usage else None)
+        self._record_usage(response.usage)
+        return response.choices[0].message.content or "{}"
+
+    def _record_usage(self, usage: Any) -> None:
+        tracked = _usage.get()
+        if tracked is not None:
+            tracked.requests += 1
+        if usage is None:
+            return
+
+        JUDGE_TOKENS.labels(self.model, "prompt").inc(usage.prompt_tokens or 0)
+        JUDGE_TOKENS.labels(self.model, "completion").inc(usage.completion_tokens or 0)
+        if tracked is not None:
+            tracked.prompt_tokens += usage.prompt_tokens or 0
+            tracked.completion_tokens += usage.completion_tokens or 0
+
+    @staticmethod
+    def _parse_verdict(data: Any) -> Tuple[float, str]:
+        """Extract a clamped ``(score, reason)`` pair from one parsed JSON verdict."""
+        raw_score = float(data.get("score", 0.0))
+        reason = str(data.get("reason", "No reasoning provided"))
+        return max(0.0, min(1.0, raw_score)), reason
+
+
+def _client_args() -> Dict[str, Any]:
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise RuntimeError("OPENAI_API_KEY environment variable is required for JudgeService")
+    # Retries are owned by the scheduler, which also sees rate-limit headers.
+    return {"api_key": api_key, "base_url": get_settings().judge_base_url, "max_retries": 0}
+
+
+def build_judge_client(http_client: httpx.Client | None = None) -> OpenAI:
+    return OpenAI(**_client_args(), http_client=http_client)
+
+
+def build_async_judge_client(http_client: httpx.AsyncClient | None = None) -> AsyncOpenAI:
+    return AsyncOpenAI(**_client_args(), http_client=http_client)
+
+
+class JudgeRegistry:
+    """Process-wide judge services, one per judge model.
+
+    Each model's service owns one OpenAI client for threaded callers and one
+    for the event loop; their keep-alive pools are shared by every request,
+    background run and worker thread in the process. Services are created on
+    first use; :meth:`aclose` (or :meth:`close` outside an event loop)
+    releases the pooled connections on shutdown.
+    """
+
+    def __init__(self) -> None:
+        self._services: Dict[str, JudgeService] = {}
+        self._lock = threading.Lock()
+
+    def get(self, model: str | None = None) -> JudgeService:
+        model = model or get_settings().judge_model
+        with self._lock:
+            service = self._services.get(model)
+            if service is None:
+                service = self._services[model] = self._build(model)
+            return service
+
+    def close(self) -> None:
+        """Close the threaded clients; the async ones need :meth:`aclose`."""
+        for service in self._drain():
+            service.client.close()
+
+    async def aclose(self) -> None:
+        for service in self._drain():
+            service.client.close()
+            await service.async_client.close()
+
+    def _drain(self) -> List[JudgeService]:
+        with self._lock:
+            services = list(self._services.values())
+            self._services.clear()
+        return services
+
+    @staticmethod
+    def _build(model: str) -> JudgeService:
+        settings = get_settings()
+        limits = httpx.Limits(
+            max_connections=settings.judge_max_connections,
+            max_keepalive_connections=settings.judge_max_connections,
+            keepalive_expiry=settings.judge_keepalive_seconds,
+        )
+        timeout = httpx.Timeout(settings.judge_timeout_seconds)
+        transport = httpx.HTTPTransport(limits=limits)
+        async_transport = httpx.AsyncHTTPTransport(limits=limits)
+
+        # httpx has no public view of its pools; the transports' httpcore pools
+        # list the open connections.
+        pools = (transport._pool, async_transport._pool)
+        JUDGE_POOL_CONNECTIONS.labels(model, "active").set_function(
+            lambda: sum(1 for pool in pools for connection in pool.connections if not connection.is_idle())
+        )
+        JUDGE_POOL_CONNECTIONS.labels(model, "idle").set_function(
+            lambda: sum(1 for pool in pools for connection in pool.connections if connection.is_idle())
+        )
+        return JudgeService(
+            model,
+            client=build_judge_client(httpx.Client(transport=transport, timeout=timeout)),
+            async_client=build_async_judge_client(httpx.AsyncClient(transport=async_transport, timeout=timeout)),
+        )
+
+
+judge_registry = JudgeRegistry()
+
 
-        score = max(0.0, min(1.0, raw_score))
-        return score, reason
+def _estimate_tokens(messages: List[Dict[str, Any]]) -> int:
+    """Cheap prompt-size estimate (~4 characters per token) for budgeting."""
+    chars = 0
+    for message in messages:
+        content = message["content"]
+        if isinstance(content, str):
+            chars += len(content)
+        else:
+            chars += sum(len(part.get("text", "")) for part in content)
+    return chars // 4 + 1
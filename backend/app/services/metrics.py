@@ -0,0 +1,81 @@
+"""Prometheus metrics for the eval pipeline, exposed on ``GET /metrics``.
+
+Stage latencies share one histogram, labelled by ``stage``:
+
+- ``target``: one target-model call (per case).
+- ``judge``: judging one group of cases, cache lookups included.
+- ``heuristic``: heuristic scoring (and the scoring cascade) of one group of cases.
+- ``db_flush``: one database write of results or run state.
+
+HTTP request handling is timed separately by the middleware in ``main``.
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from prometheus_client import Counter, Gauge, Histogram
+
+
+_LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+STAGE_SECONDS = Histogram(
+    "vanguard_eval_stage_seconds",
+    "Latency of each eval pipeline stage.",
+    ["stage", "target_model", "judge_model"],
+    buckets=_LATENCY_BUCKETS,
+)
+JUDGE_REQUEST_SECONDS = Histogram(
+    "vanguard_judge_request_seconds",
+    "Latency of one judge API request, including rate-limit waits and retries.",
+    ["judge_model"],
+    buckets=_LATENCY_BUCKETS,
+)
+JUDGE_TOKENS = Counter(
+    "vanguard_judge_tokens",
+    "Tokens reported by the judge API.",
+    ["judge_model", "kind"],
+)
+EVAL_CASES = Counter(
+    "vanguard_eval_cases",
+    "Evaluated cases by outcome (passed, failed, or reused from an earlier run).",
+    ["target_model", "judge_model", "result"],
+)
+JUDGE_SKIPPED = Counter(
+    "vanguard_judge_skipped",
+    "Cases settled by a scoring cascade tier without a judge call.",
+    ["judge_model", "tier"],
+)
+JUDGE_POOL_CONNECTIONS = Gauge(
+    "vanguard_judge_pool_connections",
+    "Open connections in each judge client's keep-alive pool, by state (active or idle).",
+    ["judge_model", "state"],
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "vanguard_http_request_seconds",
+    "Time to produce an HTTP response (streaming bodies are not included).",
+    ["method", "route", "status_code"],
+    buckets=_LATENCY_BUCKETS,
+)
+
+
+class StageTiming:
+    seconds: float = 0.0
+
+    @property
+    def milliseconds(self) -> float:
+        return self.seconds * 1000.0
+
+
+@contextmanager
+def time_stage(stage: str, *, target_model: str, judge_model: str) -> Iterator[StageTiming]:
+    """Observe the duration of the block in ``STAGE_SECONDS`` and expose it on the yielded timing."""
+    timing = StageTiming()
+    started = time.perf_counter()
+    try:
+        yield timing
+    finally:
+        timing.seconds = time.perf_counter() - started
+        STAGE_SECONDS.labels(stage, target_model, judge_model).observe(timing.seconds)
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Sequence, Type
+
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, SQLModel
+
+from ..core.config import get_settings
+
+
+def model_row(instance: SQLModel) -> Dict[str, Any]:
+    """Return the column values of a table model, including client-side defaults.
+
+    Building rows through the model keeps ``default_factory`` values (UUID
+    primary keys, ``created_at``) in one place, so callers can reference ids
+    before anything has been written.
+    """
+    return instance.model_dump()
+
+
+def bulk_insert(
+    session: Session,
+    model: Type[SQLModel],
+    rows: Sequence[Dict[str, Any]],
+    *,
+    chunk_size: int | None = None,
+    ignore_conflicts: bool = False,
+) -> None:
+    """Insert ``rows`` into ``model``'s table with one executemany per chunk.
+
+    Nothing is committed here; the caller owns the transaction. On Postgres,
+    SQLAlchemy's insertmanyvalues support turns each chunk into batched
+    multi-row INSERTs instead of a round trip per row.
+
+    With ``ignore_conflicts``, rows whose primary key already exists are
+    skipped (``ON CONFLICT DO NOTHING``) instead of failing the transaction.
+    """
+    if not rows:
+        return
+
+    size = max(1, chunk_size or get_settings().db_bulk_chunk_size)
+    statement = _insert_statement(session, model, ignore_conflicts)
+    for start in range(0, len(rows), size):
+        session.execute(statement, list(rows[start : start + size]))
+
+
+def bulk_accumulate(session: Session, model: Type[SQLModel], rows: Sequence[Dict[str, Any]]) -> None:
+    """Upsert ``rows``, adding their non-key columns onto existing rows.
+
+    Used for counter tables keyed by their primary key: one
+    ``INSERT ... ON CONFLICT DO UPDATE SET col = col + excluded.col`` per
+    chunk, so concurrent writers never lose increments. Nothing is committed.
+    """
+    if not rows:
+        return
+
+    table = model.__table__
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        statement = postgresql.insert(table)
+    elif dialect == "sqlite":
+        statement = sqlite.insert(table)
+    else:
+        raise NotImplementedError(f"bulk_accumulate is not supported on {dialect}")
+
+    keys = [column.name for column in table.primary_key.columns]
+    statement = statement.on_conflict_do_update(
+        index_elements=keys,
+        set_={
+            column.name: column + statement.excluded[column.name]
+            for column in table.columns
+            if column.name not in keys
+        },
+    )
+    size = max(1, get_settings().db_bulk_chunk_size)
+    for start in range(0, len(rows), size):
+        session.execute(statement, list(rows[start : start + size]))
+
+
+def _insert_statement(session: Session, model: Type[SQLModel], ignore_conflicts: bool) -> Any:
+    if not ignore_conflicts:
+        return insert(model.__table__)
+
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(model.__table__).on_conflict_do_nothing()
+    if dialect == "sqlite":
+        return sqlite.insert(model.__table__).on_conflict_do_nothing()
+    raise NotImplementedError(f"ignore_conflicts is not supported on {dialect}")
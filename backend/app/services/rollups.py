@@ -0,0 +1,182 @@
+"""Dashboard rollups of completed runs per day, target model and project.
+
+``run_stats_daily`` and ``score_histogram_daily`` are folded forward in the
+same transaction that marks a run completed, so stats queries read a handful
+of pre-aggregated rows instead of scanning ``test_runs`` / ``eval_results``.
+``rebuild_rollups`` recomputes both tables from history::
+
+    python -m app.services.rollups
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Any, Dict, List
+
+from sqlalchemy import case as case_, delete, func, literal_column
+from sqlmodel import Session, select
+
+from ..models import EvalResult, RunStatsDaily, ScoreHistogramDaily, TestCase, TestRun
+from .persistence import bulk_accumulate, bulk_insert
+
+
+HISTOGRAM_BUCKETS = 10
+NO_PROJECT = ""
+
+
+def record_completed_run(session: Session, run: TestRun) -> None:
+    """Add a just-completed run to the rollups; the caller commits.
+
+    Must be called exactly once per run, after its results are written.
+    """
+    key = {
+        "day": run.created_at.date(),
+        "target_model": run.target_model,
+        "project_id": run.project_id or NO_PROJECT,
+    }
+    bucket = _bucket(EvalResult.combined_score)
+    statement = (
+        select(bucket, func.count(EvalResult.id), func.sum(EvalResult.combined_score))
+        .select_from(EvalResult)
+        .join(TestCase, TestCase.id == EvalResult.test_case_id)
+        .where(TestCase.run_id == run.id)
+        .group_by(bucket)
+    )
+    histogram = session.exec(statement).all()
+
+    bulk_accumulate(
+        session,
+        RunStatsDaily,
+        [
+            {
+                **key,
+                "runs": 1,
+                "passed_runs": 1 if run.overall_pass else 0,
+                "cases": sum(count for _, count, _ in histogram),
+                "passed_cases": run.passed_cases,
+                "score_sum": float(sum(score_sum or 0.0 for _, _, score_sum in histogram)),
+            }
+        ],
+    )
+    bulk_accumulate(
+        session,
+        ScoreHistogramDaily,
+        [{**key, "bucket": bucket_index, "cases": count} for bucket_index, count, _ in histogram],
+    )
+
+
+def rebuild_rollups(session: Session) -> Dict[str, int]:
+    """Recompute both rollup tables from every completed run and commit.
+
+    Runs three grouped queries over history; run it while no runs are
+    completing, since runs finalized concurrently may be counted twice.
+    """
+    session.execute(delete(RunStatsDaily))
+    session.execute(delete(ScoreHistogramDaily))
+
+    # Grouping is on raw columns: Postgres does not match GROUP BY
+    # expressions that carry their own bound parameters.
+    day = func.date(TestRun.created_at)
+    project = TestRun.project_id
+    completed = TestRun.status == "completed"
+
+    per_result = (
+        select(
+            day,
+            TestRun.target_model,
+            project,
+            func.count(EvalResult.id),
+            func.coalesce(func.sum(case_((EvalResult.passed, 1), else_=0)), 0),
+            func.coalesce(func.sum(EvalResult.combined_score), 0.0),
+        )
+        .select_from(EvalResult)
+        .join(TestCase, TestCase.id == EvalResult.test_case_id)
+        .join(TestRun, TestRun.id == TestCase.run_id)
+        .where(completed)
+        .group_by(day, TestRun.target_model, project)
+    )
+    stats: Dict[tuple, Dict[str, Any]] = {}
+    for run_day, target_model, project_id, cases, passed_cases, score_sum in session.exec(per_result):
+        key = (_as_date(run_day), target_model, project_id or NO_PROJECT)
+        stats[key] = {"cases": cases, "passed_cases": passed_cases, "score_sum": float(score_sum)}
+
+    per_run = (
+        select(
+            day,
+            TestRun.target_model,
+            project,
+            func.count(TestRun.id),
+            func.coalesce(func.sum(case_((TestRun.overall_pass, 1), else_=0)), 0),
+        )
+        .where(completed)
+        .group_by(day, TestRun.target_model, project)
+    )
+    stat_rows: List[Dict[str, Any]] = []
+    for run_day, target_model, project_id, runs, passed_runs in session.exec(per_run):
+        key = (_as_date(run_day), target_model, project_id or NO_PROJECT)
+        totals = stats.get(key, {"cases": 0, "passed_cases": 0, "score_sum": 0.0})
+        stat_rows.append(
+            {
+                "day": key[0],
+                "target_model": target_model,
+                "project_id": key[2],
+                "runs": runs,
+                "passed_runs": passed_runs,
+                **totals,
+            }
+        )
+
+    bucket = _bucket(EvalResult.combined_score)
+    histogram = (
+        select(day, TestRun.target_model, project, bucket, func.count(EvalResult.id))
+        .select_from(EvalResult)
+        .join(TestCase, TestCase.id == EvalResult.test_case_id)
+        .join(TestRun, TestRun.id == TestCase.run_id)
+        .where(completed)
+        .group_by(day, TestRun.target_model, project, bucket)
+    )
+    histogram_rows = [
+        {
+            "day": _as_date(run_day),
+            "target_model": target_model,
+            "project_id": project_id or NO_PROJECT,
+            "bucket": bucket_index,
+            "cases": count,
+        }
+        for run_day, target_model, project_id, bucket_index, count in session.exec(histogram)
+    ]
+
+    bulk_insert(session, RunStatsDaily, stat_rows)
+    bulk_insert(session, ScoreHistogramDaily, histogram_rows)
+    session.commit()
+    return {"run_stats_daily": len(stat_rows), "score_histogram_daily": len(histogram_rows)}
+
+
+def _bucket(score: Any) -> Any:
+    """SQL expression for a score's histogram bucket (scores of 1.0 land in the last one).
+
+    Bounds are inlined rather than bound so the same expression can be used in
+    both SELECT and GROUP BY.
+    """
+    return case_(
+        *[
+            (score < literal_column(repr((index + 1) / HISTOGRAM_BUCKETS)), literal_column(str(index)))
+            for index in range(HISTOGRAM_BUCKETS - 1)
+        ],
+        else_=literal_column(str(HISTOGRAM_BUCKETS - 1)),
+    )
+
+
+def _as_date(value: Any) -> date:
+    # DATE() yields a date on Postgres but an ISO string on SQLite.
+    return value if isinstance(value, date) else date.fromisoformat(str(value))
+
+
+if __name__ == "__main__":
+    from ..database import engine
+    from ..migrations import ensure_schema
+
+    ensure_schema(engine)
+    with Session(engine) as session:
+        counts = rebuild_rollups(session)
+    print(", ".join(f"{table}: {rows} rows" for table, rows in counts.items()))
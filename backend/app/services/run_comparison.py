@@ -0,0 +1,110 @@
+"""SQL for comparing the results of two runs case by case.
+
+Cases are matched on ``content_hash``, the hash of their input, expected
+output and metadata, so runs of different prompts, target models or suite
+versions line up wherever they share cases. The base run's cases are read in
+position order through ``ix_test_cases_run_id_position``, and each one finds
+its counterpart through ``ix_test_cases_run_id_content_hash``. The pages,
+the count and the aggregate statistics are each a single query, so a
+comparison never loads either run in full.
+
+A case that occurs several times in a run matches every copy in the other
+run.
+"""
+
+from __future__ import annotations
+
+import uuid
+from typing import Any, Literal, Optional
+
+from sqlalchemy import and_, case, func
+from sqlalchemy.orm import aliased
+from sqlmodel import select
+
+from ..models import CaseContent, EvalResult, TestCase
+
+
+ComparisonChange = Literal["newly_failing", "newly_passing", "unchanged"]
+ComparisonOrder = Literal["position", "score_delta"]
+
+BaseCase = aliased(TestCase, name="base_case")
+BaseResult = aliased(EvalResult, name="base_result")
+CandidateCase = aliased(TestCase, name="candidate_case")
+CandidateResult = aliased(EvalResult, name="candidate_result")
+
+score_delta = CandidateResult.combined_score - BaseResult.combined_score
+newly_failing = and_(BaseResult.passed.is_(True), CandidateResult.passed.is_(False))
+newly_passing = and_(BaseResult.passed.is_(False), CandidateResult.passed.is_(True))
+
+
+def _matched(statement: Any, base_run_id: uuid.UUID, candidate_run_id: uuid.UUID) -> Any:
+    return (
+        statement.select_from(BaseCase)
+        .join(BaseResult, BaseResult.test_case_id == BaseCase.id)
+        .join(
+            CandidateCase,
+            and_(CandidateCase.run_id == candidate_run_id, CandidateCase.content_hash == BaseCase.content_hash),
+        )
+        .join(CandidateResult, CandidateResult.test_case_id == CandidateCase.id)
+        .where(BaseCase.run_id == base_run_id)
+    )
+
+
+def _change_filter(change: Optional[ComparisonChange]) -> Any:
+    if change == "newly_failing":
+        return newly_failing
+    if change == "newly_passing":
+        return newly_passing
+    if change == "unchanged":
+        return BaseResult.passed == CandidateResult.passed
+    return None
+
+
+def comparison_statement(
+    base_run_id: uuid.UUID,
+    candidate_run_id: uuid.UUID,
+    change: Optional[ComparisonChange] = None,
+    order: ComparisonOrder = "position",
+) -> Any:
+    """Rows of ``(base case, base result, candidate case, candidate result, content)``.
+
+    ``order="score_delta"`` lists the largest score drops first.
+    """
+    statement = _matched(
+        select(BaseCase, BaseResult, CandidateCase, CandidateResult, CaseContent),
+        base_run_id,
+        candidate_run_id,
+    ).join(CaseContent, CaseContent.hash == BaseCase.content_hash)
+    condition = _change_filter(change)
+    if condition is not None:
+        statement = statement.where(condition)
+    if order == "score_delta":
+        return statement.order_by(score_delta, BaseCase.position, CandidateCase.position)
+    return statement.order_by(BaseCase.position, CandidateCase.position)
+
+
+def comparison_count_statement(
+    base_run_id: uuid.UUID,
+    candidate_run_id: uuid.UUID,
+    change: Optional[ComparisonChange] = None,
+) -> Any:
+    statement = _matched(select(func.count()), base_run_id, candidate_run_id)
+    condition = _change_filter(change)
+    return statement if condition is None else statement.where(condition)
+
+
+def comparison_stats_statement(base_run_id: uuid.UUID, candidate_run_id: uuid.UUID) -> Any:
+    """One row: matched, newly failing, newly passing, improved, worsened, base mean, candidate mean."""
+    return _matched(
+        select(
+            func.count(),
+            func.coalesce(func.sum(case((newly_failing, 1), else_=0)), 0),
+            func.coalesce(func.sum(case((newly_passing, 1), else_=0)), 0),
+            func.coalesce(func.sum(case((score_delta > 0, 1), else_=0)), 0),
+            func.coalesce(func.sum(case((score_delta < 0, 1), else_=0)), 0),
+            func.avg(BaseResult.combined_score),
+            func.avg(CandidateResult.combined_score),
+        ),
+        base_run_id,
+        candidate_run_id,
+    )
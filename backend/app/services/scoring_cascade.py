@@ -0,0 +1,121 @@
+"""Cheap deterministic tiers that settle a case before the LLM judge is called.
+
+A case's combined score is ``0.5 * heuristic + 0.5 * judge`` with the judge
+score in ``[0, 1]``. Once the heuristic score is known, some outcomes no
+longer depend on the judge. The cascade runs its tiers in order, and the
+first tier that decides a case supplies a stand-in judge score, the
+reasoning stored with the result and a short skip reason. Cases that no
+tier decides go to the judge as before.
+
+A stand-in is not what the judge would have returned, so enabling the
+cascade changes ``average_score`` and can change ``overall_pass``.
+
+Tiers:
+
+- ``exact_match``: the output equals the expected output, ignoring
+  surrounding whitespace and case. Gets a judge score of 1.0. This is a
+  policy choice, so it is opt-in.
+- ``empty_output``: the target returned only whitespace. Gets a judge
+  score of 0.0.
+- ``score_bounds``: no judge score can move the case across
+  ``pass_threshold``, so the decision fixes whether it passes. The stand-in
+  is the neutral judge score ``NEUTRAL_JUDGE_SCORE``, the middle of the
+  judge's scale; the combined score is then the midpoint of the range the
+  judge could have produced and stays on the decided side of the threshold.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+
+# Stand-in judge score for cases settled by ``score_bounds``.
+NEUTRAL_JUDGE_SCORE = 0.5
+
+
+class CascadeDecision(NamedTuple):
+    judge_score: float
+    reasoning: str
+    reason: str
+    # Whether the case passes; ``None`` leaves it to the combined score.
+    passed: Optional[bool] = None
+
+
+Tier = Callable[[str, Optional[str], float, float], Optional[CascadeDecision]]
+
+
+def _exact_match(
+    model_output: str, expected_output: str | None, heuristic_score: float, threshold: float
+) -> Optional[CascadeDecision]:
+    if expected_output and model_output.strip().lower() == expected_output.strip().lower():
+        return CascadeDecision(1.0, "Judge skipped: output exactly matches the expected output.", "exact_match")
+    return None
+
+
+def _empty_output(
+    model_output: str, expected_output: str | None, heuristic_score: float, threshold: float
+) -> Optional[CascadeDecision]:
+    if not model_output.strip():
+        return CascadeDecision(0.0, "Judge skipped: the target returned an empty output.", "empty_output")
+    return None
+
+
+def _score_bounds(
+    model_output: str, expected_output: str | None, heuristic_score: float, threshold: float
+) -> Optional[CascadeDecision]:
+    lowest, highest = 0.5 * heuristic_score, 0.5 * heuristic_score + 0.5
+    if highest < threshold:
+        return CascadeDecision(
+            NEUTRAL_JUDGE_SCORE,
+            f"Judge skipped: heuristic score {heuristic_score:.2f} cannot reach pass threshold {threshold:.2f}.",
+            "score_bounds",
+            passed=False,
+        )
+    if lowest >= threshold:
+        return CascadeDecision(
+            NEUTRAL_JUDGE_SCORE,
+            f"Judge skipped: heuristic score {heuristic_score:.2f} passes threshold {threshold:.2f} on its own.",
+            "score_bounds",
+            passed=True,
+        )
+    return None
+
+
+TIERS: Dict[str, Tier] = {
+    "exact_match": _exact_match,
+    "empty_output": _empty_output,
+    "score_bounds": _score_bounds,
+}
+
+
+def parse_tiers(value: str | Sequence[str] | None) -> List[str]:
+    """Normalize a comma-separated string or list of tier names, rejecting unknown ones."""
+    if value is None:
+        return []
+    names = value.split(",") if isinstance(value, str) else list(value)
+    tiers = [name.strip() for name in names if name.strip()]
+    unknown = [name for name in tiers if name not in TIERS]
+    if unknown:
+        raise ValueError(f"Unknown scoring cascade tiers: {', '.join(unknown)} (expected {', '.join(TIERS)})")
+    return tiers
+
+
+class ScoringCascade:
+    """The ordered tiers applied to every case of one run."""
+
+    def __init__(self, tiers: str | Sequence[str] | None, pass_threshold: float) -> None:
+        self.tiers = [TIERS[name] for name in parse_tiers(tiers)]
+        self.pass_threshold = pass_threshold
+
+    def decide(
+        self,
+        model_output: str,
+        expected_output: str | None,
+        heuristic_score: float,
+    ) -> Optional[CascadeDecision]:
+        """Return the first tier's decision, or ``None`` if the judge is still needed."""
+        for tier in self.tiers:
+            decision = tier(model_output, expected_output, heuristic_score, self.pass_threshold)
+            if decision is not None:
+                return decision
+        return None
@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from typing import Any, Callable, Dict, List, Tuple
+
+import httpx
+
+from ..core.config import get_settings
+from .async_slots import AsyncSlots
+
+
+def call_target_model_stub(prompt: str, test_input: str, target_model: str) -> str:
+    """Stub for the target model call.
+
+    In production this would call your actual model endpoint (OpenAI, Anthropic,
+    internal HTTP service, etc.). For the MVP we just echo the input in a simple
+    templated way so the pipeline is fully runnable.
+    """
+    return f"[model={target_model}] Prompt: {prompt}\nInput: {test_input}"
+
+
+class TargetProvider:
+    """Base class for target-model backends.
+
+    ``max_concurrency`` bounds in-flight calls to this provider across every
+    run in the process, separately for threaded callers and for the callers
+    on each event loop.
+    """
+
+    def __init__(self, *, max_concurrency: int) -> None:
+        self._slots = threading.BoundedSemaphore(max(1, max_concurrency))
+        self._async_slots = AsyncSlots(max_concurrency)
+
+    def generate(self, prompt: str, test_input: str, model: str) -> str:
+        with self._slots:
+            return self._generate(prompt, test_input, model)
+
+    async def agenerate(self, prompt: str, test_input: str, model: str) -> str:
+        async with self._async_slots:
+            return await self._agenerate(prompt, test_input, model)
+
+    def _generate(self, prompt: str, test_input: str, model: str) -> str:
+        raise NotImplementedError
+
+    async def _agenerate(self, prompt: str, test_input: str, model: str) -> str:
+        # Providers without an async client fall back to a worker thread.
+        return await asyncio.to_thread(self._generate, prompt, test_input, model)
+
+    def close(self) -> None:
+        """Release pooled resources; the default provider holds none."""
+
+    async def aclose(self) -> None:
+        self.close()
+
+
+class StubProvider(TargetProvider):
+    def _generate(self, prompt: str, test_input: str, model: str) -> str:
+        return call_target_model_stub(prompt, test_input, model)
+
+    async def _agenerate(self, prompt: str, test_input: str, model: str) -> str:
+        return call_target_model_stub(prompt, test_input, model)
+
+
+class HTTPTargetProvider(TargetProvider):
+    """Base for providers that talk HTTP through long-lived, pooled clients.
+
+    The ``httpx.Client`` (and the ``httpx.AsyncClient`` used from the event
+    loop) keep idle keep-alive connections open, so they are reused across
+    cases and across runs. Subclasses describe one call with
+    :meth:`_request` and :meth:`_parse`.
+    """
+
+    def __init__(
+        self,
+        *,
+        base_url: str,
+        headers: Dict[str, str] | None = None,
+        timeout_seconds: float,
+        max_connections: int,
+        max_concurrency: int,
+    ) -> None:
+        super().__init__(max_concurrency=max_concurrency)
+        options: Dict[str, Any] = {
+            "base_url": base_url,
+            "headers": headers or {},
+            "timeout": httpx.Timeout(timeout_seconds),
+            "limits": httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        }
+        self.client = httpx.Client(**options)
+        self.async_client = httpx.AsyncClient(**options)
+
+    def _generate(self, prompt: str, test_input: str, model: str) -> str:
+        path, payload = self._request(prompt, test_input, model)
+        response = self.client.post(path, json=payload)
+        response.raise_for_status()
+        return self._parse(response.json())
+
+    async def _agenerate(self, prompt: str, test_input: str, model: str) -> str:
+        path, payload = self._request(prompt, test_input, model)
+        response = await self.async_client.post(path, json=payload)
+        response.raise_for_status()
+        return self._parse(response.json())
+
+    def _request(self, prompt: str, test_input: str, model: str) -> Tuple[str, Dict[str, Any]]:
+        """Path and JSON body of the call for one case."""
+        raise NotImplementedError
+
+    def _parse(self, data: Any) -> str:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        self.client.close()
+
+    async def aclose(self) -> None:
+        self.client.close()
+        await self.async_client.aclose()
+
+
+class OpenAICompatibleProvider(HTTPTargetProvider):
+    """Chat-completions endpoint compatible with the OpenAI API (OpenAI, vLLM, etc.)."""
+
+    def _request(self, prompt: str, test_input: str, model: str) -> Tuple[str, Dict[str, Any]]:
+        return (
+            "/chat/completions",
+            {
+                "model": model,
+                "messages": [
+                    {"role": "system", "content": prompt},
+                    {"role": "user", "content": test_input},
+                ],
+                "temperature": 0.0,
+            },
+        )
+
+    def _parse(self, data: Any) -> str:
+        return data["choices"][0]["message"]["content"] or ""
+
+
+class GenericHTTPProvider(HTTPTargetProvider):
+    """Minimal JSON contract for in-house model services.
+
+    Sends ``{"model", "prompt", "input"}`` to the configured URL and expects
+    ``{"output": "..."}`` back.
+    """
+
+    def __init__(self, *, url: str, **kwargs: Any) -> None:
+        super().__init__(base_url="", **kwargs)
+        self.url = url
+
+    def _request(self, prompt: str, test_input: str, model: str) -> Tuple[str, Dict[str, Any]]:
+        return self.url, {"model": model, "prompt": prompt, "input": test_input}
+
+    def _parse(self, data: Any) -> str:
+        return str(data["output"])
+
+
+class ProviderRegistry:
+    """Maps ``target_model`` prefixes to lazily constructed providers.
+
+    A target model of the form ``"<prefix>:<model>"`` is routed to the provider
+    registered under ``prefix`` and called with ``model``. Anything without a
+    registered prefix goes to the fallback provider with the full identifier.
+    Providers are created on first use and then shared process-wide.
+    """
+
+    def __init__(self, fallback: Callable[[], TargetProvider] = lambda: StubProvider(max_concurrency=1024)) -> None:
+        self._factories: Dict[str, Callable[[], TargetProvider]] = {}
+        self._providers: Dict[str, TargetProvider] = {}
+        self._fallback_factory = fallback
+        self._lock = threading.Lock()
+
+    def register(self, prefix: str, factory: Callable[[], TargetProvider]) -> None:
+        with self._lock:
+            self._factories[prefix] = factory
+            stale = self._providers.pop(prefix, None)
+        if stale is not None:
+            stale.close()
+
+    def resolve(self, target_model: str) -> Tuple[TargetProvider, str]:
+        prefix, sep, model = target_model.partition(":")
+        if not sep or prefix not in self._factories:
+            prefix, model = "", target_model
+        return self._get(prefix), model
+
+    def generate(self, prompt: str, test_input: str, target_model: str) -> str:
+        provider, model = self.resolve(target_model)
+        return provider.generate(prompt, test_input, model)
+
+    async def agenerate(self, prompt: str, test_input: str, target_model: str) -> str:
+        provider, model = self.resolve(target_model)
+        return await provider.agenerate(prompt, test_input, model)
+
+    def close(self) -> None:
+        for provider in self._drain():
+            provider.close()
+
+    async def aclose(self) -> None:
+        for provider in self._drain():
+            await provider.aclose()
+
+    def _drain(self) -> List[TargetProvider]:
+        with self._lock:
+            providers: List[TargetProvider] = list(self._providers.values())
+            self._providers.clear()
+        return providers
+
+    def _get(self, prefix: str) -> TargetProvider:
+        with self._lock:
+            provider = self._providers.get(prefix)
+            if provider is None:
+                factory = self._factories.get(prefix, self._fallback_factory)
+                provider = self._providers[prefix] = factory()
+            return provider
+
+
+def build_default_registry() -> ProviderRegistry:
+    """Registry with the ``openai`` and ``http`` providers configured from settings."""
+    settings = get_settings()
+    registry = ProviderRegistry()
+
+    def openai_provider() -> TargetProvider:
+        api_key = settings.target_openai_api_key or os.getenv("OPENAI_API_KEY")
+        return OpenAICompatibleProvider(
+            base_url=settings.target_openai_base_url,
+            headers={"Authorization": f"Bearer {api_key}"} if api_key else None,
+            timeout_seconds=settings.target_timeout_seconds,
+            max_connections=settings.target_max_connections,
+            max_concurrency=settings.target_max_concurrency,
+        )
+
+    def http_provider() -> TargetProvider:
+        if not settings.target_http_url:
+            raise RuntimeError("TARGET_HTTP_URL must be set to use http: target models")
+        return GenericHTTPProvider(
+            url=settings.target_http_url,
+            timeout_seconds=settings.target_timeout_seconds,
+            max_connections=settings.target_max_connections,
+            max_concurrency=settings.target_max_concurrency,
+        )
+
+    registry.register("openai", openai_provider)
+    registry.register("http", http_provider)
+    return registry
+
+
+provider_registry = build_default_registry()
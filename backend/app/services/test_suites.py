@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import uuid
+from typing import Any, Dict, Iterable, List, Sequence
+
+from sqlalchemy import func
+from sqlmodel import Session, select
+
+from ..core.config import get_settings
+from ..models import CaseContent, TestCase, TestSuite, TestSuiteCase
+from .heuristics import resolve_scorer
+from .persistence import bulk_insert
+
+
+class SuiteFormatError(ValueError):
+    """Raised for a JSONL line that is not a valid test case."""
+
+
+def content_hash(input_text: str, expected_output: str | None, metadata: Dict[str, Any] | None) -> str:
+    """Stable hash identifying a test case's content, independent of any run."""
+    payload = json.dumps(
+        [input_text, expected_output, metadata],
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SuiteImporter:
+    """Store a suite from JSONL lines without holding the whole suite in memory.
+
+    Each line is an object with ``input`` and optional ``expected_output``,
+    ``metadata`` and ``tags``. Lines are buffered and written every
+    ``DB_BULK_CHUNK_SIZE`` cases: content already known (from this or any
+    other suite) is only referenced, never stored again. Uploading under an
+    existing name creates the next version. Nothing is committed until
+    :meth:`finish`.
+    """
+
+    def __init__(self, session: Session, *, name: str, description: str | None = None) -> None:
+        self.session = session
+        latest = session.exec(select(func.max(TestSuite.version)).where(TestSuite.name == name)).one()
+        self.suite = TestSuite(name=name, version=(latest or 0) + 1, description=description)
+        session.add(self.suite)
+        session.flush()
+
+        self.new_contents = 0
+        self._chunk_size = max(1, get_settings().db_bulk_chunk_size)
+        self._line_number = 0
+        self._links: List[Dict[str, Any]] = []
+        self._contents: Dict[str, Dict[str, Any]] = {}
+
+    def add_lines(self, lines: Iterable[str | bytes]) -> None:
+        for line in lines:
+            self._line_number += 1
+            if not line.strip():
+                continue
+            self._add(self._parse(line))
+            if len(self._links) >= self._chunk_size:
+                self._flush()
+
+    def finish(self) -> TestSuite:
+        self._flush()
+        self.session.add(self.suite)
+        self.session.commit()
+        self.session.refresh(self.suite)
+        return self.suite
+
+    def _parse(self, line: str | bytes) -> Dict[str, Any]:
+        try:
+            data = json.loads(line)
+        except ValueError as exc:
+            raise SuiteFormatError(f"Line {self._line_number}: invalid JSON ({exc})") from exc
+
+        if not isinstance(data, dict) or not isinstance(data.get("input"), str):
+            raise SuiteFormatError(f"Line {self._line_number}: expected an object with a string 'input'")
+        expected_output = data.get("expected_output")
+        metadata = data.get("metadata")
+        tags = data.get("tags")
+        if expected_output is not None and not isinstance(expected_output, str):
+            raise SuiteFormatError(f"Line {self._line_number}: 'expected_output' must be a string")
+        if metadata is not None and not isinstance(metadata, dict):
+            raise SuiteFormatError(f"Line {self._line_number}: 'metadata' must be an object")
+        try:
+            resolve_scorer(metadata)
+        except ValueError as exc:
+            raise SuiteFormatError(f"Line {self._line_number}: {exc}") from exc
+        if tags is not None and not (isinstance(tags, list) and all(isinstance(tag, str) for tag in tags)):
+            raise SuiteFormatError(f"Line {self._line_number}: 'tags' must be a list of strings")
+        return {"input": data["input"], "expected_output": expected_output, "metadata": metadata, "tags": tags}
+
+    def _add(self, case: Dict[str, Any]) -> None:
+        key = content_hash(case["input"], case["expected_output"], case["metadata"])
+        self._contents.setdefault(
+            key,
+            {
+                "hash": key,
+                "input_text": case["input"],
+                "expected_output": case["expected_output"],
+                "extra_metadata": case["metadata"],
+            },
+        )
+        self._links.append(
+            {
+                "suite_id": self.suite.id,
+                "position": self.suite.case_count,
+                "content_hash": key,
+                "tags": case["tags"],
+            }
+        )
+        self.suite.case_count += 1
+
+    def _flush(self) -> None:
+        self.new_contents += _insert_contents(self.session, self._contents)
+        bulk_insert(self.session, TestSuiteCase, self._links)
+        self._links = []
+        self._contents = {}
+
+
+def store_case_contents(session: Session, test_cases: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Store inline ``test_cases`` as shared ``CaseContent`` rows, like suite cases.
+
+    Returns the cases with their ``content_hash`` set, so runs reference the
+    content instead of copying it. Nothing is committed.
+    """
+    contents: Dict[str, Dict[str, Any]] = {}
+    stored: List[Dict[str, Any]] = []
+    for case in test_cases:
+        if case.get("content_hash"):
+            stored.append(case)
+            continue
+        input_text = str(case.get("input"))
+        key = content_hash(input_text, case.get("expected_output"), case.get("metadata"))
+        contents.setdefault(
+            key,
+            {
+                "hash": key,
+                "input_text": input_text,
+                "expected_output": case.get("expected_output"),
+                "extra_metadata": case.get("metadata"),
+            },
+        )
+        stored.append({**case, "content_hash": key})
+
+    _store_contents(session, contents)
+    return stored
+
+
+def share_case_contents(session: Session, cases: Sequence[TestCase]) -> None:
+    """Point cases that carry their own content at shared ``CaseContent`` rows.
+
+    Sets ``content_hash`` on each such case, which also lets runs be compared
+    case by case. Nothing is committed.
+    """
+    contents: Dict[str, Dict[str, Any]] = {}
+    for case in cases:
+        if case.content_hash:
+            continue
+        input_text = case.input_text or ""
+        case.content_hash = content_hash(input_text, case.expected_output, case.extra_metadata)
+        contents.setdefault(
+            case.content_hash,
+            {
+                "hash": case.content_hash,
+                "input_text": input_text,
+                "expected_output": case.expected_output,
+                "extra_metadata": case.extra_metadata,
+            },
+        )
+
+    _store_contents(session, contents)
+
+
+def _store_contents(session: Session, contents: Dict[str, Dict[str, Any]]) -> None:
+    size = max(1, get_settings().db_bulk_chunk_size)
+    keys = list(contents)
+    for start in range(0, len(keys), size):
+        _insert_contents(session, {key: contents[key] for key in keys[start : start + size]})
+
+
+def _insert_contents(session: Session, contents: Dict[str, Dict[str, Any]]) -> int:
+    """Insert the ``CaseContent`` rows not stored yet; returns how many were new."""
+    if not contents:
+        return 0
+    known = set(session.exec(select(CaseContent.hash).where(CaseContent.hash.in_(list(contents)))).all())
+    rows = [CaseContent(**row).model_dump() for key, row in contents.items() if key not in known]
+    # Concurrent uploads may insert the same content in between.
+    bulk_insert(session, CaseContent, rows, ignore_conflicts=True)
+    return len(rows)
+
+
+def resolve_suite(
+    session: Session,
+    *,
+    suite_id: uuid.UUID | None = None,
+    name: str | None = None,
+    version: int | None = None,
+) -> TestSuite | None:
+    """Find a suite by id, or by name (latest version unless ``version`` is given)."""
+    if suite_id is not None:
+        return session.get(TestSuite, suite_id)
+
+    statement = select(TestSuite).where(TestSuite.name == name)
+    if version is not None:
+        statement = statement.where(TestSuite.version == version)
+    return session.exec(statement.order_by(TestSuite.version.desc()).limit(1)).first()
+
+
+def load_suite_cases(
+    session: Session,
+    suite: TestSuite,
+    *,
+    tags: Sequence[str] | None = None,
+) -> List[Dict[str, Any]]:
+    """Return the suite's cases in upload order, shaped like ``test_cases`` payloads.
+
+    With ``tags``, only cases carrying at least one of them are returned.
+    Each case keeps its ``content_hash`` so runs reference the stored content
+    instead of copying it.
+    """
+    wanted = set(tags or ())
+    statement = (
+        select(TestSuiteCase.tags, CaseContent)
+        .join(CaseContent, CaseContent.hash == TestSuiteCase.content_hash)
+        .where(TestSuiteCase.suite_id == suite.id)
+        .order_by(TestSuiteCase.position)
+        .execution_options(yield_per=get_settings().db_bulk_chunk_size)
+    )
+    cases: List[Dict[str, Any]] = []
+    for case_tags, content in session.exec(statement):
+        if wanted and not wanted.intersection(case_tags or ()):
+            continue
+        cases.append(
+            {
+                "input": content.input_text,
+                "expected_output": content.expected_output,
+                "metadata": content.extra_metadata,
+                "content_hash": content.hash,
+            }
+        )
+    return cases
+
+
+def hydrate_cases(session: Session, cases: Sequence[TestCase]) -> None:
+    """Fill in the text of detached suite-run cases from their ``CaseContent``."""
+    hashes = sorted({case.content_hash for case in cases if case.content_hash})
+    size = max(1, get_settings().db_bulk_chunk_size)
+    contents: Dict[str, CaseContent] = {}
+    for start in range(0, len(hashes), size):
+        statement = select(CaseContent).where(CaseContent.hash.in_(hashes[start : start + size]))
+        contents.update((content.hash, content) for content in session.exec(statement))
+
+    for case in cases:
+        content = contents.get(case.content_hash) if case.content_hash else None
+        if content is not None:
+            case.input_text = content.input_text
+            case.expected_output = content.expected_output
+            case.extra_metadata = content.extra_metadata
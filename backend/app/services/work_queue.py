@@ -0,0 +1,264 @@
+"""Database-backed case queue drained by standalone worker processes.
+
+Used when ``EVAL_QUEUE_BACKEND=database``. Submitting a run enqueues one
+``CaseJob`` per case. Workers (``python -m app.worker``) on any number of
+nodes then loop through these steps:
+
+1. Claim a batch of pending jobs with ``SELECT ... FOR UPDATE SKIP LOCKED``.
+2. Score the cases.
+3. Write the results and mark the jobs done in one transaction.
+
+While a batch is being scored, a heartbeat renews the worker's lease on its
+jobs. Jobs whose lease expires are put back in the queue for another
+worker. The worker that completes a run's last job finalizes the run in
+the same transaction. It holds a row lock on the run, so exactly one worker
+does this.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import threading
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Sequence
+
+from sqlalchemy import delete, func, insert, literal, update
+from sqlmodel import Session, select
+
+from ..core.config import get_settings
+from ..database import engine
+from ..models import CaseJob, EvalResult, TestCase, TestRun
+from .eval_runner import EvalRunner
+from .persistence import bulk_insert
+from .test_suites import hydrate_cases
+
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_run(session: Session, run_id: uuid.UUID, options: Dict[str, Any]) -> None:
+    """Queue every unscored case of a persisted run for the workers and commit.
+
+    A run with nothing left to score (no cases, or all already scored) never
+    reaches a worker, so it is finalized right away.
+    """
+    run = session.get(TestRun, run_id)
+    if run is None:
+        raise ValueError(f"Run {run_id} not found")
+    run.execution_options = options
+    session.add(run)
+
+    unscored = (
+        select(TestCase.id, TestCase.run_id, literal("pending"), literal(0), literal(datetime.utcnow()))
+        .outerjoin(EvalResult, EvalResult.test_case_id == TestCase.id)
+        .where(TestCase.run_id == run_id, EvalResult.id.is_(None))
+    )
+    queued = session.execute(
+        insert(CaseJob.__table__).from_select(["test_case_id", "run_id", "status", "attempts", "created_at"], unscored)
+    ).rowcount
+    if queued == 0:
+        EvalRunner.finalize_run(session, run)
+        return
+    session.commit()
+
+
+class CaseQueueWorker:
+    """One worker process's claim / score / complete loop."""
+
+    def __init__(self, runner: EvalRunner | None = None, worker_id: str | None = None) -> None:
+        self.runner = runner or EvalRunner()
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.settings = get_settings()
+        self._stop = threading.Event()
+
+    def run_forever(self) -> None:
+        heartbeat = threading.Thread(target=self._heartbeat_loop, name="case-queue-heartbeat", daemon=True)
+        heartbeat.start()
+        logger.info("Worker %s started", self.worker_id)
+        try:
+            while not self._stop.is_set():
+                if not self.run_once():
+                    self._stop.wait(self.settings.worker_poll_seconds)
+        finally:
+            self._stop.set()
+            heartbeat.join()
+            logger.info("Worker %s stopped", self.worker_id)
+
+    def stop(self) -> None:
+        """Finish the batch in progress, then exit :meth:`run_forever`."""
+        self._stop.set()
+
+    def run_once(self) -> int:
+        """Claim and process one batch; returns the number of jobs claimed."""
+        with Session(engine) as session:
+            jobs = self.claim(session)
+            by_run: Dict[uuid.UUID, List[CaseJob]] = defaultdict(list)
+            for job in jobs:
+                by_run[job.run_id].append(job)
+            for run_id, run_jobs in by_run.items():
+                self._process(session, run_id, [job.test_case_id for job in run_jobs])
+            return len(jobs)
+
+    def claim(self, session: Session) -> List[CaseJob]:
+        statement = (
+            select(CaseJob)
+            .where(CaseJob.status == "pending")
+            .order_by(CaseJob.created_at)
+            .limit(max(1, self.settings.worker_claim_size))
+            .with_for_update(skip_locked=True)
+        )
+        jobs = list(session.exec(statement).all())
+        if not jobs:
+            session.rollback()
+            return []
+        # Detach before committing so the returned jobs keep their loaded values.
+        for job in jobs:
+            session.expunge(job)
+
+        now = datetime.utcnow()
+        session.execute(
+            update(CaseJob)
+            .where(CaseJob.test_case_id.in_([job.test_case_id for job in jobs]))
+            .values(status="claimed", worker_id=self.worker_id, heartbeat_at=now)
+        )
+        session.execute(
+            update(TestRun)
+            .where(TestRun.id.in_({job.run_id for job in jobs}), TestRun.status == "pending")
+            .values(status="running")
+        )
+        session.commit()
+        return jobs
+
+    def heartbeat(self, session: Session) -> None:
+        session.execute(
+            update(CaseJob)
+            .where(CaseJob.worker_id == self.worker_id, CaseJob.status == "claimed")
+            .values(heartbeat_at=datetime.utcnow())
+        )
+        session.commit()
+
+    def requeue_abandoned(self, session: Session) -> int:
+        """Put jobs whose lease expired back in the queue; any worker may do this."""
+        cutoff = datetime.utcnow() - timedelta(seconds=self.settings.worker_lease_seconds)
+        result = session.execute(
+            update(CaseJob)
+            .where(CaseJob.status == "claimed", CaseJob.heartbeat_at < cutoff)
+            .values(status="pending", worker_id=None, attempts=CaseJob.attempts + 1)
+        )
+        session.commit()
+        if result.rowcount:
+            logger.warning("Re-queued %d abandoned case jobs", result.rowcount)
+            self._fail_exhausted(session, "its worker stopped responding")
+        return result.rowcount
+
+    def _process(self, session: Session, run_id: uuid.UUID, case_ids: Sequence[uuid.UUID]) -> None:
+        run = session.get(TestRun, run_id)
+        if run is None or run.status == "failed":
+            self._drop_jobs(session, run_id)
+            return
+
+        cases = list(session.exec(select(TestCase).where(TestCase.id.in_(case_ids)).order_by(TestCase.position)))
+        for case in cases:
+            session.expunge(case)
+        hydrate_cases(session, cases)
+
+        options = run.execution_options or {}
+        try:
+            rows = self.runner.evaluate_cases(
+                session,
+                run,
+                cases,
+                max_concurrency=options.get("max_concurrency"),
+                use_judge_cache=options.get("use_judge_cache", True),
+                incremental=options.get("incremental", False),
+                scoring_cascade=options.get("scoring_cascade"),
+            )
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("Worker %s failed cases of run %s", self.worker_id, run_id)
+            self._release(session, case_ids, exc)
+            return
+
+        self._complete(session, run_id, case_ids, rows)
+
+    def _complete(
+        self,
+        session: Session,
+        run_id: uuid.UUID,
+        case_ids: Sequence[uuid.UUID],
+        rows: List[Dict[str, Any]],
+    ) -> None:
+        # Locking the run serializes completions of its batches, so the last
+        # one sees every other batch's jobs as done and finalizes exactly once.
+        run = session.exec(
+            select(TestRun)
+            .where(TestRun.id == run_id)
+            .with_for_update()
+            .execution_options(populate_existing=True)
+        ).one()
+        if run.status == "failed":
+            session.rollback()
+            self._drop_jobs(session, run_id)
+            return
+
+        # Jobs re-queued while we were scoring now belong to someone else.
+        owned = set(
+            session.exec(
+                select(CaseJob.test_case_id).where(
+                    CaseJob.test_case_id.in_(case_ids),
+                    CaseJob.worker_id == self.worker_id,
+                    CaseJob.status == "claimed",
+                )
+            ).all()
+        )
+        rows = [row for row in rows if row["test_case_id"] in owned]
+        bulk_insert(session, EvalResult, rows)
+        session.execute(update(CaseJob).where(CaseJob.test_case_id.in_(owned)).values(status="done"))
+        run.completed_cases += len(rows)
+        session.add(run)
+
+        remaining = session.exec(
+            select(func.count()).select_from(CaseJob).where(CaseJob.run_id == run_id, CaseJob.status != "done")
+        ).one()
+        if remaining == 0 and run.status != "completed":
+            session.execute(delete(CaseJob).where(CaseJob.run_id == run_id))
+            EvalRunner.finalize_run(session, run)
+        else:
+            session.commit()
+
+    def _release(self, session: Session, case_ids: Sequence[uuid.UUID], exc: BaseException) -> None:
+        session.rollback()
+        session.execute(
+            update(CaseJob)
+            .where(CaseJob.test_case_id.in_(case_ids), CaseJob.worker_id == self.worker_id)
+            .values(status="pending", worker_id=None, attempts=CaseJob.attempts + 1)
+        )
+        session.commit()
+        self._fail_exhausted(session, str(exc))
+
+    def _fail_exhausted(self, session: Session, reason: str) -> None:
+        """Fail runs with a case that has used up ``WORKER_MAX_ATTEMPTS``."""
+        attempts = max(1, self.settings.worker_max_attempts)
+        statement = select(CaseJob.run_id).where(CaseJob.attempts >= attempts).distinct()
+        for run_id in session.exec(statement).all():
+            EvalRunner.fail_run(session, run_id, RuntimeError(f"A case failed {attempts} times; last error: {reason}"))
+            self._drop_jobs(session, run_id)
+
+    @staticmethod
+    def _drop_jobs(session: Session, run_id: uuid.UUID) -> None:
+        session.execute(delete(CaseJob).where(CaseJob.run_id == run_id))
+        session.commit()
+
+    def _heartbeat_loop(self) -> None:
+        interval = max(0.1, self.settings.worker_heartbeat_seconds)
+        with Session(engine) as session:
+            while not self._stop.wait(interval):
+                try:
+                    self.heartbeat(session)
+                    self.requeue_abandoned(session)
+                except Exception:  # noqa: BLE001
+                    session.rollback()
+                    logger.exception("Worker %s heartbeat failed", self.worker_id)
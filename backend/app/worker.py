@@ -0,0 +1,59 @@
+"""Standalone eval worker for ``EVAL_QUEUE_BACKEND=database``.
+
+Run any number of these, on any number of nodes, against the same database::
+
+    python -m app.worker --processes 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import multiprocessing
+import signal
+from typing import List
+
+from .database import engine
+from .migrations import ensure_schema
+from .services.judge_service import judge_registry
+from .services.target_providers import provider_registry
+from .services.work_queue import CaseQueueWorker
+
+
+def _run_worker() -> None:
+    worker = CaseQueueWorker()
+    signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+    signal.signal(signal.SIGINT, lambda *_: worker.stop())
+    try:
+        worker.run_forever()
+    finally:
+        provider_registry.close()
+        judge_registry.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Claim and evaluate queued test cases.")
+    parser.add_argument("--processes", type=int, default=1, help="Worker processes to start on this node.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(processName)s %(levelname)s %(message)s")
+    ensure_schema(engine)
+
+    if args.processes <= 1:
+        _run_worker()
+        return
+
+    # Each process opens its own connections; the parent's pool must not be shared.
+    engine.dispose()
+    processes: List[multiprocessing.Process] = [
+        multiprocessing.Process(target=_run_worker, name=f"eval-worker-{index}") for index in range(args.processes)
+    ]
+    for process in processes:
+        process.start()
+    signal.signal(signal.SIGTERM, lambda *_: [process.terminate() for process in processes])
+    for process in processes:
+        process.join()
+
+
+if __name__ == "__main__":
+    main()
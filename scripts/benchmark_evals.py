@@ -0,0 +1,349 @@
+"""Offline throughput benchmark for the eval pipeline.
+
+Drives the FastAPI app in-process with synthetic suites. The judge and the
+target model are deterministic fakes, so no API credits are spent and
+results are comparable across runs. Every scenario runs in a fresh
+subprocess, so peak RSS and database state are not shared between them.
+
+Example::
+
+    python scripts/benchmark_evals.py --cases 10,1000,10000 --modes run,async \\
+        --database-url sqlite --database-url postgresql://bench@localhost/bench_evals \\
+        --judge-latency-ms 20 --judge-failure-rate 0.01 --output bench.json
+
+The JSON report lists these figures for each scenario:
+
+- ``cases_per_sec``.
+- Request latency percentiles.
+- Per-case stage latency percentiles.
+- Database round trips.
+- Peak RSS.
+
+Postgres URLs should point at a scratch database. Tables are created but
+never dropped, and sqlite scenarios use a throwaway file.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Any, Dict, List, Sequence
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+MODES = ("run", "stream", "async")
+
+
+def percentiles(values: Sequence[float]) -> Dict[str, float | None]:
+    if not values:
+        return {"p50": None, "p95": None, "p99": None}
+    ordered = sorted(values)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+
+    return {"p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99)}
+
+
+def _stable_fraction(text: str) -> float:
+    return int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:8], 16) / 0xFFFFFFFF
+
+
+# --- Scenario (runs in a child process) -------------------------------------
+
+
+def run_scenario(config: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one scenario; the database URL must already be in the environment."""
+    sys.path.insert(0, BACKEND_DIR)
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+    import httpx
+    import openai
+    from fastapi.testclient import TestClient
+    from sqlalchemy import event
+    from sqlmodel import SQLModel
+
+    from app.api.routes.evals import get_eval_runner
+    from app.database import async_engine, engine
+    from app.main import app
+    from app.services.eval_runner import EvalRunner
+    from app.services.job_queue import job_queue
+    from app.services.judge_scheduler import JudgeScheduler
+    from app.services.judge_service import JudgeService
+    from app.services.target_providers import ProviderRegistry, TargetProvider
+
+    class FakeCompletions:
+        """Answers judge prompts with scores derived from the case text."""
+
+        def __init__(self, latency: float, failure_rate: float, seed: int) -> None:
+            self.latency = latency
+            self.failure_rate = failure_rate
+            self._random = random.Random(seed)
+            self._lock = threading.Lock()
+
+        @property
+        def with_raw_response(self) -> "FakeCompletions":
+            return self
+
+        def create(self, *, model: str, messages: List[Dict[str, Any]], temperature: float = 0.0) -> Any:
+            time.sleep(self.latency)
+            return self._respond(messages)
+
+        def _respond(self, messages: List[Dict[str, Any]]) -> Any:
+            with self._lock:
+                failed = self._random.random() < self.failure_rate
+            if failed:
+                raise openai.APITimeoutError(request=httpx.Request("POST", "http://fake-judge/chat/completions"))
+
+            cases = [part["text"] for part in messages[1]["content"][1:]]
+            if "results" in messages[2]["content"]:
+                verdicts = [
+                    {"id": index, "score": _stable_fraction(text), "reason": "benchmark"}
+                    for index, text in enumerate(cases)
+                ]
+                content = json.dumps({"results": verdicts})
+            else:
+                content = json.dumps({"score": _stable_fraction("".join(cases)), "reason": "benchmark"})
+
+            prompt_tokens = sum(len(str(message["content"])) for message in messages) // 4
+            completion = SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+                usage=SimpleNamespace(
+                    prompt_tokens=prompt_tokens,
+                    completion_tokens=len(content) // 4,
+                    total_tokens=prompt_tokens + len(content) // 4,
+                ),
+            )
+            return SimpleNamespace(headers={}, parse=lambda: completion)
+
+    class AsyncFakeCompletions(FakeCompletions):
+        async def create(self, *, model: str, messages: List[Dict[str, Any]], temperature: float = 0.0) -> Any:
+            await asyncio.sleep(self.latency)
+            return self._respond(messages)
+
+    class FakeJudgeService(JudgeService):
+        def __init__(self) -> None:
+            self.model = "fake-judge"
+            judge_args = (config["judge_latency_ms"] / 1000.0, config["judge_failure_rate"], config["seed"])
+            self.client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(*judge_args)))
+            self.async_client = SimpleNamespace(chat=SimpleNamespace(completions=AsyncFakeCompletions(*judge_args)))
+            self.scheduler = JudgeScheduler(
+                requests_per_minute=0,
+                tokens_per_minute=0,
+                backoff_base_seconds=0.001,
+                backoff_max_seconds=0.01,
+            )
+
+    class FakeTargetProvider(TargetProvider):
+        def _generate(self, prompt: str, test_input: str, model: str) -> str:
+            time.sleep(config["target_latency_ms"] / 1000.0)
+            return f"[model={model}] {test_input}"
+
+        async def _agenerate(self, prompt: str, test_input: str, model: str) -> str:
+            await asyncio.sleep(config["target_latency_ms"] / 1000.0)
+            return f"[model={model}] {test_input}"
+
+    providers = ProviderRegistry(fallback=lambda: FakeTargetProvider(max_concurrency=1024))
+    runner = EvalRunner(judge_service=FakeJudgeService(), providers=providers)
+    app.dependency_overrides[get_eval_runner] = lambda: runner
+    job_queue.set_runner_factory(lambda: runner)
+
+    SQLModel.metadata.create_all(bind=engine)
+    round_trips = [0]
+
+    def _count_round_trip(*_: Any) -> None:
+        round_trips[0] += 1
+
+    for counted in (engine, async_engine.sync_engine):
+        event.listen(counted, "before_cursor_execute", _count_round_trip)
+
+    def payload(request_index: int) -> Dict[str, Any]:
+        return {
+            "prompt": "You are a benchmark assistant.",
+            "target_model": "bench-model",
+            "use_judge_cache": config["use_judge_cache"],
+            "test_cases": [
+                {"input": f"case {request_index}-{index}", "expected_output": f"{request_index}-{index}"}
+                for index in range(config["cases"])
+            ],
+        }
+
+    case_latencies: List[float] = []
+    latencies_lock = threading.Lock()
+
+    def record_cases(results: List[Dict[str, Any]]) -> None:
+        with latencies_lock:
+            case_latencies.extend(
+                (item.get("target_ms") or 0.0) + (item.get("judge_ms") or 0.0) + (item.get("heuristic_ms") or 0.0)
+                for item in results
+            )
+
+    def one_request(client: TestClient, request_index: int) -> float:
+        body = payload(request_index)
+        started = time.perf_counter()
+        if config["mode"] == "run":
+            response = client.post("/v1/evals/run", json=body)
+            response.raise_for_status()
+            results = response.json()["results"]
+        elif config["mode"] == "stream":
+            results = []
+            with client.stream("POST", "/v1/evals/run/stream", json=body) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    record = json.loads(line)
+                    if record["type"] == "error":
+                        raise RuntimeError(record["data"]["detail"])
+                    if record["type"] == "result":
+                        results.append(record["data"])
+        else:
+            response = client.post("/v1/evals/run/async", json=body)
+            response.raise_for_status()
+            run_id = response.json()["run_id"]
+            while True:
+                detail = client.get(f"/v1/evals/runs/{run_id}", params={"limit": 1}).json()
+                if detail["status"] in ("completed", "failed"):
+                    break
+                time.sleep(0.05)
+            if detail["status"] == "failed":
+                raise RuntimeError(detail["error"])
+            results = client.get(f"/v1/evals/runs/{run_id}").json()["results"]
+        elapsed = time.perf_counter() - started
+        record_cases(results)
+        return elapsed * 1000.0
+
+    errors = 0
+    request_latencies: List[float] = []
+    with TestClient(app) as client:
+        with ThreadPoolExecutor(max_workers=config["concurrency"]) as executor:
+            round_trips[0] = 0
+            started = time.perf_counter()
+            futures = [executor.submit(one_request, client, index) for index in range(config["requests"])]
+            for future in futures:
+                try:
+                    request_latencies.append(future.result())
+                except Exception as exc:  # noqa: BLE001
+                    errors += 1
+                    print(f"request failed: {exc}", file=sys.stderr)
+            elapsed = time.perf_counter() - started
+            db_round_trips = round_trips[0]
+
+    total_cases = config["cases"] * (config["requests"] - errors)
+    return {
+        **config,
+        "elapsed_s": round(elapsed, 3),
+        "cases_per_sec": round(total_cases / elapsed, 2) if elapsed else None,
+        "request_latency_ms": percentiles(request_latencies),
+        "case_latency_ms": percentiles(case_latencies),
+        "db_round_trips": db_round_trips,
+        "db_round_trips_per_case": round(db_round_trips / total_cases, 3) if total_cases else None,
+        # ru_maxrss is reported in KiB on Linux.
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0, 1),
+        "errors": errors,
+    }
+
+
+# --- Orchestration -----------------------------------------------------------
+
+
+def _scenario_env(database_url: str, scratch_dir: str, index: int) -> Dict[str, str]:
+    env = dict(os.environ)
+    if database_url == "sqlite":
+        database_url = f"sqlite:///{os.path.join(scratch_dir, f'bench-{index}.db')}"
+    env["DATABASE_URL"] = database_url
+    return env
+
+
+def _backend_name(database_url: str) -> str:
+    return "sqlite" if database_url.startswith("sqlite") else database_url.split(":", 1)[0]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", default="10,1000,10000", help="Comma-separated suite sizes (e.g. up to 100000).")
+    parser.add_argument("--modes", default="run", help=f"Comma-separated endpoints to drive: {', '.join(MODES)}.")
+    parser.add_argument(
+        "--database-url",
+        action="append",
+        help='Database to benchmark; repeatable. "sqlite" (default) uses a throwaway file.',
+    )
+    parser.add_argument("--requests", type=int, default=1, help="Runs submitted per scenario.")
+    parser.add_argument("--concurrency", type=int, default=1, help="Runs in flight at once.")
+    parser.add_argument("--judge-latency-ms", type=float, default=0.0)
+    parser.add_argument("--judge-failure-rate", type=float, default=0.0, help="Fraction of judge calls that time out.")
+    parser.add_argument("--target-latency-ms", type=float, default=0.0)
+    parser.add_argument("--use-judge-cache", action="store_true", help="Allow judge cache hits across runs.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+    parser.add_argument("--scenario", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario:
+        print(json.dumps(run_scenario(json.loads(args.scenario))))
+        return 0
+
+    modes = [mode.strip() for mode in args.modes.split(",") if mode.strip()]
+    unknown = set(modes) - set(MODES)
+    if unknown:
+        parser.error(f"unknown modes: {', '.join(sorted(unknown))}")
+
+    scenarios: List[Dict[str, Any]] = []
+    failed = False
+    with tempfile.TemporaryDirectory(prefix="vanguard-bench-") as scratch_dir:
+        index = 0
+        for database_url in args.database_url or ["sqlite"]:
+            for mode in modes:
+                for cases in (int(size) for size in args.cases.split(",")):
+                    config = {
+                        "backend": _backend_name(database_url),
+                        "mode": mode,
+                        "cases": cases,
+                        "requests": args.requests,
+                        "concurrency": args.concurrency,
+                        "judge_latency_ms": args.judge_latency_ms,
+                        "judge_failure_rate": args.judge_failure_rate,
+                        "target_latency_ms": args.target_latency_ms,
+                        "use_judge_cache": args.use_judge_cache,
+                        "seed": args.seed,
+                    }
+                    print(f"{config['backend']} {mode} {cases} cases ...", file=sys.stderr)
+                    child = subprocess.run(
+                        [sys.executable, os.path.abspath(__file__), "--scenario", json.dumps(config)],
+                        env=_scenario_env(database_url, scratch_dir, index),
+                        stdout=subprocess.PIPE,
+                        text=True,
+                    )
+                    index += 1
+                    if child.returncode != 0:
+                        failed = True
+                        scenarios.append({**config, "error": f"scenario exited with {child.returncode}"})
+                        continue
+                    result = json.loads(child.stdout.strip().splitlines()[-1])
+                    print(
+                        f"  {result['cases_per_sec']} cases/s, p95 {result['request_latency_ms']['p95']} ms, "
+                        f"{result['db_round_trips']} round trips, {result['peak_rss_mb']} MiB peak RSS",
+                        file=sys.stderr,
+                    )
+                    scenarios.append(result)
+
+    report = json.dumps({"scenarios": scenarios}, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(report + "\n")
+    else:
+        print(report)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,17 +1,302 @@
+"""CI gate: evaluate test suites against a deployed backend and fail the build on regressions.
+
+Suites are JSONL files, one ``{"input", "expected_output", "metadata"}``
+object per line; directories are searched for ``*.jsonl`` files. The cases
+are split into shards of ``--shard-size`` that are evaluated as separate
+runs, ``--parallel`` at a time, over one pooled HTTP session::
+
+    python scripts/run_ci_eval.py evals/ --shard-size 500 --parallel 8
+
+The gate passes when the mean combined score over every case reaches
+``--pass-threshold``, which is what a single run over all the cases would
+report. Results are consumed as they arrive: from ``/v1/evals/run/stream``
+per case, or with ``--mode poll`` from ``/v1/evals/run/async`` per finished
+shard. As soon as the gate can no longer pass, even if every remaining case
+scored 1.0, the outstanding shards are abandoned and the script exits.
+
+Without suite paths, a small built-in smoke suite is evaluated.
+``API_URL`` and ``API_KEY`` are read from the environment.
+"""
+
 from __future__ import annotations
 
+import argparse
 import json
 import os
 import sys
-from typing import Any, Dict
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterator, List, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+
+
+DEFAULT_PROMPT = "You are a helpful, concise assistant."
+
+SMOKE_SUITE: List[Dict[str, Any]] = [
+    {"input": "Hello", "expected_output": "Input: Hello"},
+    {"input": "What is 2+2?", "expected_output": "Input: What is 2+2?"},
+    {"input": "Summarize: GitHub Actions", "expected_output": "Input: Summarize: GitHub Actions"},
+]
+
+
+class GateAbandoned(Exception):
+    """Raised inside a shard once the gate is decided and its work is no longer needed."""
+
+
+class Gate:
+    """Running total of scores across shards, shared by the shard threads."""
+
+    def __init__(self, total_cases: int, pass_threshold: float) -> None:
+        self.total_cases = total_cases
+        self.pass_threshold = pass_threshold
+        self.scored = 0
+        self.score_sum = 0.0
+        self.failure: Optional[str] = None
+        self.decided = threading.Event()
+        self._lock = threading.Lock()
+
+    def add(self, cases: int, score_sum: float) -> None:
+        with self._lock:
+            self.scored += cases
+            self.score_sum += score_sum
+            best_case = (self.score_sum + (self.total_cases - self.scored)) / self.total_cases
+            if best_case < self.pass_threshold:
+                self._fail(
+                    f"mean score cannot reach {self.pass_threshold:.3f} "
+                    f"(at most {best_case:.3f} after {self.scored}/{self.total_cases} cases)"
+                )
+
+    def error(self, reason: str) -> None:
+        with self._lock:
+            self._fail(reason)
+
+    def _fail(self, reason: str) -> None:
+        if self.failure is None:
+            self.failure = reason
+        self.decided.set()
+
+    def check(self) -> None:
+        if self.decided.is_set():
+            raise GateAbandoned()
+
+    @property
+    def average_score(self) -> float:
+        return self.score_sum / self.scored if self.scored else 0.0
+
+
+class ShardReport:
+    def __init__(self, index: int, cases: int) -> None:
+        self.index = index
+        self.cases = cases
+        self.run_id: Optional[str] = None
+        self.status = "not started"
+        self.scored = 0
+        self.score_sum = 0.0
+        self.first_result_seconds: Optional[float] = None
+        self.seconds = 0.0
+        self.error: Optional[str] = None
+
+
+def load_cases(paths: List[str]) -> List[Dict[str, Any]]:
+    """Read test cases from JSONL files and directories of them, in path order."""
+    cases: List[Dict[str, Any]] = []
+    for path in _suite_files(paths):
+        with open(path, encoding="utf-8") as handle:
+            for line_number, line in enumerate(handle, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    item = json.loads(line)
+                except ValueError as exc:
+                    raise SystemExit(f"ERROR: {path}:{line_number}: invalid JSON ({exc})")
+                if not isinstance(item, dict) or "input" not in item:
+                    raise SystemExit(f"ERROR: {path}:{line_number}: expected an object with an 'input' field")
+                cases.append(
+                    {
+                        "input": item["input"],
+                        "expected_output": item.get("expected_output"),
+                        "metadata": item.get("metadata"),
+                    }
+                )
+    return cases
+
+
+def _suite_files(paths: List[str]) -> Iterator[str]:
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.endswith(".jsonl"):
+                        yield os.path.join(root, name)
+        elif os.path.isfile(path):
+            yield path
+        else:
+            raise SystemExit(f"ERROR: suite path not found: {path}")
 
 
-def main() -> int:
+def pooled_session(api_key: str, project_id: str, pool_size: int) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"x-api-key": api_key, "X-Project-Id": project_id})
+    return session
+
+
+def run_shard(
+    http: requests.Session,
+    api_url: str,
+    payload: Dict[str, Any],
+    report: ShardReport,
+    gate: Gate,
+    args: argparse.Namespace,
+) -> ShardReport:
+    started = time.perf_counter()
+    try:
+        gate.check()
+        report.status = "running"
+        if args.mode == "stream":
+            _stream_shard(http, api_url, payload, report, gate, args)
+        else:
+            _poll_shard(http, api_url, payload, report, gate, args)
+    except GateAbandoned:
+        report.status = "abandoned"
+    except (requests.RequestException, ValueError, KeyError) as exc:
+        report.status = "error"
+        report.error = str(exc)
+        gate.error(f"shard {report.index} failed: {exc}")
+    finally:
+        report.seconds = time.perf_counter() - started
+    return report
+
+
+def _stream_shard(
+    http: requests.Session,
+    api_url: str,
+    payload: Dict[str, Any],
+    report: ShardReport,
+    gate: Gate,
+    args: argparse.Namespace,
+) -> None:
+    started = time.perf_counter()
+    with http.post(
+        f"{api_url}/v1/evals/run/stream",
+        json=payload,
+        stream=True,
+        timeout=(args.connect_timeout, args.read_timeout),
+    ) as response:
+        response.raise_for_status()
+        # Leaving the block early closes the connection instead of returning it
+        # to the pool half-read.
+        for line in response.iter_lines():
+            gate.check()
+            if not line:
+                continue
+            record = json.loads(line)
+            data = record["data"]
+            if record["type"] == "result":
+                if report.first_result_seconds is None:
+                    report.first_result_seconds = time.perf_counter() - started
+                report.scored += 1
+                report.score_sum += data["combined_score"]
+                gate.add(1, data["combined_score"])
+            elif record["type"] == "summary":
+                report.run_id = data["run_id"]
+                report.status = data["status"]
+            elif record["type"] == "error":
+                report.run_id = data["run_id"]
+                raise ValueError(data["detail"])
+    if report.scored < report.cases:
+        raise ValueError(f"stream ended after {report.scored} of {report.cases} results")
+
+
+def _poll_shard(
+    http: requests.Session,
+    api_url: str,
+    payload: Dict[str, Any],
+    report: ShardReport,
+    gate: Gate,
+    args: argparse.Namespace,
+) -> None:
+    started = time.perf_counter()
+    response = http.post(
+        f"{api_url}/v1/evals/run/async",
+        json=payload,
+        timeout=(args.connect_timeout, args.read_timeout),
+    )
+    response.raise_for_status()
+    report.run_id = response.json()["run_id"]
+
+    while True:
+        gate.decided.wait(args.poll_interval)
+        gate.check()
+        response = http.get(
+            f"{api_url}/v1/evals/runs/{report.run_id}",
+            params={"limit": 1},
+            timeout=(args.connect_timeout, args.read_timeout),
+        )
+        response.raise_for_status()
+        run = response.json()
+        if run["completed_cases"] and report.first_result_seconds is None:
+            report.first_result_seconds = time.perf_counter() - started
+        if run["status"] == "failed":
+            raise ValueError(run.get("error") or "run failed")
+        if run["status"] == "completed":
+            # Per-case scores are only final once the run is, so the gate
+            # advances a whole shard at a time in this mode.
+            report.status = run["status"]
+            report.scored = run["completed_cases"]
+            report.score_sum = run["average_score"] * run["completed_cases"]
+            gate.add(report.scored, report.score_sum)
+            return
+
+
+def print_summary(reports: List[ShardReport], wall_seconds: float) -> None:
+    print()
+    print(f"{'shard':>5}  {'cases':>6}  {'scored':>6}  {'avg':>6}  {'first':>7}  {'total':>8}  {'cases/s':>8}  status")
+    for report in reports:
+        average = f"{report.score_sum / report.scored:.3f}" if report.scored else "-"
+        first = f"{report.first_result_seconds:.1f}s" if report.first_result_seconds is not None else "-"
+        rate = f"{report.scored / report.seconds:.1f}" if report.seconds else "-"
+        status = report.status if report.error is None else f"{report.status}: {report.error}"
+        print(
+            f"{report.index:>5}  {report.cases:>6}  {report.scored:>6}  {average:>6}  "
+            f"{first:>7}  {report.seconds:>7.1f}s  {rate:>8}  {status}"
+        )
+    print(f"wall time {wall_seconds:.1f}s")
+
+
+def parse_args(argv: List[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("suites", nargs="*", help="JSONL suite files or directories (default: built-in smoke suite).")
+    parser.add_argument("--prompt", default=DEFAULT_PROMPT, help="System prompt under test.")
+    parser.add_argument("--prompt-file", help="Read the system prompt from this file instead.")
+    parser.add_argument("--target-model", default="stub-ci-model")
+    parser.add_argument("--pass-threshold", type=float, default=0.75)
+    parser.add_argument("--project-id", default="ci-pipeline", help="Sent as X-Project-Id.")
+    parser.add_argument("--shard-size", type=int, default=500, help="Cases per run.")
+    parser.add_argument("--parallel", type=int, default=4, help="Shards evaluated at the same time.")
+    parser.add_argument("--max-concurrency", type=int, help="Per-run case concurrency on the server.")
+    parser.add_argument("--mode", choices=("stream", "poll"), default="stream")
+    parser.add_argument("--poll-interval", type=float, default=2.0, help="Seconds between status polls.")
+    parser.add_argument("--connect-timeout", type=float, default=10.0)
+    parser.add_argument(
+        "--read-timeout",
+        type=float,
+        default=300.0,
+        help="Longest wait for the next bytes of a response (seconds).",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: List[str] | None = None) -> int:
+    args = parse_args(argv)
     api_url = os.getenv("API_URL")
     api_key = os.getenv("API_KEY")
-    openai_key = os.getenv("OPENAI_API_KEY")
 
     if not api_url:
         print("ERROR: API_URL is not set (expected from VANGUARD_API_URL secret).", file=sys.stderr)
@@ -21,69 +306,64 @@ def main() -> int:
         print("ERROR: API_KEY is not set (expected from VANGUARD_API_KEY secret).", file=sys.stderr)
         return 1
 
-    if not openai_key:
+    if not os.getenv("OPENAI_API_KEY"):
         print("WARNING: OPENAI_API_KEY is not set; backend judge may fail if it requires it.", file=sys.stderr)
 
-    run_endpoint = api_url.rstrip("/") + "/v1/evals/run"
-
-    payload: Dict[str, Any] = {
-        "prompt": "You are a helpful, concise assistant.",
-        "target_model": "stub-ci-model",
-        "pass_threshold": 0.75,
-        "test_cases": [
-            {
-                "input": "Hello",
-                "expected_output": "Input: Hello",
-            },
-            {
-                "input": "What is 2+2?",
-                "expected_output": "Input: What is 2+2?",
-            },
-            {
-                "input": "Summarize: GitHub Actions",
-                "expected_output": "Input: Summarize: GitHub Actions",
-            },
-        ],
-    }
-
-    print(f"Calling eval API at {run_endpoint}")
+    prompt = args.prompt
+    if args.prompt_file:
+        with open(args.prompt_file, encoding="utf-8") as handle:
+            prompt = handle.read()
 
-    try:
-        resp = requests.post(
-            run_endpoint,
-            headers={
-                "Content-Type": "application/json",
-                "x-api-key": api_key,
-                # X-Project-Id is optional; use a static one for CI context.
-                "X-Project-Id": "ci-pipeline",
-            },
-            data=json.dumps(payload),
-            timeout=60,
-        )
-    except Exception as exc:  # noqa: BLE001
-        print(f"ERROR: request to eval API failed: {exc}", file=sys.stderr)
+    cases = load_cases(args.suites) if args.suites else SMOKE_SUITE
+    if not cases:
+        print("ERROR: the suites contain no test cases.", file=sys.stderr)
         return 1
 
-    print(f"HTTP {resp.status_code}")
-    try:
-        body = resp.json()
-    except Exception:  # noqa: BLE001
-        print("ERROR: could not parse JSON response:", file=sys.stderr)
-        print(resp.text, file=sys.stderr)
-        return 1
+    shard_size = max(1, args.shard_size)
+    shards = [cases[start : start + shard_size] for start in range(0, len(cases), shard_size)]
+    parallel = max(1, min(args.parallel, len(shards)))
+    api_url = api_url.rstrip("/")
+    print(f"Evaluating {len(cases)} cases in {len(shards)} shards ({parallel} at a time) against {api_url}")
 
-    print("Response JSON:")
-    print(json.dumps(body, indent=2))
+    gate = Gate(len(cases), args.pass_threshold)
+    reports = [ShardReport(index, len(shard)) for index, shard in enumerate(shards)]
+    started = time.perf_counter()
+    with pooled_session(api_key, args.project_id, parallel) as http:
+        with ThreadPoolExecutor(max_workers=parallel, thread_name_prefix="ci-shard") as executor:
+            futures = []
+            for report, shard in zip(reports, shards):
+                payload: Dict[str, Any] = {
+                    "prompt": prompt,
+                    "target_model": args.target_model,
+                    "pass_threshold": args.pass_threshold,
+                    "test_cases": shard,
+                }
+                if args.max_concurrency:
+                    payload["max_concurrency"] = args.max_concurrency
+                futures.append(executor.submit(run_shard, http, api_url, payload, report, gate, args))
 
-    if resp.status_code >= 400:
-        print("ERROR: eval API returned error status.", file=sys.stderr)
-        return 1
+            for future in as_completed(futures):
+                if future.cancelled():
+                    continue
+                report = future.result()
+                if report.status != "abandoned":
+                    average = report.score_sum / report.scored if report.scored else 0.0
+                    print(
+                        f"shard {report.index}: {report.status}, {report.scored}/{report.cases} cases, "
+                        f"avg {average:.3f} in {report.seconds:.1f}s (run {report.run_id})"
+                    )
+                if gate.decided.is_set():
+                    # Shards that have not started yet are never submitted.
+                    for pending in futures:
+                        pending.cancel()
+    print_summary(reports, time.perf_counter() - started)
 
-    overall_pass = body.get("overall_pass")
-    print(f"overall_pass = {overall_pass}")
-
-    if overall_pass is not True:
-        print("CI gate FAILED: overall_pass is not true", file=sys.stderr)
+    print(f"average_score = {gate.average_score:.3f} over {gate.scored}/{gate.total_cases} cases")
+    if gate.failure is not None:
+        print(f"CI gate FAILED: {gate.failure}", file=sys.stderr)
+        return 1
+    if gate.average_score < args.pass_threshold:
+        print(f"CI gate FAILED: average score is below {args.pass_threshold}", file=sys.stderr)
         return 1
 
     print("CI gate PASSED: evaluation succeeded.")
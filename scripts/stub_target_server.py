@@ -0,0 +1,86 @@
+"""Local stand-in for a target model endpoint.
+
+Speaks both contracts understood by the backend's target providers, so evals
+can exercise real HTTP (keep-alive pooling, timeouts, concurrency limits)
+without a model:
+
+- ``POST /chat/completions``: OpenAI-compatible; set
+  ``TARGET_OPENAI_BASE_URL=http://127.0.0.1:9100`` and use
+  ``target_model="openai:<anything>"``.
+- ``POST /generate``: generic JSON contract; set
+  ``TARGET_HTTP_URL=http://127.0.0.1:9100/generate`` and use
+  ``target_model="http:<anything>"``.
+
+Outputs mirror the backend's stub model. ``--latency-ms`` adds artificial
+delay per request.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict
+
+
+def _stub_output(prompt: str, test_input: str, model: str) -> str:
+    return f"[model={model}] Prompt: {prompt}\nInput: {test_input}"
+
+
+class StubTargetHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 keeps connections alive between requests.
+    protocol_version = "HTTP/1.1"
+    latency_seconds = 0.0
+
+    def do_POST(self) -> None:  # noqa: N802
+        length = int(self.headers.get("Content-Length", "0"))
+        body: Dict[str, Any] = json.loads(self.rfile.read(length) or b"{}")
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+
+        if self.path.rstrip("/").endswith("/chat/completions"):
+            messages = body.get("messages", [])
+            prompt = next((m["content"] for m in messages if m.get("role") == "system"), "")
+            test_input = next((m["content"] for m in messages if m.get("role") == "user"), "")
+            output = _stub_output(prompt, test_input, body.get("model", ""))
+            self._send_json({"choices": [{"index": 0, "message": {"role": "assistant", "content": output}}]})
+        elif self.path.rstrip("/").endswith("/generate"):
+            output = _stub_output(body.get("prompt", ""), body.get("input", ""), body.get("model", ""))
+            self._send_json({"output": output})
+        else:
+            self._send_json({"detail": "Not found"}, status=404)
+
+    def _send_json(self, payload: Dict[str, Any], status: int = 200) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        return
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    StubTargetHandler.latency_seconds = args.latency_ms / 1000.0
+    server = ThreadingHTTPServer((args.host, args.port), StubTargetHandler)
+    print(f"Stub target server listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())